@@ -0,0 +1,88 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = ["python-dotenv", "pydantic"]
+# ///
+
+"""
+ADW App Supervisor - Manage the app servers kept running for ADW worktrees
+
+Usage:
+  uv run adw_app_supervisor.py start <adw-id>   # Start (or health-check) the ADW's app servers
+  uv run adw_app_supervisor.py stop <adw-id>    # Stop the ADW's app servers
+  uv run adw_app_supervisor.py stop --all       # Stop every supervised app server
+  uv run adw_app_supervisor.py status           # Show supervised app servers
+
+adw_test_iso.py and adw_review_iso.py start the servers themselves; they keep
+running until the workflow ends, the branch ships or the worktree is collected.
+"""
+
+import sys
+import os
+from dotenv import load_dotenv
+
+# Add the parent directory to Python path to import modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from adw_modules.utils import setup_logger
+from adw_modules.state import ADWState
+from adw_modules.app_supervisor import (
+    ensure_app_running,
+    is_healthy,
+    list_states,
+    stop_app,
+)
+
+COMMANDS = ["start", "stop", "status"]
+
+
+def main():
+    """Main entry point."""
+    load_dotenv()
+
+    if len(sys.argv) < 2 or sys.argv[1] not in COMMANDS:
+        print("Usage: uv run adw_app_supervisor.py <start <adw-id>|stop <adw-id|--all>|status>")
+        sys.exit(1)
+
+    command = sys.argv[1]
+    target = sys.argv[2] if len(sys.argv) > 2 else None
+    logger = setup_logger("_apps", "adw_app_supervisor")
+
+    if command == "start":
+        if not target:
+            print("Usage: uv run adw_app_supervisor.py start <adw-id>")
+            sys.exit(1)
+        state = ADWState.load(target, logger)
+        worktree_path = state.get("worktree_path") if state else None
+        if not worktree_path or not os.path.isdir(worktree_path):
+            logger.error(f"No worktree found for ADW ID: {target}")
+            sys.exit(1)
+        success, error = ensure_app_running(target, worktree_path, logger)
+        if not success:
+            logger.error(f"App servers not ready: {error}")
+            sys.exit(1)
+        logger.info(f"App servers of {target} are running")
+
+    elif command == "stop":
+        if not target:
+            print("Usage: uv run adw_app_supervisor.py stop <adw-id|--all>")
+            sys.exit(1)
+        owners = [s.owner for s in list_states()] if target == "--all" else [target]
+        stopped = sum(stop_app(owner, logger) for owner in owners)
+        logger.info(f"Stopped {stopped} app server(s)")
+
+    elif command == "status":
+        states = list_states()
+        if not states:
+            print("No supervised app servers")
+        for state in states:
+            print(f"{state.owner}  {state.worktree_path}")
+            for process in state.processes:
+                health = "up" if is_healthy(process.port, "/") else "down"
+                started_by = f"pid {process.pid}" if process.pid else "adopted"
+                print(
+                    f"  {process.name:<10} port {process.port}  {health:<4}  {started_by}  "
+                    f"started {process.started_at:%Y-%m-%d %H:%M:%S}"
+                )
+
+
+if __name__ == "__main__":
+    main()
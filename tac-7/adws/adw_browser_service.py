@@ -0,0 +1,99 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = ["python-dotenv", "pydantic"]
+# ///
+
+"""
+ADW Browser Service - Keep warm headless browsers for E2E and review agents
+
+Usage:
+  uv run adw_browser_service.py serve    # Run the service in the foreground
+  uv run adw_browser_service.py start    # Run the service in the background
+  uv run adw_browser_service.py stop     # Stop the service and its browsers
+  uv run adw_browser_service.py status   # Show browsers, uses and attached agents
+
+While the service runs, /test_e2e and /review agents attach to one of its
+browsers over CDP in a fresh context instead of launching Chromium themselves.
+"""
+
+import sys
+import os
+import signal
+import subprocess
+import time
+from dotenv import load_dotenv
+
+# Add the parent directory to Python path to import modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from adw_modules.utils import setup_logger
+from adw_modules.browser_service import (
+    serve,
+    load_instances,
+    get_service_pid,
+    get_service_dir,
+    get_max_uses,
+)
+
+COMMANDS = ["serve", "start", "stop", "status"]
+
+
+def main():
+    """Main entry point."""
+    load_dotenv()
+
+    if len(sys.argv) < 2 or sys.argv[1] not in COMMANDS:
+        print("Usage: uv run adw_browser_service.py <serve|start|stop|status>")
+        sys.exit(1)
+
+    command = sys.argv[1]
+    logger = setup_logger("_browser", "adw_browser_service")
+    pid = get_service_pid()
+
+    if command == "serve":
+        if pid:
+            logger.info(f"Browser service already running (pid {pid})")
+            return
+        serve(logger)
+
+    elif command == "start":
+        if pid:
+            logger.info(f"Browser service already running (pid {pid})")
+            return
+        os.makedirs(get_service_dir(), exist_ok=True)
+        with open(os.path.join(get_service_dir(), "service.log"), "a") as log:
+            process = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), "serve"],
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                start_new_session=True,
+            )
+        logger.info(f"Browser service started in the background (pid {process.pid})")
+
+    elif command == "stop":
+        if not pid:
+            logger.info("Browser service is not running")
+            return
+        os.kill(pid, signal.SIGTERM)
+        for _ in range(50):
+            if not get_service_pid():
+                break
+            time.sleep(0.2)
+        logger.info("Browser service stopped")
+
+    elif command == "status":
+        print(f"Service: {f'running (pid {pid})' if pid else 'not running'}")
+        instances = load_instances()
+        if not instances:
+            print("No browsers")
+        for instance in instances:
+            print(
+                f"  {instance.instance_id}  {instance.cdp_endpoint}  "
+                f"pid {instance.pid}  uses {instance.uses}/{get_max_uses()}  "
+                f"started {instance.started_at:%Y-%m-%d %H:%M:%S}"
+            )
+            for lease_id in instance.leases:
+                print(f"    attached: {lease_id}")
+
+
+if __name__ == "__main__":
+    main()
@@ -25,7 +25,7 @@ import os
 import logging
 import json
 import subprocess
-from typing import Optional
+from typing import Optional, List
 from dotenv import load_dotenv
 
 from adw_modules.state import ADWState
@@ -38,27 +38,36 @@ from adw_modules.workflow_ops import (
     AGENT_IMPLEMENTOR,
 )
 from adw_modules.utils import setup_logger, check_env_vars
+from adw_modules.phase_journal import mark_phase_running
 from adw_modules.data_types import GitHubIssue
 from adw_modules.worktree_ops import validate_worktree
+from adw_modules.sparse_checkout import widen_for_referenced_paths
 
 
 
 
-def main():
-    """Main entry point."""
+def main(argv: Optional[List[str]] = None):
+    """Main entry point.
+
+    Args:
+        argv: Command line (defaults to sys.argv), so workflows can run the
+            phase in-process
+    """
+    argv = list(sys.argv if argv is None else argv)
+
     # Load environment variables
     load_dotenv()
     
     # Parse command line args
     # INTENTIONAL: adw-id is REQUIRED - we need it to find the worktree
-    if len(sys.argv) < 3:
+    if len(argv) < 3:
         print("Usage: uv run adw_build_iso.py <issue-number> <adw-id>")
         print("\nError: adw-id is required to locate the worktree and plan file")
         print("Run adw_plan_iso.py or adw_patch_iso.py first to create the worktree")
         sys.exit(1)
     
-    issue_number = sys.argv[1]
-    adw_id = sys.argv[2]
+    issue_number = argv[1]
+    adw_id = argv[2]
     
     # Try to load existing state
     temp_logger = setup_logger(adw_id, "adw_build_iso")
@@ -84,6 +93,7 @@ def main():
     
     # Set up logger with ADW ID from command line
     logger = setup_logger(adw_id, "adw_build_iso")
+    mark_phase_running(adw_id)
     logger.info(f"ADW Build Iso starting - ID: {adw_id}, Issue: {issue_number}")
     
     # Validate environment
@@ -148,6 +158,14 @@ def main():
     plan_file = state.get("plan_file")
     logger.info(f"Using plan file: {plan_file}")
     
+    # Widen a sparse checkout to every directory the plan references
+    plan_path = os.path.join(worktree_path, plan_file)
+    if os.path.exists(plan_path):
+        with open(plan_path, "r") as f:
+            success, error = widen_for_referenced_paths(worktree_path, f.read(), logger)
+        if not success:
+            logger.warning(error)
+    
     # Get port information for display
     backend_port = state.get("backend_port", "9100")
     frontend_port = state.get("frontend_port", "9200")
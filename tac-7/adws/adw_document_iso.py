@@ -25,13 +25,13 @@ import sys
 import os
 import logging
 import json
-import subprocess
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
 from dotenv import load_dotenv
 
 from adw_modules.state import ADWState
 from adw_modules.git_ops import commit_changes, finalize_git_operations
+from adw_modules.git_backend import get_git_backend
 from adw_modules.github import (
     fetch_issue,
     make_issue_comment,
@@ -44,6 +44,7 @@ from adw_modules.workflow_ops import (
     find_spec_file,
 )
 from adw_modules.utils import setup_logger, check_env_vars
+from adw_modules.phase_journal import mark_phase_running
 from adw_modules.data_types import (
     GitHubIssue,
     GitHubUser,
@@ -72,25 +73,19 @@ def check_for_changes(logger: logging.Logger, cwd: Optional[str] = None) -> bool
     """
     try:
         # Check for changes against origin/main
-        result = subprocess.run(
-            ["git", "diff", "origin/main", "--stat"],
-            capture_output=True,
-            text=True,
-            check=True,
-            cwd=cwd,
-        )
+        diff_stat = get_git_backend().diff_stat("origin/main", cwd=cwd)
 
         # If output is empty or only whitespace, no changes
-        has_changes = bool(result.stdout.strip())
+        has_changes = bool(diff_stat)
 
         if not has_changes:
             logger.info("No changes detected between current branch and origin/main")
         else:
-            logger.info(f"Found changes:\n{result.stdout}")
+            logger.info(f"Found changes:\n{diff_stat}")
 
         return has_changes
 
-    except subprocess.CalledProcessError as e:
+    except Exception as e:
         logger.error(f"Failed to check for changes: {e}")
         # If we can't check, assume there are changes and let the agent handle it
         return True
@@ -285,21 +280,28 @@ def track_agentic_kpis(
         )
 
 
-def main():
-    """Main entry point."""
+def main(argv: Optional[List[str]] = None):
+    """Main entry point.
+
+    Args:
+        argv: Command line (defaults to sys.argv), so workflows can run the
+            phase in-process
+    """
+    argv = list(sys.argv if argv is None else argv)
+
     # Load environment variables
     load_dotenv()
 
     # Parse command line args
     # INTENTIONAL: adw-id is REQUIRED - we need it to find the worktree
-    if len(sys.argv) < 3:
+    if len(argv) < 3:
         print("Usage: uv run adw_document_iso.py <issue-number> <adw-id>")
         print("\nError: adw-id is required to locate the worktree")
         print("Run adw_plan_iso.py or adw_patch_iso.py first to create the worktree")
         sys.exit(1)
 
-    issue_number = sys.argv[1]
-    adw_id = sys.argv[2]
+    issue_number = argv[1]
+    adw_id = argv[2]
 
     # Try to load existing state
     temp_logger = setup_logger(adw_id, "adw_document_iso")
@@ -329,6 +331,7 @@ def main():
 
     # Set up logger with ADW ID from command line
     logger = setup_logger(adw_id, "adw_document_iso")
+    mark_phase_running(adw_id)
     logger.info(f"ADW Document Iso starting - ID: {adw_id}, Issue: {issue_number}")
 
     # Validate environment
@@ -0,0 +1,80 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = ["python-dotenv", "pydantic"]
+# ///
+
+"""
+ADW Merge Queue - Batch, test and merge queued ships to main
+
+Usage:
+  uv run adw_merge_queue.py run [--interval=<seconds>]
+  uv run adw_merge_queue.py status
+
+Commands:
+  run     Process the queue until it is empty. With --interval, keep running
+          and check for new requests every <seconds>.
+  status  Show queued, merged and failed ship requests.
+
+Ships enqueue themselves when ADW_MERGE_QUEUE=1 is set. Running this service
+is optional, because a waiting ship processes the queue when nothing else is.
+See adw_modules/merge_queue.py for how batches are validated.
+"""
+
+import sys
+import os
+import time
+from dotenv import load_dotenv
+
+# Add the parent directory to Python path to import modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from adw_modules.utils import setup_logger
+from adw_modules.merge_queue import list_requests, process_queue, get_batch_size
+
+
+def print_status() -> None:
+    """Print every request in the queue."""
+    requests = list_requests()
+    print(f"Merge queue: {len(requests)} request(s), batch size {get_batch_size()}")
+    for request in requests:
+        detail = request.merge_commit[:9] if request.merge_commit else ""
+        if request.status == "failed" and request.error:
+            detail = request.error.splitlines()[0]
+        print(
+            f"  {request.adw_id}  {request.status:<8} {request.branch_name}  "
+            f"{request.enqueued_at:%Y-%m-%d %H:%M}  {detail}"
+        )
+
+
+def main():
+    """Main entry point."""
+    load_dotenv()
+
+    if len(sys.argv) < 2 or sys.argv[1] not in ("run", "status"):
+        print("Usage: uv run adw_merge_queue.py run [--interval=<seconds>] | status")
+        sys.exit(1)
+
+    if sys.argv[1] == "status":
+        print_status()
+        return
+
+    interval = None
+    for arg in sys.argv[2:]:
+        if arg.startswith("--interval="):
+            try:
+                interval = float(arg.split("=", 1)[1])
+            except ValueError:
+                print("Usage: uv run adw_merge_queue.py run [--interval=<seconds>]")
+                sys.exit(1)
+
+    logger = setup_logger("_merge_queue", "adw_merge_queue")
+    while True:
+        batches = process_queue(logger)
+        if batches:
+            logger.info(f"Processed {batches} batch(es)")
+        if interval is None:
+            break
+        time.sleep(interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ import json
 import re
 import logging
 import time
+from functools import lru_cache
 from typing import Optional, List, Dict, Any, Tuple, Final
 from dotenv import load_dotenv
 from .data_types import (
@@ -144,8 +145,12 @@ def truncate_output(
     return output[:truncate_at] + suffix
 
 
+@lru_cache(maxsize=1)
 def check_claude_installed() -> Optional[str]:
-    """Check if Claude Code CLI is installed. Return error message if not."""
+    """Check if Claude Code CLI is installed. Return error message if not.
+
+    Cached per process so phases run in one process probe the CLI once.
+    """
     try:
         result = subprocess.run(
             [CLAUDE_PATH, "--version"], capture_output=True, text=True
@@ -328,8 +333,10 @@ def prompt_claude_code(request: AgentPromptRequest) -> AgentPromptResponse:
     cmd.extend(["--output-format", "stream-json"])
     cmd.append("--verbose")
     
-    # Check for MCP config in working directory
-    if request.working_dir:
+    # Check for MCP config in working directory (unless the request brings its own)
+    if request.mcp_config:
+        cmd.extend(["--mcp-config", request.mcp_config])
+    elif request.working_dir:
         mcp_config_path = os.path.join(request.working_dir, ".mcp.json")
         if os.path.exists(mcp_config_path):
             cmd.extend(["--mcp-config", mcp_config_path])
@@ -555,6 +562,7 @@ def execute_template(request: AgentTemplateRequest) -> AgentPromptResponse:
         dangerously_skip_permissions=True,
         output_file=output_file,
         working_dir=request.working_dir,  # Pass through working_dir
+        mcp_config=request.mcp_config,
     )
 
     # Execute with retry logic and return response (prompt_claude_code now handles all parsing)
@@ -0,0 +1,388 @@
+"""Keep a worktree's app servers running across test, resolution and review.
+
+The /test_e2e and /review agents need the worktree's backend and frontend
+running on the ports from .ports.env. Left to the agents, the servers are
+started, waited for and stopped again on every E2E attempt and every phase.
+ensure_app_running() instead starts each AppService once, in its own process
+group, detached so it outlives the phase that started it, and waits until
+its health URL answers. Later calls only check health:
+
+- The servers run in development mode (uvicorn --reload, Vite), so fixes
+  made by resolution agents are picked up without a restart.
+- A server that exited or stopped answering is restarted, and so is one
+  whose restart_on files (e.g. its lockfile) changed since it started.
+- A server already answering on its port when nothing is recorded is
+  adopted as is, and never stopped by the supervisor, but only if the
+  listening process runs inside the worktree (/proc/<pid>/cwd or lsof).
+  A server from anywhere else fails the call instead.
+
+stop_app() stops the servers. Composite workflows call it when they finish,
+adw_ship_iso.py after shipping, worktree GC before collecting a worktree and
+throwaway E2E worktrees when they are removed. The servers of each owner
+are recorded in agents/_apps/<owner>.json and log to
+agents/_apps/<owner>/<service>.log.
+
+Configuration (environment):
+    ADW_APP_SUPERVISOR      Start and keep app servers for E2E and review (default on)
+    ADW_APP_SERVICES_FILE   JSON list of AppService, relative to the worktree
+                            (default: app/server backend and app/client frontend)
+    ADW_APP_START_TIMEOUT   Seconds to wait for a server to answer (default 120)
+"""
+
+import os
+import json
+import time
+import signal
+import hashlib
+import logging
+import subprocess
+import urllib.error
+import urllib.request
+from typing import List, Optional, Tuple
+
+from adw_modules.data_types import AppProcess, AppServerState, AppService
+from adw_modules.test_runner import load_ports_env
+from adw_modules.utils import file_lock, get_safe_subprocess_env
+
+DEFAULT_APP_SERVICES = [
+    AppService(
+        name="backend",
+        command="uv run uvicorn server:app --reload --host 0.0.0.0 --port $BACKEND_PORT",
+        cwd="app/server",
+        port_var="BACKEND_PORT",
+        health_path="/api/health",
+        restart_on=["uv.lock", ".env"],
+    ),
+    AppService(
+        name="frontend",
+        command="bun run dev --port $FRONTEND_PORT --strictPort",
+        cwd="app/client",
+        port_var="FRONTEND_PORT",
+        health_path="/",
+        restart_on=["package.json", "bun.lock"],
+    ),
+]
+
+
+def get_project_root() -> str:
+    """Get the project root (parent of adws directory)."""
+    return os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+
+
+def is_app_supervisor_enabled() -> bool:
+    """Check whether app servers are started and kept for E2E and review."""
+    return os.getenv("ADW_APP_SUPERVISOR", "1").lower() not in ("0", "false", "no")
+
+
+def get_start_timeout() -> float:
+    """Get how long to wait for a started server to answer."""
+    return float(os.getenv("ADW_APP_START_TIMEOUT", "120"))
+
+
+def get_apps_dir() -> str:
+    """Get the directory holding app server state and logs."""
+    return os.path.join(get_project_root(), "agents", "_apps")
+
+
+def get_state_path(owner: str) -> str:
+    """Get the state file of an owner's app servers."""
+    return os.path.join(get_apps_dir(), f"{owner}.json")
+
+
+def get_app_services(worktree_path: str) -> List[AppService]:
+    """Get the app services that apply to a worktree.
+
+    Raises:
+        ValueError: If ADW_APP_SERVICES_FILE cannot be read
+    """
+    services = DEFAULT_APP_SERVICES
+    services_file = os.getenv("ADW_APP_SERVICES_FILE")
+    if services_file:
+        path = os.path.join(worktree_path, services_file)
+        try:
+            with open(path, "r") as f:
+                services = [AppService(**item) for item in json.load(f)]
+        except (OSError, ValueError, TypeError) as e:
+            raise ValueError(f"Cannot read app services from {path}: {e}")
+
+    return [s for s in services if os.path.isdir(os.path.join(worktree_path, s.cwd))]
+
+
+def load_state(owner: str) -> Optional[AppServerState]:
+    """Load the recorded app servers of an owner."""
+    try:
+        with open(get_state_path(owner), "r") as f:
+            return AppServerState(**json.load(f))
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def save_state(state: AppServerState) -> None:
+    """Record an owner's app servers (call with the owner's lock held)."""
+    os.makedirs(get_apps_dir(), exist_ok=True)
+    path = get_state_path(state.owner)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as f:
+        f.write(state.model_dump_json(indent=2))
+    os.replace(temp_path, path)
+
+
+def list_states() -> List[AppServerState]:
+    """Load the app server state of every owner."""
+    states = []
+    if not os.path.isdir(get_apps_dir()):
+        return states
+    for filename in sorted(os.listdir(get_apps_dir())):
+        if filename.endswith(".json"):
+            state = load_state(filename[: -len(".json")])
+            if state:
+                states.append(state)
+    return states
+
+
+def _owner_lock(owner: str):
+    os.makedirs(get_apps_dir(), exist_ok=True)
+    return file_lock(get_state_path(owner) + ".lock")
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        # Reap our own exited children, which otherwise linger as zombies
+        if os.waitpid(pid, os.WNOHANG)[0] == pid:
+            return False
+    except ChildProcessError:
+        pass
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def is_healthy(port: int, health_path: str) -> bool:
+    """Check whether a server answers on its health URL (any non-5xx response)."""
+    try:
+        with urllib.request.urlopen(
+            f"http://127.0.0.1:{port}{health_path}", timeout=2
+        ) as response:
+            return response.status < 500
+    except urllib.error.HTTPError as e:
+        return e.code < 500
+    except OSError:
+        return False
+
+
+def _listening_pids(port: int) -> List[int]:
+    try:
+        result = subprocess.run(
+            ["lsof", "-t", f"-iTCP:{port}", "-sTCP:LISTEN"], capture_output=True, text=True
+        )
+    except OSError:
+        return []
+    return [int(pid) for pid in result.stdout.split() if pid.isdigit()]
+
+
+def _process_cwd(pid: int) -> Optional[str]:
+    try:
+        return os.readlink(f"/proc/{pid}/cwd")
+    except OSError:
+        pass
+    try:
+        result = subprocess.run(
+            ["lsof", "-a", "-p", str(pid), "-d", "cwd", "-Fn"], capture_output=True, text=True
+        )
+    except OSError:
+        return None
+    for line in result.stdout.splitlines():
+        if line.startswith("n"):
+            return line[1:]
+    return None
+
+
+def _serves_worktree(port: int, worktree_path: str) -> bool:
+    """Check whether the process listening on a port runs inside a worktree.
+
+    Another worktree's server can answer on a reused port; adopting it would
+    run E2E tests and reviews against the wrong code.
+    """
+    root = os.path.realpath(worktree_path)
+    for pid in _listening_pids(port):
+        cwd = _process_cwd(pid)
+        if cwd and os.path.commonpath([root, os.path.realpath(cwd)]) == root:
+            return True
+    return False
+
+
+def _fingerprint(worktree_path: str, service: AppService) -> str:
+    digest = hashlib.sha256()
+    for name in service.restart_on:
+        digest.update(name.encode())
+        try:
+            with open(os.path.join(worktree_path, service.cwd, name), "rb") as f:
+                digest.update(f.read())
+        except OSError:
+            digest.update(b"-")
+    return digest.hexdigest()[:16]
+
+
+def _stop_process(process: AppProcess, logger: Optional[logging.Logger]) -> bool:
+    """Stop a server's process group; adopted servers are left alone."""
+    if not _pid_alive(process.pid):
+        return False
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except OSError:
+        return False
+    for _ in range(50):
+        if not _pid_alive(process.pid):
+            break
+        time.sleep(0.2)
+    else:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except OSError:
+            pass
+    if logger:
+        logger.info(f"Stopped {process.name} server on port {process.port} (pid {process.pid})")
+    return True
+
+
+def _start_process(
+    owner: str, worktree_path: str, service: AppService, port: int, env: dict
+) -> AppProcess:
+    log_dir = os.path.join(get_apps_dir(), owner)
+    os.makedirs(log_dir, exist_ok=True)
+    with open(os.path.join(log_dir, f"{service.name}.log"), "a") as log:
+        process = subprocess.Popen(
+            service.command,
+            shell=True,
+            cwd=os.path.join(worktree_path, service.cwd),
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+    return AppProcess(
+        name=service.name,
+        port=port,
+        pid=process.pid,
+        fingerprint=_fingerprint(worktree_path, service),
+    )
+
+
+def ensure_app_running(
+    owner: str, worktree_path: str, logger: logging.Logger
+) -> Tuple[bool, Optional[str]]:
+    """Make sure a worktree's app servers are running and answering.
+
+    Args:
+        owner: ADW ID (or throwaway worktree ID) the servers belong to
+        worktree_path: Worktree with the .ports.env to serve on
+        logger: Logger instance
+
+    Returns:
+        Tuple of (success, error message)
+    """
+    try:
+        services = get_app_services(worktree_path)
+    except ValueError as e:
+        return False, str(e)
+    if not services:
+        return True, None
+
+    ports_env = load_ports_env(worktree_path)
+    env = get_safe_subprocess_env()
+    env.update(ports_env)
+
+    with _owner_lock(owner):
+        state = load_state(owner)
+        if not state or state.worktree_path != worktree_path:
+            if state:
+                for process in state.processes:
+                    _stop_process(process, logger)
+            state = AppServerState(owner=owner, worktree_path=worktree_path)
+        recorded = {process.name: process for process in state.processes}
+
+        processes, waiting = [], []
+        for service in services:
+            if service.port_var not in ports_env:
+                return False, f"{service.port_var} missing from .ports.env"
+            port = int(ports_env[service.port_var])
+            process = recorded.get(service.name)
+
+            if process and process.port == port:
+                adopted = process.pid is None
+                current = process.fingerprint == _fingerprint(worktree_path, service)
+                if (
+                    (adopted and _serves_worktree(port, worktree_path))
+                    or (_pid_alive(process.pid) and current)
+                ) and is_healthy(port, service.health_path):
+                    processes.append(process)
+                    continue
+                if not current:
+                    logger.info(f"{service.name} dependencies changed, restarting it")
+            if process:
+                _stop_process(process, logger)
+
+            if is_healthy(port, service.health_path):
+                if not _serves_worktree(port, worktree_path):
+                    return False, (
+                        f"Port {port} for {service.name} is answered by a process "
+                        f"outside {worktree_path}"
+                    )
+                logger.info(f"{service.name} already running on port {port}, adopting it")
+                processes.append(
+                    AppProcess(
+                        name=service.name,
+                        port=port,
+                        fingerprint=_fingerprint(worktree_path, service),
+                    )
+                )
+                continue
+
+            logger.info(f"Starting {service.name} server on port {port}: {service.command}")
+            process = _start_process(owner, worktree_path, service, port, env)
+            processes.append(process)
+            waiting.append((service, process))
+
+        state.processes = processes
+        save_state(state)
+
+        deadline = time.monotonic() + get_start_timeout()
+        for service, process in waiting:
+            while not is_healthy(process.port, service.health_path):
+                if not _pid_alive(process.pid):
+                    return False, f"{service.name} server exited during startup (see {get_apps_dir()}/{owner}/{service.name}.log)"
+                if time.monotonic() > deadline:
+                    return False, f"{service.name} server did not answer within {get_start_timeout():.0f}s"
+                time.sleep(0.5)
+            logger.info(f"{service.name} server ready on port {process.port}")
+
+    return True, None
+
+
+def stop_app(owner: str, logger: Optional[logging.Logger] = None) -> int:
+    """Stop an owner's app servers and forget them.
+
+    Returns:
+        Number of servers stopped
+    """
+    if not os.path.exists(get_state_path(owner)):
+        return 0
+    with _owner_lock(owner):
+        state = load_state(owner)
+        stopped = 0
+        if state:
+            stopped = sum(1 for p in state.processes if _stop_process(p, logger))
+        try:
+            os.remove(get_state_path(owner))
+        except OSError:
+            pass
+    return stopped
@@ -0,0 +1,361 @@
+"""Warm Chromium instances shared by E2E and review agents.
+
+Every /test_e2e and /review agent used to launch its own Chromium through
+Playwright MCP, paying browser startup and a cold cache each time. The
+browser service (adw_browser_service.py serve) keeps ADW_BROWSER_INSTANCES
+headless Chromium processes running with remote debugging (CDP) enabled.
+
+Agents attach through acquire_browser(): the capture policy points their
+Playwright MCP server at the least busy instance with cdpEndpoint and
+--isolated, so each agent gets a fresh browser context in an already running
+browser. release_browser() detaches them.
+
+An instance is recycled (restarted with a fresh profile) once
+ADW_BROWSER_MAX_USES agents have attached to it and none is still attached,
+which bounds its memory. Crashed instances are restarted, and leases older
+than ADW_BROWSER_LEASE_TIMEOUT (agents that never detached) are dropped.
+When the service is not running, agents launch their own browser as before.
+
+Configuration (environment):
+    ADW_BROWSER_SERVICE        Attach agents to the service when it runs (default on)
+    ADW_BROWSER_INSTANCES      Warm browsers kept running (default 2)
+    ADW_BROWSER_MAX_USES       Attachments before a browser is recycled (default 50)
+    ADW_BROWSER_BASE_PORT      CDP port of the first browser (default 9222)
+    ADW_BROWSER_LEASE_TIMEOUT  Seconds before an attachment is dropped (default 3600)
+    ADW_CHROMIUM_PATH          Chromium executable (default: Playwright's, then PATH)
+"""
+
+import os
+import glob
+import json
+import time
+import shutil
+import signal
+import logging
+import subprocess
+import urllib.request
+from typing import List, Optional
+
+from adw_modules.data_types import BrowserInstance
+from adw_modules.utils import file_lock
+
+# Seconds to wait for a launched browser to accept CDP connections
+LAUNCH_TIMEOUT_SECONDS = 20
+
+CHROMIUM_GLOBS = [
+    "~/.cache/ms-playwright/chromium-*/chrome-linux/chrome",
+    "~/Library/Caches/ms-playwright/chromium-*/chrome-mac/Chromium.app/Contents/MacOS/Chromium",
+]
+CHROMIUM_COMMANDS = ["chromium", "chromium-browser", "google-chrome", "google-chrome-stable"]
+
+
+def get_project_root() -> str:
+    """Get the project root (parent of adws directory)."""
+    return os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+
+
+def get_service_dir() -> str:
+    """Get the directory holding the service state and browser profiles."""
+    return os.path.join(get_project_root(), "agents", "_browser")
+
+
+def get_state_path() -> str:
+    """Get the file listing the running browser instances."""
+    return os.path.join(get_service_dir(), "instances.json")
+
+
+def get_pid_path() -> str:
+    """Get the file holding the service process ID."""
+    return os.path.join(get_service_dir(), "service.pid")
+
+
+def is_browser_service_enabled() -> bool:
+    """Check whether agents attach to the browser service when it runs."""
+    return os.getenv("ADW_BROWSER_SERVICE", "1").lower() not in ("0", "false", "no")
+
+
+def get_instance_count() -> int:
+    """Get how many warm browsers the service keeps running."""
+    return max(1, int(os.getenv("ADW_BROWSER_INSTANCES", "2")))
+
+
+def get_max_uses() -> int:
+    """Get how many agents may attach to a browser before it is recycled."""
+    return max(1, int(os.getenv("ADW_BROWSER_MAX_USES", "50")))
+
+
+def get_base_port() -> int:
+    """Get the CDP port of the first browser."""
+    return int(os.getenv("ADW_BROWSER_BASE_PORT", "9222"))
+
+
+def get_lease_timeout() -> int:
+    """Get the seconds after which an attachment is considered abandoned."""
+    return int(os.getenv("ADW_BROWSER_LEASE_TIMEOUT", "3600"))
+
+
+def find_chromium() -> Optional[str]:
+    """Find a Chromium executable: ADW_CHROMIUM_PATH, Playwright's, then PATH."""
+    configured = os.getenv("ADW_CHROMIUM_PATH")
+    if configured:
+        return configured
+    for pattern in CHROMIUM_GLOBS:
+        matches = sorted(glob.glob(os.path.expanduser(pattern)))
+        if matches:
+            return matches[-1]
+    for command in CHROMIUM_COMMANDS:
+        path = shutil.which(command)
+        if path:
+            return path
+    return None
+
+
+def load_instances() -> List[BrowserInstance]:
+    """Load the browser instances recorded by the service."""
+    try:
+        with open(get_state_path(), "r") as f:
+            return [BrowserInstance(**item) for item in json.load(f)]
+    except (OSError, ValueError, TypeError):
+        return []
+
+
+def save_instances(instances: List[BrowserInstance]) -> None:
+    """Record the browser instances (call with the state lock held)."""
+    os.makedirs(get_service_dir(), exist_ok=True)
+    temp_path = get_state_path() + ".tmp"
+    with open(temp_path, "w") as f:
+        json.dump([json.loads(i.model_dump_json()) for i in instances], f, indent=2)
+    os.replace(temp_path, get_state_path())
+
+
+def _state_lock():
+    os.makedirs(get_service_dir(), exist_ok=True)
+    return file_lock(get_state_path() + ".lock")
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        # Reap our own exited children, which otherwise linger as zombies
+        if os.waitpid(pid, os.WNOHANG)[0] == pid:
+            return False
+    except ChildProcessError:
+        pass
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _cdp_ready(port: int) -> bool:
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/json/version", timeout=1) as r:
+            return r.status == 200
+    except OSError:
+        return False
+
+
+def _profile_dir(instance_id: str) -> str:
+    return os.path.join(get_service_dir(), "profiles", instance_id)
+
+
+def launch_browser(instance_id: str, port: int, logger: logging.Logger) -> BrowserInstance:
+    """Start a headless Chromium with CDP on port.
+
+    Raises:
+        RuntimeError: If Chromium is missing or does not come up
+    """
+    chromium = find_chromium()
+    if not chromium:
+        raise RuntimeError("No Chromium found (install Playwright's or set ADW_CHROMIUM_PATH)")
+
+    profile = _profile_dir(instance_id)
+    shutil.rmtree(profile, ignore_errors=True)
+    os.makedirs(profile, exist_ok=True)
+    process = subprocess.Popen(
+        [
+            chromium,
+            "--headless=new",
+            f"--remote-debugging-port={port}",
+            "--remote-debugging-address=127.0.0.1",
+            f"--user-data-dir={profile}",
+            "--no-first-run",
+            "--no-default-browser-check",
+            "--disable-dev-shm-usage",
+            "about:blank",
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+    deadline = time.monotonic() + LAUNCH_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            break
+        if _cdp_ready(port):
+            logger.info(f"Browser {instance_id} ready on port {port} (pid {process.pid})")
+            return BrowserInstance(instance_id=instance_id, port=port, pid=process.pid)
+        time.sleep(0.2)
+
+    process.kill()
+    raise RuntimeError(f"Browser {instance_id} did not accept CDP connections on port {port}")
+
+
+def stop_browser(instance: BrowserInstance, logger: logging.Logger) -> None:
+    """Stop a browser and delete its profile."""
+    if _pid_alive(instance.pid):
+        try:
+            os.killpg(instance.pid, signal.SIGTERM)
+        except OSError:
+            pass
+        for _ in range(25):
+            if not _pid_alive(instance.pid):
+                break
+            time.sleep(0.2)
+        else:
+            try:
+                os.killpg(instance.pid, signal.SIGKILL)
+            except OSError:
+                pass
+    shutil.rmtree(_profile_dir(instance.instance_id), ignore_errors=True)
+    logger.info(f"Stopped browser {instance.instance_id} after {instance.uses} use(s)")
+
+
+def acquire_browser(lease_id: str, logger: logging.Logger) -> Optional[str]:
+    """Attach an agent to the least busy warm browser.
+
+    Args:
+        lease_id: Attachment owner, e.g. "{adw_id}/{agent_name}"
+        logger: Logger instance
+
+    Returns:
+        CDP endpoint, or None if the service is disabled or has no browser free
+    """
+    if not is_browser_service_enabled():
+        return None
+
+    with _state_lock():
+        instances = load_instances()
+        candidates = [
+            i for i in instances if i.uses < get_max_uses() and _pid_alive(i.pid)
+        ]
+        if not candidates:
+            return None
+        instance = min(candidates, key=lambda i: (len(i.leases), i.uses))
+        instance.uses += 1
+        instance.leases[lease_id] = time.time()
+        save_instances(instances)
+
+    logger.debug(f"{lease_id} attached to browser {instance.instance_id}")
+    return instance.cdp_endpoint
+
+
+def release_browser(lease_id: str) -> None:
+    """Detach an agent from its browser (no-op if it was not attached)."""
+    if not os.path.exists(get_state_path()):
+        return
+    with _state_lock():
+        instances = load_instances()
+        changed = False
+        for instance in instances:
+            if instance.leases.pop(lease_id, None) is not None:
+                changed = True
+        if changed:
+            save_instances(instances)
+
+
+def maintain(logger: logging.Logger) -> None:
+    """One service pass: drop stale leases, recycle and (re)start browsers."""
+    now = time.time()
+    with _state_lock():
+        instances = load_instances()
+        keep, retire = [], []
+        for instance in instances:
+            instance.leases = {
+                lease: at
+                for lease, at in instance.leases.items()
+                if now - at < get_lease_timeout()
+            }
+            exhausted = instance.uses >= get_max_uses() and not instance.leases
+            if not _pid_alive(instance.pid) or exhausted:
+                retire.append(instance)
+            else:
+                keep.append(instance)
+        save_instances(keep)
+
+    for instance in retire:
+        stop_browser(instance, logger)
+
+    used_ports = {instance.port for instance in keep}
+    started = []
+    for index in range(get_instance_count()):
+        port = get_base_port() + index
+        if port in used_ports:
+            continue
+        try:
+            started.append(launch_browser(f"browser-{index}-{int(now)}", port, logger))
+        except RuntimeError as e:
+            logger.error(str(e))
+
+    if started:
+        with _state_lock():
+            instances = load_instances()
+            save_instances(instances + started)
+
+
+def stop_all(logger: logging.Logger) -> None:
+    """Stop every browser and clear the service state."""
+    with _state_lock():
+        instances = load_instances()
+        save_instances([])
+    for instance in instances:
+        stop_browser(instance, logger)
+
+
+def serve(logger: logging.Logger, interval_seconds: float = 2.0) -> None:
+    """Run the browser service until SIGTERM or SIGINT."""
+    os.makedirs(get_service_dir(), exist_ok=True)
+    with open(get_pid_path(), "w") as f:
+        f.write(str(os.getpid()))
+
+    running = True
+
+    def handle_stop(signum, frame):
+        nonlocal running
+        running = False
+
+    signal.signal(signal.SIGTERM, handle_stop)
+    signal.signal(signal.SIGINT, handle_stop)
+
+    logger.info(
+        f"Browser service: {get_instance_count()} browser(s) from port {get_base_port()}, "
+        f"recycled after {get_max_uses()} uses"
+    )
+    try:
+        while running:
+            maintain(logger)
+            time.sleep(interval_seconds)
+    finally:
+        stop_all(logger)
+        try:
+            os.remove(get_pid_path())
+        except OSError:
+            pass
+        logger.info("Browser service stopped")
+
+
+def get_service_pid() -> Optional[int]:
+    """Get the PID of the running service, if any."""
+    try:
+        with open(get_pid_path(), "r") as f:
+            pid = int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+    return pid if _pid_alive(pid) else None
@@ -0,0 +1,265 @@
+"""Browser capture policy for Playwright-driven E2E tests and review.
+
+playwright-mcp-config.json used to record 1920x1080 video of every browser
+context, which costs encoding CPU, slows the browser and leaves large files
+in the worktree. It no longer records anything; prepare_capture() writes a
+Playwright MCP config per agent instead, following ADW_CAPTURE_MODE:
+
+- "screenshots" (default): no video or trace. Agents still take the
+  screenshots their commands ask for, and passing runs have no recording
+  overhead.
+- "on_failure": video and trace are recorded, and finish_capture() keeps
+  them only when the test or review failed. Playwright MCP cannot trim a
+  recording, so the whole recording of a run is the unit kept or dropped.
+- "full": video and trace are recorded and always kept.
+
+Recordings go to agents/{adw_id}/{agent_name}/capture/ in the main project,
+not the worktree, at ADW_CAPTURE_RESOLUTION. Capture directories older than
+ADW_CAPTURE_RETENTION_DAYS are removed on the first capture of each process.
+
+In "screenshots" mode the agent attaches to a warm browser of the browser
+service (see browser_service.py) when it runs, instead of launching its own.
+Recording modes always launch a browser, which Playwright needs to record.
+
+Configuration (environment):
+    ADW_CAPTURE_MODE            screenshots, on_failure or full (default screenshots)
+    ADW_CAPTURE_RESOLUTION      Viewport and video size, WIDTHxHEIGHT (default 1920x1080)
+    ADW_CAPTURE_RETENTION_DAYS  Days recordings are kept (default 7)
+"""
+
+import os
+import copy
+import glob
+import json
+import time
+import shutil
+import logging
+import threading
+from typing import List, Optional, Tuple
+
+from adw_modules.browser_service import acquire_browser, release_browser
+from adw_modules.data_types import CaptureMode
+
+MCP_CONFIG_FILE = ".mcp.json"
+PLAYWRIGHT_CONFIG_FILE = "playwright-mcp-config.json"
+
+_pruned = False
+_prune_lock = threading.Lock()
+
+
+def get_project_root() -> str:
+    """Get the project root (parent of adws directory)."""
+    return os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+
+
+def get_capture_mode() -> CaptureMode:
+    """Get the configured capture mode."""
+    mode = os.getenv("ADW_CAPTURE_MODE", "screenshots").lower()
+    return mode if mode in ("full", "on_failure", "screenshots") else "screenshots"
+
+
+def get_capture_resolution() -> Tuple[int, int]:
+    """Get the viewport and video size as (width, height)."""
+    value = os.getenv("ADW_CAPTURE_RESOLUTION", "1920x1080")
+    try:
+        width, height = (int(part) for part in value.lower().split("x"))
+        return width, height
+    except ValueError:
+        return 1920, 1080
+
+
+def get_retention_days() -> float:
+    """Get how many days recordings are kept."""
+    return float(os.getenv("ADW_CAPTURE_RETENTION_DAYS", "7"))
+
+
+def get_agent_dir(adw_id: str, agent_name: str) -> str:
+    """Get the agent's output directory in the main project."""
+    return os.path.join(get_project_root(), "agents", adw_id, agent_name)
+
+
+def get_capture_dir(adw_id: str, agent_name: str) -> str:
+    """Get the directory an agent's videos and traces are written to."""
+    return os.path.join(get_agent_dir(adw_id, agent_name), "capture")
+
+
+def _load_json(*paths: str) -> Optional[dict]:
+    """Load the first of paths that exists and parses."""
+    for path in paths:
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            continue
+    return None
+
+
+def build_playwright_config(
+    base: dict,
+    mode: CaptureMode,
+    capture_dir: str,
+    resolution: Tuple[int, int],
+    cdp_endpoint: Optional[str] = None,
+) -> dict:
+    """Apply a capture mode and resolution to a Playwright MCP config.
+
+    With cdp_endpoint the agent attaches to that browser instead of launching one.
+    """
+    config = copy.deepcopy(base)
+    width, height = resolution
+    browser = config.setdefault("browser", {})
+    context = browser.setdefault("contextOptions", {})
+    context["viewport"] = {"width": width, "height": height}
+    if cdp_endpoint:
+        browser["cdpEndpoint"] = cdp_endpoint
+    else:
+        browser.pop("cdpEndpoint", None)
+
+    if mode == "screenshots":
+        context.pop("recordVideo", None)
+        config["saveTrace"] = False
+    else:
+        context["recordVideo"] = {
+            "dir": os.path.join(capture_dir, "videos"),
+            "size": {"width": width, "height": height},
+        }
+        config["saveTrace"] = True
+        config["outputDir"] = os.path.join(capture_dir, "traces")
+    return config
+
+
+def build_mcp_config(base: dict, playwright_config_path: str) -> dict:
+    """Point the Playwright MCP server of an MCP config at another config file.
+
+    The server also gets --isolated, so an agent attached to a shared browser
+    works in a fresh context rather than the browser's default one.
+    """
+    config = copy.deepcopy(base)
+    for server in config.get("mcpServers", {}).values():
+        args = server.get("args", [])
+        if not any("playwright" in str(arg) for arg in args):
+            continue
+        if "--config" in args:
+            args[args.index("--config") + 1] = playwright_config_path
+        else:
+            args.extend(["--config", playwright_config_path])
+        if "--isolated" not in args:
+            args.append("--isolated")
+        server["args"] = args
+    return config
+
+
+def prune_captures(logger: Optional[logging.Logger] = None) -> int:
+    """Remove capture directories older than the retention period.
+
+    Returns:
+        Number of directories removed
+    """
+    cutoff = time.time() - get_retention_days() * 86400
+    removed = 0
+    pattern = os.path.join(get_project_root(), "agents", "*", "*", "capture")
+    for path in glob.glob(pattern):
+        try:
+            if os.path.getmtime(path) < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+        except OSError:
+            continue
+    if removed and logger:
+        logger.info(f"Removed {removed} expired browser capture director(ies)")
+    return removed
+
+
+def _prune_once(logger: logging.Logger) -> None:
+    global _pruned
+    with _prune_lock:
+        if _pruned:
+            return
+        _pruned = True
+    prune_captures(logger)
+
+
+def _lease_id(adw_id: str, agent_name: str) -> str:
+    return f"{adw_id}/{agent_name}"
+
+
+def prepare_capture(
+    working_dir: str, adw_id: str, agent_name: str, logger: logging.Logger
+) -> Optional[str]:
+    """Write an agent's MCP config following the capture policy.
+
+    Returns:
+        Path of the MCP config to run the agent with, or None if the working
+        directory has no MCP config (the agent then runs without MCP servers)
+    """
+    _prune_once(logger)
+    base_mcp = _load_json(os.path.join(working_dir, MCP_CONFIG_FILE))
+    if base_mcp is None:
+        return None
+    base_playwright = _load_json(
+        os.path.join(working_dir, PLAYWRIGHT_CONFIG_FILE),
+        os.path.join(get_project_root(), PLAYWRIGHT_CONFIG_FILE),
+    ) or {"browser": {"browserName": "chromium", "launchOptions": {"headless": True}}}
+
+    mode = get_capture_mode()
+    agent_dir = get_agent_dir(adw_id, agent_name)
+    capture_dir = get_capture_dir(adw_id, agent_name)
+    shutil.rmtree(capture_dir, ignore_errors=True)
+    os.makedirs(capture_dir, exist_ok=True)
+
+    cdp_endpoint = None
+    if mode == "screenshots":
+        cdp_endpoint = acquire_browser(_lease_id(adw_id, agent_name), logger)
+
+    playwright_path = os.path.join(agent_dir, PLAYWRIGHT_CONFIG_FILE)
+    with open(playwright_path, "w") as f:
+        json.dump(
+            build_playwright_config(
+                base_playwright,
+                mode,
+                capture_dir,
+                get_capture_resolution(),
+                cdp_endpoint,
+            ),
+            f,
+            indent=2,
+        )
+
+    mcp_path = os.path.join(agent_dir, "mcp.json")
+    with open(mcp_path, "w") as f:
+        json.dump(build_mcp_config(base_mcp, playwright_path), f, indent=2)
+
+    logger.debug(
+        f"Browser capture for {agent_name}: {mode}"
+        + (f" (shared browser {cdp_endpoint})" if cdp_endpoint else "")
+    )
+    return mcp_path
+
+
+def finish_capture(
+    adw_id: str, agent_name: str, failed: bool, logger: logging.Logger
+) -> List[str]:
+    """Keep or drop an agent's recordings after its run.
+
+    Returns:
+        Paths of the recordings kept
+    """
+    release_browser(_lease_id(adw_id, agent_name))
+    capture_dir = get_capture_dir(adw_id, agent_name)
+    mode = get_capture_mode()
+    if mode == "on_failure" and not failed:
+        shutil.rmtree(capture_dir, ignore_errors=True)
+        return []
+
+    recordings = sorted(
+        os.path.join(dirpath, filename)
+        for dirpath, _, filenames in os.walk(capture_dir)
+        for filename in filenames
+    )
+    if not recordings:
+        shutil.rmtree(capture_dir, ignore_errors=True)
+    elif failed:
+        logger.info(f"Kept {len(recordings)} recording(s) of {agent_name} in {capture_dir}")
+    return recordings
@@ -1,7 +1,7 @@
 """Data types for GitHub API responses and Claude Code agent."""
 
 from datetime import datetime
-from typing import Optional, List, Literal
+from typing import Optional, List, Literal, Dict, Any
 from pydantic import BaseModel, Field
 from enum import Enum
 
@@ -154,6 +154,7 @@ class AgentPromptRequest(BaseModel):
     dangerously_skip_permissions: bool = False
     output_file: str
     working_dir: Optional[str] = None
+    mcp_config: Optional[str] = None  # Overrides the working directory's .mcp.json
 
 
 class AgentPromptResponse(BaseModel):
@@ -174,6 +175,7 @@ class AgentTemplateRequest(BaseModel):
     adw_id: str
     model: Literal["sonnet", "opus"] = "sonnet"
     working_dir: Optional[str] = None
+    mcp_config: Optional[str] = None  # Overrides the working directory's .mcp.json
 
 
 class ClaudeCodeResultMessage(BaseModel):
@@ -198,6 +200,43 @@ class TestResult(BaseModel):
     execution_command: str
     test_purpose: str
     error: Optional[str] = None
+    duration_seconds: Optional[float] = None  # Set by the native test runner
+
+
+# Browser capture during E2E tests and review (see capture_policy.py)
+CaptureMode = Literal["full", "on_failure", "screenshots"]
+
+# How the native test runner reads a command's results
+TestReportFormat = Literal["exit_code", "junit", "json"]
+
+
+class TestCommand(BaseModel):
+    """Test command run directly by the native test runner.
+
+    `{report}` in command is replaced with the path the report is written to.
+    `{test}` in rerun_command is replaced with a test ID from the report.
+    `{tests}` in select_command is replaced with the test files to run.
+    """
+
+    name: str
+    command: str
+    cwd: str = "."  # Relative to the worktree; skipped if missing
+    purpose: str = ""
+    report: TestReportFormat = "exit_code"
+    rerun_command: Optional[str] = None  # Command that runs a single test
+    test_glob: Optional[str] = None  # Python test files, relative to cwd (enables test impact)
+    select_command: Optional[str] = None  # Command that runs only some test files
+
+
+class TestSelection(BaseModel):
+    """Tests affected by a change, chosen by the test impact analyser."""
+
+    full: bool = True  # Run everything (other fields are ignored)
+    reason: str = ""
+    changed_files: List[str] = []
+    # Command name -> test files to run (relative to its cwd), None for the whole command
+    commands: Dict[str, Optional[List[str]]] = {}
+    e2e_tests: List[str] = []  # E2E test files to run (relative to the worktree)
 
 
 class E2ETestResult(BaseModel):
@@ -207,6 +246,7 @@ class E2ETestResult(BaseModel):
     status: Literal["passed", "failed"]
     test_path: str  # Path to the test file for re-execution
     screenshots: List[str] = []
+    recordings: List[str] = []  # Browser videos/traces kept by the capture policy
     error: Optional[str] = None
 
     @property
@@ -232,6 +272,9 @@ class ADWStateData(BaseModel):
     frontend_port: Optional[int] = None
     model_set: Optional[ModelSet] = "base"  # Default to "base" model set
     all_adws: List[str] = Field(default_factory=list)
+    pr_number: Optional[str] = None
+    pr_url: Optional[str] = None
+    last_pushed_commit: Optional[str] = None  # HEAD at the last successful push
 
 
 class ReviewIssue(BaseModel):
@@ -261,6 +304,8 @@ class ReviewResult(BaseModel):
     screenshot_urls: List[str] = (
         []
     )  # Public URLs after upload, indexed-aligned with screenshots
+    recordings: List[str] = []  # Browser videos/traces kept by the capture policy
+    recording_urls: List[str] = []  # Public URLs of uploaded recordings
 
 
 class DocumentationResult(BaseModel):
@@ -272,6 +317,216 @@ class DocumentationResult(BaseModel):
     error_message: Optional[str] = None
 
 
+# Phase lifecycle statuses recorded in the phase journal
+PhaseStatus = Literal["started", "completed", "failed"]
+
+
+class PhaseJournalEntry(BaseModel):
+    """Single append-only record of a workflow phase run.
+
+    Stored as one JSON line in agents/{adw_id}/phase_journal.jsonl
+    """
+
+    phase: str  # e.g., "plan", "build", "test"
+    status: PhaseStatus
+    args: List[str] = []  # Extra CLI flags the phase was run with
+    input_tree: Optional[str] = None  # Worktree tree hash when the phase started
+    output_tree: Optional[str] = None  # Worktree tree hash when the phase finished
+    outputs: Dict[str, Any] = {}  # ADW state snapshot after the phase finished
+    duration_seconds: Optional[float] = None
+    pid: Optional[int] = None  # Process running the phase (on "started" entries)
+    recorded_at: datetime = Field(default_factory=datetime.now)
+
+
+class PhaseSpec(BaseModel):
+    """Declarative description of one phase in a workflow DAG."""
+
+    name: str  # Phase name used in the phase journal (e.g., "build")
+    script: str  # Phase script in adws/ whose main() runs the phase
+    args: List[str] = []  # Extra CLI flags passed to the phase
+    depends_on: List[str] = []  # Phases that must finish before this one
+    header: Optional[str] = None  # Banner printed before the phase runs
+    allow_failure: bool = False  # Keep running dependents if this phase fails
+    finalize_before: bool = False  # Push and update the PR before running
+    commit_paths: List[str] = []  # Paths it commits while running in parallel with siblings
+
+
+class PhaseInput(BaseModel):
+    """Typed input of a phase run."""
+
+    issue_number: str
+    adw_id: str
+    args: List[str] = []
+
+    def to_argv(self, script: str) -> List[str]:
+        """Build the command line the phase's main() expects."""
+        return [script, self.issue_number, self.adw_id] + self.args
+
+
+class PhaseResult(BaseModel):
+    """Typed outcome of a phase run."""
+
+    phase: str
+    status: Literal["completed", "failed", "skipped"]
+    exit_code: int = 0
+    duration_seconds: float = 0.0
+    output_tree: Optional[str] = None  # Worktree tree hash after the phase
+    error: Optional[str] = None
+
+
+class PhaseCacheEntry(BaseModel):
+    """Parsed results of a successful phase run, replayed for unchanged code.
+
+    Stored in agents/_cache/phase_results/{phase}-{key}.json
+    """
+
+    phase: str
+    tree_hash: str  # Worktree tree the results were produced on
+    spec_hash: Optional[str] = None  # Spec file contents the phase ran against
+    model_set: ModelSet = "base"
+    args: List[str] = []  # Flags that change what the phase does (e.g., --skip-e2e)
+    results: Dict[str, Any] = {}  # Phase-specific parsed results
+    adw_id: Optional[str] = None  # ADW that produced the results
+    created_at: datetime = Field(default_factory=datetime.now)
+
+
+# Capacity a pipeline phase occupies while it runs
+SlotClass = Literal["heavy", "light", "none"]
+
+
+class PipelinePhaseRun(BaseModel):
+    """One phase of one ADW as scheduled by the pipeline scheduler."""
+
+    adw_id: str
+    issue_number: str
+    phase: str
+    slot_class: SlotClass
+    status: Literal["completed", "failed", "skipped"]
+    ready_at: datetime  # All dependencies finished
+    started_at: datetime
+    finished_at: datetime
+
+
+class PipelineReport(BaseModel):
+    """Backlog-level throughput of a pipeline run.
+
+    Stored in agents/_pipeline/{run_id}.json
+    """
+
+    run_id: str
+    workflow: str
+    slots: Dict[str, int] = {}  # Slot limit per class ("heavy", "light", "worktrees")
+    started_at: datetime
+    finished_at: datetime
+    wall_seconds: float = 0.0
+    serial_seconds: float = 0.0  # Sum of phase run times (time one-by-one runs would take)
+    completed_adws: List[str] = []
+    failed_adws: List[str] = []
+    slot_utilisation: Dict[str, float] = {}  # Busy fraction of each slot class
+    mean_wait_seconds: Dict[str, float] = {}  # Mean ready-to-start wait per slot class
+    runs: List[PipelinePhaseRun] = []
+
+
+# Lifecycle of a pre-warmed worktree in the pool
+PoolSlotStatus = Literal["filling", "ready", "claimed"]
+
+
+class WorktreePoolSlot(BaseModel):
+    """Pre-warmed worktree waiting in the pool.
+
+    Stored in trees/_pool/{slot_id}.json next to the slot worktree.
+    """
+
+    slot_id: str
+    status: PoolSlotStatus = "filling"
+    worktree_path: str
+    base_commit: Optional[str] = None  # origin/main commit the slot was created from
+    lockfile_hash: Optional[str] = None  # Dependency lockfiles the install matches
+    backend_port: Optional[int] = None
+    frontend_port: Optional[int] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+
+
+class BrowserInstance(BaseModel):
+    """Warm Chromium kept running by the browser service.
+
+    Stored in agents/_browser/instances.json.
+    """
+
+    instance_id: str
+    port: int  # Remote debugging (CDP) port
+    pid: Optional[int] = None
+    uses: int = 0  # Agents attached since the browser started
+    leases: Dict[str, float] = {}  # Attached agent -> time it attached
+    started_at: datetime = Field(default_factory=datetime.now)
+
+    @property
+    def cdp_endpoint(self) -> str:
+        """URL agents attach to."""
+        return f"http://127.0.0.1:{self.port}"
+
+
+class AppService(BaseModel):
+    """Long-running app server the supervisor keeps up for a worktree."""
+
+    name: str
+    command: str  # Shell command; the .ports.env variables are set
+    cwd: str = "."  # Relative to the worktree; skipped if missing
+    port_var: str  # .ports.env variable with the port it listens on
+    health_path: str = "/"
+    restart_on: List[str] = []  # Files (relative to cwd) whose change needs a restart
+
+
+class AppProcess(BaseModel):
+    """App server started (or found running) by the supervisor."""
+
+    name: str
+    port: int
+    pid: Optional[int] = None  # None if it was already running and not started by us
+    fingerprint: str = ""  # Hash of the service's restart_on files at start
+    started_at: datetime = Field(default_factory=datetime.now)
+
+
+class AppServerState(BaseModel):
+    """App servers of one worktree, stored in agents/_apps/<owner>.json."""
+
+    owner: str  # ADW ID, or throwaway worktree ID
+    worktree_path: str
+    processes: List[AppProcess] = []
+
+
+class WorktreeInfo(BaseModel):
+    """Linked git worktree as recorded in .git/worktrees/<name>/."""
+
+    name: str  # Admin directory name under .git/worktrees/
+    path: str  # Absolute worktree path
+    head: Optional[str] = None  # Commit SHA when detached
+    branch: Optional[str] = None  # Branch name when on a branch
+    locked: bool = False
+    prunable: bool = False  # Worktree directory no longer exists
+
+
+# Lifecycle of a ship request in the merge queue
+MergeQueueStatus = Literal["pending", "testing", "merged", "failed"]
+
+
+class MergeQueueRequest(BaseModel):
+    """Ship request waiting in the merge queue.
+
+    Stored in agents/_merge_queue/{adw_id}.json.
+    """
+
+    adw_id: str
+    branch_name: str
+    branch_commit: str  # Branch head when the ship was requested
+    status: MergeQueueStatus = "pending"
+    merge_commit: Optional[str] = None  # main commit that includes the branch
+    batch_size: Optional[int] = None  # Size of the batch it was merged with
+    error: Optional[str] = None
+    enqueued_at: datetime = Field(default_factory=datetime.now)
+    finished_at: Optional[datetime] = None
+
+
 class ADWExtractionResult(BaseModel):
     """Result from extracting ADW information from text."""
     
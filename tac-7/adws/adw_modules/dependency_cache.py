@@ -0,0 +1,220 @@
+"""Content-addressed dependency cache for isolated worktrees.
+
+Installed environments (the server .venv, the client node_modules) are
+stored once under trees/.dep_cache/<name>-<lockfile hash>/ and materialised
+into new worktrees by reflink (copy-on-write) where the filesystem supports
+it, falling back to a plain copy. Hardlinks are never used: a package
+manager writing in place inside one worktree would corrupt the cache entry
+and every other worktree sharing it. /install_worktree then finds
+dependencies already in place and only has to verify them.
+"""
+
+import os
+import sys
+import time
+import shutil
+import hashlib
+import logging
+import subprocess
+from typing import List, Tuple
+
+# (cache name, lockfile, environment directory) relative to the worktree root.
+# The first lockfile found for a given environment directory wins.
+DEPENDENCY_ENVIRONMENTS: List[Tuple[str, str, str]] = [
+    ("server-venv", "app/server/uv.lock", "app/server/.venv"),
+    ("client-node-modules", "app/client/bun.lock", "app/client/node_modules"),
+    ("client-node-modules", "app/client/package-lock.json", "app/client/node_modules"),
+]
+
+# Lockfiles whose contents determine the installed dependencies of a worktree
+DEPENDENCY_LOCKFILES = [lockfile for _, lockfile, _ in DEPENDENCY_ENVIRONMENTS]
+
+
+def get_cache_dir() -> str:
+    """Get the cache directory (on the same filesystem as trees/ for reflinks)."""
+    project_root = os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    return os.path.join(project_root, "trees", ".dep_cache")
+
+
+def get_max_entries() -> int:
+    """Get how many cached versions to keep per environment."""
+    return int(os.getenv("ADW_DEP_CACHE_MAX_ENTRIES", "3"))
+
+
+def _find_environments(worktree_path: str) -> List[Tuple[str, str, str]]:
+    """Resolve which environments apply to a worktree (first lockfile per env dir)."""
+    found = []
+    seen_env_dirs = set()
+    for name, lockfile, env_dir in DEPENDENCY_ENVIRONMENTS:
+        if env_dir in seen_env_dirs:
+            continue
+        if os.path.exists(os.path.join(worktree_path, lockfile)):
+            found.append((name, lockfile, env_dir))
+            seen_env_dirs.add(env_dir)
+    return found
+
+
+def get_cache_key(worktree_path: str, name: str, lockfile: str) -> str:
+    """Build the cache key from the lockfile contents and platform."""
+    digest = hashlib.sha256()
+    digest.update(sys.platform.encode())
+    with open(os.path.join(worktree_path, lockfile), "rb") as f:
+        digest.update(f.read())
+    return f"{name}-{digest.hexdigest()[:16]}"
+
+
+def _reflink_copy(src: str, dst: str) -> bool:
+    """Copy a tree using copy-on-write clones. Returns False if unsupported."""
+    if sys.platform == "darwin":
+        cmd = ["cp", "-cR", src, dst]
+    else:
+        cmd = ["cp", "-R", "--reflink=always", src, dst]
+
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        shutil.rmtree(dst, ignore_errors=True)
+        return False
+    return True
+
+
+def _materialise_tree(src: str, dst: str) -> str:
+    """Copy src to dst with the cheapest available independent copy.
+
+    Returns:
+        The strategy used: "reflink" or "copy"
+    """
+    if _reflink_copy(src, dst):
+        return "reflink"
+    shutil.copytree(src, dst, symlinks=True)
+    return "copy"
+
+
+def _is_relocatable_venv(venv_path: str) -> bool:
+    """Check whether a venv can be moved (uv venv --relocatable)."""
+    cfg_path = os.path.join(venv_path, "pyvenv.cfg")
+    if not os.path.exists(cfg_path):
+        return False
+    with open(cfg_path, "r") as f:
+        return any(
+            line.replace(" ", "").strip().lower() == "relocatable=true" for line in f
+        )
+
+
+def prepare_relocatable_venv(worktree_path: str) -> None:
+    """Create the server venv as relocatable so it can be cached and moved.
+
+    Console scripts in a regular venv hard-code its absolute path, which
+    breaks once the venv is materialised into another worktree.
+    """
+    server_dir = os.path.join(worktree_path, "app", "server")
+    if os.path.isdir(server_dir) and not os.path.exists(
+        os.path.join(server_dir, ".venv")
+    ):
+        subprocess.run(
+            ["uv", "venv", "--relocatable", ".venv"],
+            capture_output=True,
+            text=True,
+            cwd=server_dir,
+        )
+
+
+def materialise_dependencies(worktree_path: str, logger: logging.Logger) -> List[str]:
+    """Populate a new worktree's dependency directories from the cache.
+
+    Environments without a cache entry, or already present in the worktree,
+    are left alone.
+
+    Returns:
+        Names of the environments restored from the cache
+    """
+    restored = []
+    for name, lockfile, env_dir in _find_environments(worktree_path):
+        target = os.path.join(worktree_path, env_dir)
+        if os.path.exists(target):
+            continue
+
+        key = get_cache_key(worktree_path, name, lockfile)
+        entry = os.path.join(get_cache_dir(), key)
+        if not os.path.isdir(entry):
+            logger.debug(f"Dependency cache miss for {key}")
+            continue
+
+        start_time = time.time()
+        strategy = _materialise_tree(entry, target)
+        # Touch the entry so pruning keeps recently used environments
+        os.utime(entry)
+        logger.info(
+            f"Restored {env_dir} from dependency cache via {strategy} "
+            f"in {time.time() - start_time:.1f}s"
+        )
+        restored.append(name)
+
+    return restored
+
+
+def populate_dependency_cache(worktree_path: str, logger: logging.Logger) -> List[str]:
+    """Store a worktree's installed environments in the cache.
+
+    Entries are written to a temp directory and renamed into place so
+    concurrent populators never expose a partial entry.
+
+    Returns:
+        Names of the environments added to the cache
+    """
+    cache_dir = get_cache_dir()
+    os.makedirs(cache_dir, exist_ok=True)
+
+    added = []
+    for name, lockfile, env_dir in _find_environments(worktree_path):
+        source = os.path.join(worktree_path, env_dir)
+        if not os.path.isdir(source):
+            continue
+        if name == "server-venv" and not _is_relocatable_venv(source):
+            logger.debug(f"Not caching {env_dir}: venv is not relocatable")
+            continue
+
+        key = get_cache_key(worktree_path, name, lockfile)
+        entry = os.path.join(cache_dir, key)
+        if os.path.exists(entry):
+            continue
+
+        temp_entry = f"{entry}.tmp-{os.getpid()}"
+        try:
+            _materialise_tree(source, temp_entry)
+            os.rename(temp_entry, entry)
+            logger.info(f"Cached {env_dir} as {key}")
+            added.append(name)
+        except OSError as e:
+            # Another process populated the same key first, or the copy failed
+            logger.debug(f"Skipped caching {key}: {e}")
+            shutil.rmtree(temp_entry, ignore_errors=True)
+
+    prune_dependency_cache(logger)
+    return added
+
+
+def prune_dependency_cache(logger: logging.Logger) -> int:
+    """Remove all but the most recently used entries for each environment.
+
+    Returns:
+        Number of entries removed
+    """
+    cache_dir = get_cache_dir()
+    if not os.path.isdir(cache_dir):
+        return 0
+
+    removed = 0
+    for name in {name for name, _, _ in DEPENDENCY_ENVIRONMENTS}:
+        entries = [
+            os.path.join(cache_dir, entry)
+            for entry in os.listdir(cache_dir)
+            if entry.startswith(f"{name}-") and ".tmp-" not in entry
+        ]
+        entries.sort(key=os.path.getmtime, reverse=True)
+        for stale_entry in entries[get_max_entries():]:
+            shutil.rmtree(stale_entry, ignore_errors=True)
+            logger.info(f"Pruned dependency cache entry {os.path.basename(stale_entry)}")
+            removed += 1
+    return removed
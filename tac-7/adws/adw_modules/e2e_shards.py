@@ -0,0 +1,270 @@
+"""Run E2E tests in parallel shards.
+
+A single /test_e2e agent runs the E2E tests one after another, so E2E wall
+time is the sum of every test. run_sharded_e2e_tests() instead gives each
+.claude/commands/e2e/*.md test its own /test_e2e agent and runs up to
+ADW_E2E_SHARDS of them at once, so wall time falls roughly linearly with
+the shard count:
+
+- Every agent starts its own Playwright MCP server, which runs with
+  --isolated, so each test has its own browser context. Its screenshots go
+  to agents/{adw_id}/{agent_name}/, which is unique per test and attempt.
+- Tests running alongside others could see each other's app data, so by
+  default each one runs in a throwaway worktree with its own port pair and
+  app instance, checked out from a snapshot of the ADW worktree. Its
+  screenshots are copied back before the worktree is removed. Read-only
+  tests listed in ADW_E2E_SHARED_TESTS, and every test when only one shard
+  runs, use the ADW worktree's app instead, which the app supervisor keeps
+  running (see app_supervisor.py).
+- Browser video and trace capture follows ADW_CAPTURE_MODE (see
+  capture_policy.py); recordings kept for a test are listed in its result.
+- By default no new test starts once one has failed (tests already running
+  finish). With ADW_E2E_RUN_ALL every test runs and every result is reported.
+
+Configuration (environment):
+    ADW_E2E_SHARDS          E2E agents running at once (default 4, 1 = sequential)
+    ADW_E2E_SHARED_TESTS    Comma-separated name patterns of read-only tests
+                            that may share the ADW worktree's app (e.g. "*view*,*search*")
+    ADW_E2E_RUN_ALL         Run every test even after a failure (default off)
+"""
+
+import os
+import glob
+import shutil
+import fnmatch
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from adw_modules.agent import execute_template
+from adw_modules.app_supervisor import ensure_app_running, is_app_supervisor_enabled
+from adw_modules.capture_policy import finish_capture, prepare_capture
+from adw_modules.data_types import AgentTemplateRequest, E2ETestResult
+from adw_modules.resolver_worktrees import (
+    create_throwaway_worktree,
+    remove_throwaway_worktree,
+    snapshot_worktree,
+)
+from adw_modules.test_runner import load_ports_env
+from adw_modules.utils import parse_json
+
+# E2E test files, relative to the worktree
+E2E_TESTS_GLOB = os.path.join(".claude", "commands", "e2e", "*.md")
+
+
+def get_e2e_shards() -> int:
+    """Get how many E2E agents may run at once."""
+    return max(1, int(os.getenv("ADW_E2E_SHARDS", "4")))
+
+
+def is_run_all_enabled() -> bool:
+    """Check whether every E2E test runs even after a failure."""
+    return os.getenv("ADW_E2E_RUN_ALL", "").lower() in ("1", "true", "yes")
+
+
+def get_shared_patterns() -> List[str]:
+    """Get the name patterns of read-only tests that may share the ADW's app."""
+    value = os.getenv("ADW_E2E_SHARED_TESTS", "")
+    return [pattern.strip() for pattern in value.split(",") if pattern.strip()]
+
+
+def find_e2e_tests(worktree_path: str) -> List[str]:
+    """Find the E2E test files of a worktree (paths relative to it)."""
+    paths = glob.glob(os.path.join(worktree_path, E2E_TESTS_GLOB))
+    return sorted(os.path.relpath(path, worktree_path) for path in paths)
+
+
+def _test_name(test_file: str) -> str:
+    return os.path.splitext(os.path.basename(test_file))[0]
+
+
+def needs_isolation(test_file: str, shards: int) -> bool:
+    """Check whether a test needs its own app and ports.
+
+    Any test may change app data, so only tests marked read-only share the
+    ADW's app while other tests run. A single shard runs tests one at a time
+    and never needs isolation.
+    """
+    if shards <= 1:
+        return False
+    name = _test_name(test_file)
+    return not any(fnmatch.fnmatch(name, pattern) for pattern in get_shared_patterns())
+
+
+def get_application_url(worktree_path: str) -> Optional[str]:
+    """Get the frontend URL of a worktree from its .ports.env."""
+    frontend_port = load_ports_env(worktree_path).get("FRONTEND_PORT")
+    return f"http://localhost:{frontend_port}" if frontend_port else None
+
+
+def _keep_screenshots(
+    result: E2ETestResult, path: str, worktree_path: str
+) -> E2ETestResult:
+    """Copy screenshots out of a throwaway worktree into the ADW worktree."""
+    kept = []
+    for screenshot in result.screenshots:
+        source = screenshot if os.path.isabs(screenshot) else os.path.join(path, screenshot)
+        relative = os.path.relpath(source, path)
+        if relative.startswith(".."):
+            kept.append(screenshot)
+            continue
+        target = os.path.join(worktree_path, relative)
+        if os.path.exists(source):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copy2(source, target)
+        kept.append(target)
+    return result.model_copy(update={"screenshots": kept})
+
+
+def run_e2e_test(
+    test_file: str,
+    agent_name: str,
+    adw_id: str,
+    working_dir: str,
+    logger: logging.Logger,
+) -> E2ETestResult:
+    """Run one E2E test file with its own /test_e2e agent."""
+    test_name = _test_name(test_file)
+    logger.info(f"Running E2E test {test_name} ({agent_name})")
+    result = _execute_e2e_test(test_file, agent_name, adw_id, working_dir, logger)
+    recordings = finish_capture(adw_id, agent_name, not result.passed, logger)
+    return result.model_copy(update={"recordings": recordings})
+
+
+def _execute_e2e_test(
+    test_file: str,
+    agent_name: str,
+    adw_id: str,
+    working_dir: str,
+    logger: logging.Logger,
+) -> E2ETestResult:
+    test_name = _test_name(test_file)
+
+    args = [adw_id, agent_name, test_file]
+    application_url = get_application_url(working_dir)
+    if application_url:
+        args.append(application_url)
+
+    response = execute_template(
+        AgentTemplateRequest(
+            agent_name=agent_name,
+            slash_command="/test_e2e",
+            args=args,
+            adw_id=adw_id,
+            working_dir=working_dir,
+            mcp_config=prepare_capture(working_dir, adw_id, agent_name, logger),
+        )
+    )
+    if not response.success:
+        return E2ETestResult(
+            test_name=test_name,
+            status="failed",
+            test_path=test_file,
+            error=f"Test execution error: {response.output}",
+        )
+
+    try:
+        data = parse_json(response.output)
+        if isinstance(data, list) and data:
+            data = data[0]
+        return E2ETestResult(
+            test_name=data.get("test_name", test_name),
+            status=data.get("status", "failed"),
+            test_path=test_file,
+            screenshots=data.get("screenshots", []),
+            error=data.get("error"),
+        )
+    except Exception as e:
+        return E2ETestResult(
+            test_name=test_name,
+            status="failed",
+            test_path=test_file,
+            error=f"Result parsing error: {e}",
+        )
+
+
+def run_sharded_e2e_tests(
+    adw_id: str,
+    worktree_path: str,
+    agent_prefix: str,
+    attempt: int,
+    logger: logging.Logger,
+    test_files: Optional[List[str]] = None,
+) -> List[E2ETestResult]:
+    """Run the E2E tests of the worktree, ADW_E2E_SHARDS at a time.
+
+    Args:
+        adw_id: ADW ID
+        worktree_path: ADW worktree
+        agent_prefix: Agent name prefix; agents are named
+            {agent_prefix}_{attempt - 1}_{index}
+        attempt: Attempt number, so reruns get fresh agent directories
+        logger: Logger instance
+        test_files: Tests to run (default: every E2E test of the worktree)
+
+    Returns:
+        Results in test file order. Without ADW_E2E_RUN_ALL, tests that were
+        not started because of an earlier failure are left out.
+    """
+    if test_files is None:
+        test_files = find_e2e_tests(worktree_path)
+    run_all = is_run_all_enabled()
+    shards = min(get_e2e_shards(), len(test_files)) or 1
+    logger.info(
+        f"Running {len(test_files)} E2E tests in {shards} shard(s)"
+        + (" (run all)" if run_all else "")
+    )
+
+    failed = threading.Event()
+    snapshot_lock = threading.Lock()
+    snapshot: List[str] = []
+
+    def get_snapshot() -> str:
+        with snapshot_lock:
+            if not snapshot:
+                snapshot.append(snapshot_worktree(worktree_path)[0])
+            return snapshot[0]
+
+    def run(index: int, test_file: str) -> Optional[E2ETestResult]:
+        if failed.is_set() and not run_all:
+            return None
+        agent_name = f"{agent_prefix}_{attempt - 1}_{index}"
+
+        if not needs_isolation(test_file, shards):
+            result = run_e2e_test(test_file, agent_name, adw_id, worktree_path, logger)
+        else:
+            try:
+                worktree_id, path = create_throwaway_worktree(
+                    worktree_path, get_snapshot(), logger, prefix="e2e"
+                )
+            except RuntimeError as e:
+                result = E2ETestResult(
+                    test_name=_test_name(test_file),
+                    status="failed",
+                    test_path=test_file,
+                    error=f"Cannot create isolated worktree: {e}",
+                )
+            else:
+                try:
+                    if is_app_supervisor_enabled():
+                        ensure_app_running(worktree_id, path, logger)
+                    result = run_e2e_test(test_file, agent_name, adw_id, path, logger)
+                    result = _keep_screenshots(result, path, worktree_path)
+                finally:
+                    remove_throwaway_worktree(worktree_id, path, worktree_path, logger)
+
+        if not result.passed:
+            logger.info(f"E2E test failed: {result.test_name}")
+            failed.set()
+        return result
+
+    with ThreadPoolExecutor(max_workers=shards) as executor:
+        outcomes = list(
+            executor.map(lambda item: run(*item), enumerate(test_files))
+        )
+
+    skipped = sum(1 for result in outcomes if result is None)
+    if skipped:
+        logger.info(f"Skipped {skipped} E2E test(s) after a failure")
+    return [result for result in outcomes if result is not None]
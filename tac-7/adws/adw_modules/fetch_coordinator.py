@@ -0,0 +1,123 @@
+"""Single-flight, TTL-bounded git fetch coordinator.
+
+Concurrent ADWs share one clone, so unsynchronised `git fetch origin` calls
+contend on the same .git lock files and repeat the same network transfer.
+fetch_origin() funnels them through one file lock:
+
+- If every requested ref was fetched within the freshness TTL, nothing runs.
+- Otherwise the caller waits for the lock. If another process completed a
+  fetch of those refs after this caller asked, that result is reused
+  (single-flight); only the first caller actually fetches.
+- Only the requested refs are fetched, not every branch on the remote.
+
+Configuration (environment):
+    ADW_FETCH_TTL_SECONDS  Freshness window in seconds (default 30)
+"""
+
+import os
+import re
+import time
+import logging
+import subprocess
+from typing import List, Optional, Tuple
+
+from adw_modules.utils import file_lock
+
+
+def get_project_root() -> str:
+    """Get the project root (parent of adws directory)."""
+    return os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+
+
+def get_fetch_ttl() -> float:
+    """Get the freshness window for fetched refs in seconds."""
+    return float(os.getenv("ADW_FETCH_TTL_SECONDS", "30"))
+
+
+def _get_coordinator_dir() -> str:
+    return os.path.join(get_project_root(), "agents", "_git")
+
+
+def _get_stamp_path(remote: str, ref: str) -> str:
+    safe_ref = re.sub(r"[^A-Za-z0-9._-]", "_", ref)
+    return os.path.join(_get_coordinator_dir(), f"fetch_{remote}_{safe_ref}.stamp")
+
+
+def _read_stamp(remote: str, ref: str) -> float:
+    """Get when a ref was last fetched (0 if never)."""
+    try:
+        with open(_get_stamp_path(remote, ref), "r") as f:
+            return float(f.read().strip())
+    except (OSError, ValueError):
+        return 0.0
+
+
+def _write_stamp(remote: str, ref: str, fetched_at: float) -> None:
+    stamp_path = _get_stamp_path(remote, ref)
+    temp_path = f"{stamp_path}.{os.getpid()}"
+    with open(temp_path, "w") as f:
+        f.write(str(fetched_at))
+    os.replace(temp_path, stamp_path)
+
+
+def fetch_origin(
+    refs: Optional[List[str]] = None,
+    logger: Optional[logging.Logger] = None,
+    remote: str = "origin",
+    force: bool = False,
+) -> Tuple[bool, Optional[str]]:
+    """Fetch refs from a remote, coalescing with concurrent and recent fetches.
+
+    Args:
+        refs: Branch names to fetch (default ["main"])
+        logger: Optional logger instance
+        remote: Remote name
+        force: Ignore the freshness TTL. A fetch that finishes while this
+            caller is waiting for the lock is still reused.
+
+    Returns:
+        Tuple of (success, error_message)
+    """
+    refs = refs or ["main"]
+    requested_at = time.time()
+    ttl = 0 if force else get_fetch_ttl()
+
+    def is_satisfied() -> bool:
+        oldest = min(_read_stamp(remote, ref) for ref in refs)
+        return oldest >= requested_at or time.time() - oldest < ttl
+
+    if is_satisfied():
+        if logger:
+            logger.debug(f"Skipping fetch of {remote} {' '.join(refs)}: still fresh")
+        return True, None
+
+    os.makedirs(_get_coordinator_dir(), exist_ok=True)
+    with file_lock(os.path.join(_get_coordinator_dir(), f"fetch_{remote}.lock")):
+        # Another process may have fetched while we waited for the lock
+        if is_satisfied():
+            if logger:
+                logger.debug(f"Reusing concurrent fetch of {remote} {' '.join(refs)}")
+            return True, None
+
+        if logger:
+            logger.info(f"Fetching {' '.join(refs)} from {remote}")
+        started_at = time.time()
+        result = subprocess.run(
+            ["git", "fetch", remote] + refs,
+            capture_output=True,
+            text=True,
+            cwd=get_project_root(),
+        )
+        if result.returncode != 0:
+            error = f"Failed to fetch from {remote}: {result.stderr}"
+            if logger:
+                logger.warning(error)
+            return False, error
+
+        # Stamp with the start time: anything pushed after it may be missing
+        for ref in refs:
+            _write_stamp(remote, ref, started_at)
+
+    return True, None
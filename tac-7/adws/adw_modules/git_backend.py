@@ -0,0 +1,308 @@
+"""Git backend abstraction for ADW git operations.
+
+Helpers in git_ops.py go through get_git_backend() instead of spawning a
+git process per call:
+
+- CliGitBackend (default) reads HEAD and refs straight from the .git
+  directory, so branch and commit lookups spawn no process.
+- Pygit2GitBackend (ADW_GIT_BACKEND=pygit2, requires the pygit2 package)
+  also does status, diff, tree and commit in-process via libgit2.
+
+Network operations (push, fetch) always use the git CLI so existing
+credential helpers keep working.
+"""
+
+import os
+import logging
+import subprocess
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+
+def _run_git(args, cwd: Optional[str]) -> subprocess.CompletedProcess:
+    return subprocess.run(["git"] + args, capture_output=True, text=True, cwd=cwd)
+
+
+def _read_file(path: str) -> Optional[str]:
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _find_git_dirs(cwd: str) -> Optional[Tuple[str, str]]:
+    """Locate (git_dir, common_dir) for a working directory.
+
+    For a linked worktree git_dir is .git/worktrees/<name>/ and common_dir
+    is the main .git directory; for a normal checkout both are .git/.
+    Not cached: worktrees are moved (pool claims) and recreated at the
+    same path, so the .git file is read on every call.
+    """
+    current = os.path.abspath(cwd)
+    while True:
+        dot_git = os.path.join(current, ".git")
+        if os.path.isdir(dot_git):
+            return dot_git, dot_git
+        if os.path.isfile(dot_git):
+            content = _read_file(dot_git) or ""
+            if not content.startswith("gitdir:"):
+                return None
+            git_dir = os.path.normpath(
+                os.path.join(current, content[len("gitdir:"):].strip())
+            )
+            commondir = _read_file(os.path.join(git_dir, "commondir"))
+            common_dir = (
+                os.path.normpath(os.path.join(git_dir, commondir)) if commondir else git_dir
+            )
+            return git_dir, common_dir
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+class GitBackend(ABC):
+    """Interface for the git operations used by ADW workflows."""
+
+    name = "base"
+
+    @abstractmethod
+    def current_branch(self, cwd: Optional[str] = None) -> str:
+        """Current branch name, or "HEAD" when detached."""
+
+    @abstractmethod
+    def head_commit(self, cwd: Optional[str] = None) -> Optional[str]:
+        """SHA of HEAD, or None if it cannot be resolved."""
+
+    @abstractmethod
+    def head_tree(self, cwd: Optional[str] = None) -> Optional[str]:
+        """SHA of HEAD's tree, or None if it cannot be resolved."""
+
+    @abstractmethod
+    def has_changes(
+        self, cwd: Optional[str] = None, pathspecs: Optional[List[str]] = None
+    ) -> bool:
+        """Whether the working tree (or pathspecs) has uncommitted (incl. untracked) changes."""
+
+    @abstractmethod
+    def diff_stat(self, base: str, cwd: Optional[str] = None) -> str:
+        """Diffstat of the working tree against base ("" when identical)."""
+
+    @abstractmethod
+    def commit_all(
+        self, message: str, cwd: Optional[str] = None, pathspecs: Optional[List[str]] = None
+    ) -> Tuple[bool, Optional[str]]:
+        """Stage everything (or only pathspecs) and commit.
+
+        Nothing to commit counts as success.
+        """
+
+    def push(self, branch_name: str, cwd: Optional[str] = None) -> Tuple[bool, Optional[str]]:
+        """Push a branch to origin, setting upstream."""
+        result = _run_git(["push", "-u", "origin", branch_name], cwd)
+        if result.returncode != 0:
+            return False, result.stderr
+        return True, None
+
+
+class CliGitBackend(GitBackend):
+    """git CLI backend that answers ref lookups from the .git directory."""
+
+    name = "cli"
+
+    def _read_head(self, cwd: Optional[str]) -> Optional[Tuple[str, str, str]]:
+        dirs = _find_git_dirs(cwd or os.getcwd())
+        if not dirs:
+            return None
+        git_dir, common_dir = dirs
+        head = _read_file(os.path.join(git_dir, "HEAD"))
+        if not head:
+            return None
+        return head, git_dir, common_dir
+
+    def _resolve_ref(self, ref: str, git_dir: str, common_dir: str) -> Optional[str]:
+        for base in (git_dir, common_dir):
+            sha = _read_file(os.path.join(base, ref))
+            if sha:
+                return sha
+        packed = _read_file(os.path.join(common_dir, "packed-refs")) or ""
+        for line in packed.splitlines():
+            if line.startswith(("#", "^")):
+                continue
+            parts = line.split(" ", 1)
+            if len(parts) == 2 and parts[1] == ref:
+                return parts[0]
+        return None
+
+    def current_branch(self, cwd: Optional[str] = None) -> str:
+        head = self._read_head(cwd)
+        if head:
+            content = head[0]
+            if not content.startswith("ref:"):
+                return "HEAD"
+            ref = content[len("ref:"):].strip()
+            if ref.startswith("refs/heads/"):
+                return ref[len("refs/heads/"):]
+        result = _run_git(["rev-parse", "--abbrev-ref", "HEAD"], cwd)
+        return result.stdout.strip()
+
+    def head_commit(self, cwd: Optional[str] = None) -> Optional[str]:
+        head = self._read_head(cwd)
+        if head:
+            content, git_dir, common_dir = head
+            if not content.startswith("ref:"):
+                return content
+            sha = self._resolve_ref(content[len("ref:"):].strip(), git_dir, common_dir)
+            if sha:
+                return sha
+        result = _run_git(["rev-parse", "HEAD"], cwd)
+        return result.stdout.strip() if result.returncode == 0 else None
+
+    def head_tree(self, cwd: Optional[str] = None) -> Optional[str]:
+        result = _run_git(["rev-parse", "HEAD^{tree}"], cwd)
+        return result.stdout.strip() if result.returncode == 0 else None
+
+    def has_changes(
+        self, cwd: Optional[str] = None, pathspecs: Optional[List[str]] = None
+    ) -> bool:
+        scope = ["--"] + pathspecs if pathspecs else []
+        result = _run_git(["status", "--porcelain"] + scope, cwd)
+        return bool(result.stdout.strip())
+
+    def diff_stat(self, base: str, cwd: Optional[str] = None) -> str:
+        result = _run_git(["diff", base, "--stat"], cwd)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr)
+        return result.stdout.strip()
+
+    def commit_all(
+        self, message: str, cwd: Optional[str] = None, pathspecs: Optional[List[str]] = None
+    ) -> Tuple[bool, Optional[str]]:
+        scope = []
+        if pathspecs is not None:
+            # git add fails on a plain path that matches nothing, e.g. a docs
+            # directory the phase never created
+            scope = [p for p in pathspecs if p.startswith(":") or self._matches_files(p, cwd)]
+            if not scope:
+                return True, None
+            scope = ["--"] + scope
+
+        result = _run_git(["add", "-A"] + scope, cwd)
+        if result.returncode != 0:
+            return False, result.stderr
+
+        # Exit code 0 means nothing is staged, independent of git's output language
+        if _run_git(["diff", "--cached", "--quiet"] + scope, cwd).returncode == 0:
+            return True, None
+
+        result = _run_git(["commit", "-m", message] + scope, cwd)
+        if result.returncode != 0:
+            return False, result.stderr or result.stdout
+        return True, None
+
+    def _matches_files(self, pathspec: str, cwd: Optional[str]) -> bool:
+        result = _run_git(
+            ["ls-files", "--cached", "--others", "--exclude-standard", "--", pathspec], cwd
+        )
+        return bool(result.stdout.strip())
+
+
+class Pygit2GitBackend(CliGitBackend):
+    """In-process backend using libgit2 through pygit2."""
+
+    name = "pygit2"
+
+    def __init__(self):
+        import pygit2
+
+        self.pygit2 = pygit2
+
+    def _repo(self, cwd: Optional[str]):
+        path = os.path.abspath(cwd or os.getcwd())
+        # Keyed by the git dir too, so a worktree moved or recreated at the
+        # same path gets a freshly opened repository
+        dirs = _find_git_dirs(path)
+        return self._open_repo(path, dirs[0] if dirs else None)
+
+    @lru_cache(maxsize=32)
+    def _open_repo(self, path: str, git_dir: Optional[str]):
+        return self.pygit2.Repository(path)
+
+    def current_branch(self, cwd: Optional[str] = None) -> str:
+        repo = self._repo(cwd)
+        if repo.head_is_detached:
+            return "HEAD"
+        return repo.head.shorthand
+
+    def head_commit(self, cwd: Optional[str] = None) -> Optional[str]:
+        repo = self._repo(cwd)
+        if repo.head_is_unborn:
+            return None
+        return str(repo.head.target)
+
+    def head_tree(self, cwd: Optional[str] = None) -> Optional[str]:
+        repo = self._repo(cwd)
+        if repo.head_is_unborn:
+            return None
+        return str(repo.head.peel(self.pygit2.Commit).tree_id)
+
+    def has_changes(
+        self, cwd: Optional[str] = None, pathspecs: Optional[List[str]] = None
+    ) -> bool:
+        if pathspecs:
+            return super().has_changes(cwd, pathspecs)
+        ignored = self.pygit2.GIT_STATUS_IGNORED
+        return any(
+            flags != self.pygit2.GIT_STATUS_CURRENT and not flags & ignored
+            for flags in self._repo(cwd).status().values()
+        )
+
+    def diff_stat(self, base: str, cwd: Optional[str] = None) -> str:
+        repo = self._repo(cwd)
+        base_tree = repo.revparse_single(base).peel(self.pygit2.Tree)
+        diff = base_tree.diff_to_workdir()
+        if not len(diff):
+            return ""
+        return diff.stats.format(self.pygit2.GIT_DIFF_STATS_FULL, 80).strip()
+
+    def commit_all(
+        self, message: str, cwd: Optional[str] = None, pathspecs: Optional[List[str]] = None
+    ) -> Tuple[bool, Optional[str]]:
+        if pathspecs is not None:
+            # libgit2 has no pathspec magic (exclusions), use the CLI
+            return super().commit_all(message, cwd, pathspecs)
+        try:
+            repo = self._repo(cwd)
+            index = repo.index
+            index.read()
+            index.add_all()
+            index.write()
+            tree = index.write_tree()
+
+            parents = [] if repo.head_is_unborn else [repo.head.target]
+            if parents and repo[parents[0]].tree_id == tree:
+                return True, None  # Nothing to commit
+
+            signature = repo.default_signature
+            repo.create_commit("HEAD", signature, signature, message, tree, parents)
+            return True, None
+        except Exception as e:
+            return False, str(e)
+
+
+@lru_cache(maxsize=1)
+def get_git_backend() -> GitBackend:
+    """Get the configured git backend (ADW_GIT_BACKEND=cli|pygit2).
+
+    Falls back to the CLI backend if pygit2 is requested but not installed.
+    """
+    if os.getenv("ADW_GIT_BACKEND", "cli").lower() == "pygit2":
+        try:
+            return Pygit2GitBackend()
+        except ImportError:
+            logging.getLogger(__name__).warning(
+                "ADW_GIT_BACKEND=pygit2 but pygit2 is not installed, using git CLI"
+            )
+    return CliGitBackend()
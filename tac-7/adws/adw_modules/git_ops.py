@@ -3,49 +3,53 @@
 Provides centralized git operations that build on top of github.py module.
 """
 
+import os
+import re
 import subprocess
 import json
 import logging
-from typing import Optional, Tuple
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator, List, Optional, Tuple
 
 # Import GitHub functions from existing module
 from adw_modules.github import get_repo_url, extract_repo_path, make_issue_comment
+from adw_modules.git_backend import get_git_backend
+
+if TYPE_CHECKING:
+    from adw_modules.state import ADWState
 
 
 def get_current_branch(cwd: Optional[str] = None) -> str:
     """Get current git branch name."""
-    result = subprocess.run(
-        ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-        capture_output=True,
-        text=True,
-        cwd=cwd,
-    )
-    return result.stdout.strip()
+    return get_git_backend().current_branch(cwd)
+
+
+def get_current_commit_hash(cwd: Optional[str] = None) -> Optional[str]:
+    """Get the commit SHA of HEAD."""
+    return get_git_backend().head_commit(cwd)
+
+
+def has_uncommitted_changes(cwd: Optional[str] = None) -> bool:
+    """Check if the working tree has uncommitted changes."""
+    return get_git_backend().has_changes(cwd)
 
 
 def push_branch(
     branch_name: str, cwd: Optional[str] = None
 ) -> Tuple[bool, Optional[str]]:
     """Push current branch to remote. Returns (success, error_message)."""
-    result = subprocess.run(
-        ["git", "push", "-u", "origin", branch_name],
-        capture_output=True,
-        text=True,
-        cwd=cwd,
-    )
-    if result.returncode != 0:
-        return False, result.stderr
-    return True, None
+    return get_git_backend().push(branch_name, cwd)
 
 
-def check_pr_exists(branch_name: str) -> Optional[str]:
-    """Check if PR exists for branch. Returns PR URL if exists."""
+def check_pr_exists(branch_name: str) -> Tuple[Optional[str], Optional[str]]:
+    """Check if an open PR exists for branch. Returns (pr_number, pr_url)."""
     # Use github.py functions to get repo info
     try:
         repo_url = get_repo_url()
         repo_path = extract_repo_path(repo_url)
-    except Exception as e:
-        return None
+    except Exception:
+        return None, None
 
     result = subprocess.run(
         [
@@ -57,7 +61,9 @@ def check_pr_exists(branch_name: str) -> Optional[str]:
             "--head",
             branch_name,
             "--json",
-            "url",
+            "number,url",
+            "--limit",
+            "1",
         ],
         capture_output=True,
         text=True,
@@ -65,8 +71,20 @@ def check_pr_exists(branch_name: str) -> Optional[str]:
     if result.returncode == 0:
         prs = json.loads(result.stdout)
         if prs:
-            return prs[0]["url"]
-    return None
+            return str(prs[0]["number"]), prs[0]["url"]
+    return None, None
+
+
+def is_pr_open(pr_url: str) -> bool:
+    """Check whether a PR is still open (False if it cannot be checked)."""
+    result = subprocess.run(
+        ["gh", "pr", "view", pr_url, "--json", "state"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return False
+    return json.loads(result.stdout).get("state") == "OPEN"
 
 
 def create_branch(
@@ -94,31 +112,41 @@ def create_branch(
     return True, None
 
 
+# Phases running in parallel threads share a worktree: their commits are
+# serialised and each thread may be limited to its own paths
+_commit_lock = threading.Lock()
+_commit_scope = threading.local()
+
+
+@contextmanager
+def commit_scope(pathspecs: Optional[List[str]]) -> Iterator[None]:
+    """Limit commit_changes() in the current thread to pathspecs.
+
+    None means no limit. Pathspec magic such as ":(exclude)app_docs" works.
+    """
+    previous = getattr(_commit_scope, "pathspecs", None)
+    _commit_scope.pathspecs = pathspecs
+    try:
+        yield
+    finally:
+        _commit_scope.pathspecs = previous
+
+
+def get_commit_scope() -> Optional[List[str]]:
+    """Get the pathspecs commit_changes() is limited to in this thread."""
+    return getattr(_commit_scope, "pathspecs", None)
+
+
 def commit_changes(
     message: str, cwd: Optional[str] = None
 ) -> Tuple[bool, Optional[str]]:
-    """Stage all changes and commit. Returns (success, error_message)."""
-    # Check if there are changes to commit
-    result = subprocess.run(
-        ["git", "status", "--porcelain"], capture_output=True, text=True, cwd=cwd
-    )
-    if not result.stdout.strip():
-        return True, None  # No changes to commit
-
-    # Stage all changes
-    result = subprocess.run(
-        ["git", "add", "-A"], capture_output=True, text=True, cwd=cwd
-    )
-    if result.returncode != 0:
-        return False, result.stderr
+    """Stage all changes and commit. Returns (success, error_message).
 
-    # Commit
-    result = subprocess.run(
-        ["git", "commit", "-m", message], capture_output=True, text=True, cwd=cwd
-    )
-    if result.returncode != 0:
-        return False, result.stderr
-    return True, None
+    Having nothing to commit is treated as success. Inside commit_scope()
+    only the scoped paths are staged and committed.
+    """
+    with _commit_lock:
+        return get_git_backend().commit_all(message, cwd, get_commit_scope())
 
 
 def get_pr_number(branch_name: str) -> Optional[str]:
@@ -249,10 +277,34 @@ def merge_pr(
     return True, None
 
 
+def is_git_finalize_deferred() -> bool:
+    """Check whether finalization is deferred to a composite runner.
+
+    Composite workflows set ADW_DEFER_GIT_FINALIZE=1 for their phases and
+    call finalize_git_operations themselves once per phase group.
+    """
+    return os.getenv("ADW_DEFER_GIT_FINALIZE", "").lower() in ("1", "true", "yes")
+
+
 def finalize_git_operations(
     state: "ADWState", logger: logging.Logger, cwd: Optional[str] = None
 ) -> None:
-    """Standard git finalization: push branch and create/update PR."""
+    """Standard git finalization: push branch and create/update PR.
+
+    Pushes only when HEAD moved since the last push (tracked in state as
+    last_pushed_commit), and reuses the PR number/URL cached in state
+    instead of looking the PR up again, as long as that PR is still open.
+    Skipped entirely while ADW_DEFER_GIT_FINALIZE is set.
+    """
+    if is_git_finalize_deferred():
+        logger.info("Git finalization deferred to the composite workflow")
+        return
+    _push_and_sync_pr(state, logger, cwd)
+
+
+def _push_and_sync_pr(
+    state: "ADWState", logger: logging.Logger, cwd: Optional[str] = None
+) -> None:
     branch_name = state.get("branch_name")
     if not branch_name:
         # Fallback: use current git branch if not main
@@ -268,16 +320,37 @@ def finalize_git_operations(
             )
             return
 
-    # Always push
-    success, error = push_branch(branch_name, cwd=cwd)
-    if not success:
-        logger.error(f"Failed to push branch: {error}")
+    # A cached PR that was closed or merged can't take new commits
+    cached_pr_url = state.get("pr_url")
+    if cached_pr_url and not is_pr_open(cached_pr_url):
+        logger.info(f"Cached PR {cached_pr_url} is no longer open, looking it up again")
+        cached_pr_url = None
+
+    head_commit = get_current_commit_hash(cwd=cwd)
+    if head_commit and head_commit == state.get("last_pushed_commit") and cached_pr_url:
+        logger.info(f"Branch {branch_name} unchanged since last push, nothing to finalize")
         return
 
-    logger.info(f"Pushed branch: {branch_name}")
+    # Push only when there are new commits
+    if head_commit and head_commit == state.get("last_pushed_commit"):
+        logger.info(f"Branch {branch_name} already pushed at {head_commit[:9]}")
+    else:
+        success, error = push_branch(branch_name, cwd=cwd)
+        if not success:
+            logger.error(f"Failed to push branch: {error}")
+            return
+
+        logger.info(f"Pushed branch: {branch_name}")
+        state.update(last_pushed_commit=head_commit)
+        state.save("finalize_git_operations")
+
+    # Pushing updates an existing PR, so a cached PR needs no further work
+    if cached_pr_url:
+        logger.info(f"Updated PR: {cached_pr_url}")
+        return
 
     # Handle PR
-    pr_url = check_pr_exists(branch_name)
+    pr_number, pr_url = check_pr_exists(branch_name)
     issue_number = state.get("issue_number")
     adw_id = state.get("adw_id")
 
@@ -307,6 +380,8 @@ def finalize_git_operations(
 
         if pr_url:
             logger.info(f"Created PR: {pr_url}")
+            match = re.search(r"/pull/(\d+)", pr_url)
+            pr_number = match.group(1) if match else None
             # Post new PR link
             if issue_number and adw_id:
                 make_issue_comment(
@@ -314,3 +389,24 @@ def finalize_git_operations(
                 )
         else:
             logger.error(f"Failed to create PR: {error}")
+            return
+
+    state.update(pr_number=pr_number, pr_url=pr_url)
+    state.save("finalize_git_operations")
+
+
+def finalize_deferred_git_operations(adw_id: str) -> None:
+    """Run the deferred finalization for a composite workflow.
+
+    Loads the ADW's latest state and pushes/creates the PR once on behalf
+    of the phases that ran with ADW_DEFER_GIT_FINALIZE set.
+    """
+    from adw_modules.state import ADWState
+    from adw_modules.utils import setup_logger
+
+    logger = setup_logger(adw_id, "git_finalize")
+    state = ADWState.load(adw_id, logger)
+    if not state or not state.get("worktree_path"):
+        logger.warning(f"No worktree for {adw_id}, skipping git finalization")
+        return
+    _push_and_sync_pr(state, logger, cwd=state.get("worktree_path"))
@@ -17,6 +17,7 @@ import subprocess
 import sys
 import os
 import json
+from functools import lru_cache
 from typing import Dict, List, Optional
 from .data_types import GitHubIssue, GitHubIssueListItem, GitHubComment
 
@@ -52,8 +53,12 @@ def get_github_env() -> Optional[dict]:
     return env
 
 
+@lru_cache(maxsize=1)
 def get_repo_url() -> str:
-    """Get GitHub repository URL from git remote."""
+    """Get GitHub repository URL from git remote.
+
+    Cached per process - the remote does not change while workflows run.
+    """
     try:
         result = subprocess.run(
             ["git", "remote", "get-url", "origin"],
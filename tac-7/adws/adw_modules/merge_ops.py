@@ -0,0 +1,232 @@
+"""Merge ADW branches into main without touching the primary checkout.
+
+The ship workflow used to check out main in the shared repository, merge
+and push, then restore the original branch, which disturbed every other
+ADW reading the main working tree and let concurrent ships corrupt each
+other. merge_branch_to_main() instead:
+
+1. Fetches origin/main (through the fetch coordinator).
+2. Builds the merge with plumbing only: `git merge-tree --write-tree`
+   computes the merged tree and `git commit-tree` creates a --no-ff merge
+   commit with origin/main and the branch as parents. On git versions
+   without `merge-tree --write-tree` (< 2.38) the merge is made in a
+   temporary detached worktree instead.
+3. Pushes the commit to main with a compare-and-swap lease on the
+   origin/main it was built from. If main moved meanwhile, the merge is
+   rebuilt on the new main and retried.
+
+Only refs are updated afterwards: origin/main, and the local main branch
+when it is not checked out anywhere and the update is a fast-forward.
+
+Configuration (environment):
+    ADW_SHIP_MAX_ATTEMPTS  Merge/push attempts when main moves (default 3)
+"""
+
+import os
+import shutil
+import logging
+import tempfile
+import subprocess
+from typing import Optional, Tuple
+
+from adw_modules.fetch_coordinator import fetch_origin
+from adw_modules.worktree_registry import get_worktree_by_branch
+
+
+class MergeConflictError(Exception):
+    """The branch does not merge cleanly into main."""
+
+
+class StaleMainError(Exception):
+    """origin/main moved since the merge was built."""
+
+
+def get_project_root() -> str:
+    """Get the project root (parent of adws directory)."""
+    return os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+
+
+def _git(args, cwd: Optional[str] = None) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        ["git"] + args, capture_output=True, text=True, cwd=cwd or get_project_root()
+    )
+
+
+def _rev_parse(ref: str) -> Optional[str]:
+    result = _git(["rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}"])
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def merge_with_plumbing(base: str, branch_sha: str, message: str) -> Optional[str]:
+    """Create a merge commit of branch_sha onto base using merge-tree.
+
+    Returns:
+        The merge commit SHA, or None if merge-tree --write-tree is not
+        supported by the installed git
+
+    Raises:
+        MergeConflictError: If the merge has conflicts
+    """
+    result = _git(["merge-tree", "--write-tree", "--name-only", base, branch_sha])
+    if result.returncode == 1:
+        # First line is the (conflicted) tree, then conflicted paths and messages
+        details = "\n".join(result.stdout.splitlines()[1:]).strip()
+        raise MergeConflictError(f"Merge conflicts with main:\n{details}")
+    if result.returncode != 0:
+        return None
+
+    tree = result.stdout.splitlines()[0].strip()
+    result = _git(["commit-tree", tree, "-p", base, "-p", branch_sha, "-m", message])
+    if result.returncode != 0:
+        raise RuntimeError(f"Failed to create merge commit: {result.stderr}")
+    return result.stdout.strip()
+
+
+def merge_in_temporary_worktree(base: str, branch_sha: str, message: str) -> str:
+    """Create a merge commit of branch_sha onto base in a throwaway worktree.
+
+    Returns:
+        The merge commit SHA
+
+    Raises:
+        MergeConflictError: If the merge has conflicts
+    """
+    temp_dir = tempfile.mkdtemp(prefix="adw_ship_")
+    worktree_path = os.path.join(temp_dir, "merge")
+    try:
+        result = _git(["worktree", "add", "--detach", worktree_path, base])
+        if result.returncode != 0:
+            raise RuntimeError(f"Failed to create merge worktree: {result.stderr}")
+
+        result = _git(["merge", "--no-ff", "-m", message, branch_sha], cwd=worktree_path)
+        if result.returncode != 0:
+            raise MergeConflictError(f"Merge conflicts with main:\n{result.stdout.strip()}")
+
+        return _git(["rev-parse", "HEAD"], cwd=worktree_path).stdout.strip()
+    finally:
+        _git(["worktree", "remove", "--force", worktree_path])
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        _git(["worktree", "prune"])
+
+
+def create_merge_commit(
+    base: str, branch_sha: str, message: str, logger: logging.Logger
+) -> str:
+    """Create a --no-ff merge commit of branch_sha onto base.
+
+    Uses merge-tree plumbing, or a temporary worktree on older git.
+
+    Raises:
+        MergeConflictError: If the merge has conflicts
+        RuntimeError: If git fails
+    """
+    merge_commit = merge_with_plumbing(base, branch_sha, message)
+    if merge_commit is None:
+        logger.info("git merge-tree --write-tree unavailable, merging in a temporary worktree")
+        merge_commit = merge_in_temporary_worktree(base, branch_sha, message)
+    return merge_commit
+
+
+def push_to_main(base: str, commit: str, logger: logging.Logger) -> Tuple[bool, Optional[str]]:
+    """Push commit to origin main if main is still at base (compare-and-swap).
+
+    Returns:
+        Tuple of (success, error_message)
+
+    Raises:
+        StaleMainError: If origin/main is no longer at base
+    """
+    result = _git(
+        [
+            "push",
+            f"--force-with-lease=refs/heads/main:{base}",
+            "origin",
+            f"{commit}:refs/heads/main",
+        ]
+    )
+    if result.returncode != 0:
+        if "stale info" in result.stderr or "rejected" in result.stderr:
+            raise StaleMainError(result.stderr)
+        return False, f"Failed to push to origin/main: {result.stderr}"
+
+    _update_local_refs(base, commit, logger)
+    return True, None
+
+
+def get_branch_commit(branch_name: str) -> Optional[str]:
+    """Get the commit a local branch points at."""
+    return _rev_parse(f"refs/heads/{branch_name}")
+
+
+def get_origin_main() -> Optional[str]:
+    """Get the commit origin/main points at (as of the last fetch)."""
+    return _rev_parse("refs/remotes/origin/main")
+
+
+def _update_local_refs(base: str, merge_commit: str, logger: logging.Logger) -> None:
+    """Point origin/main, and local main if safe, at the pushed merge."""
+    _git(["update-ref", "refs/remotes/origin/main", merge_commit, base])
+
+    # Moving a checked-out branch would leave that checkout looking dirty
+    project_root = get_project_root()
+    primary_head = _git(["symbolic-ref", "--quiet", "HEAD"], cwd=project_root).stdout.strip()
+    if primary_head == "refs/heads/main" or get_worktree_by_branch("main"):
+        logger.debug("main is checked out, leaving local main unchanged")
+        return
+
+    local_main = _rev_parse("refs/heads/main")
+    if local_main is None:
+        return
+    if _git(["merge-base", "--is-ancestor", local_main, merge_commit]).returncode == 0:
+        _git(["update-ref", "refs/heads/main", merge_commit, local_main])
+
+
+def merge_branch_to_main(
+    branch_name: str, logger: logging.Logger, message: Optional[str] = None
+) -> Tuple[bool, Optional[str]]:
+    """Merge a branch into origin/main without checking anything out.
+
+    Args:
+        branch_name: The feature branch to merge
+        logger: Logger instance
+        message: Merge commit message
+
+    Returns:
+        Tuple of (success, error_message)
+    """
+    message = message or f"Merge branch '{branch_name}' via ADW Ship workflow"
+    max_attempts = int(os.getenv("ADW_SHIP_MAX_ATTEMPTS", "3"))
+
+    branch_sha = get_branch_commit(branch_name)
+    if not branch_sha:
+        return False, f"Branch {branch_name} not found"
+
+    for attempt in range(1, max_attempts + 1):
+        logger.info("Fetching latest main from origin...")
+        success, error = fetch_origin(["main"], logger, force=True)
+        if not success:
+            return False, error
+
+        base = get_origin_main()
+        if not base:
+            return False, "origin/main not found"
+
+        try:
+            merge_commit = create_merge_commit(base, branch_sha, message, logger)
+            logger.info(f"Created merge commit {merge_commit[:9]} on origin/main {base[:9]}")
+            success, error = push_to_main(base, merge_commit, logger)
+        except (MergeConflictError, RuntimeError) as e:
+            return False, str(e)
+        except StaleMainError:
+            logger.warning(
+                f"origin/main moved during ship (attempt {attempt}/{max_attempts}), retrying"
+            )
+            continue
+
+        if success:
+            logger.info(f"Pushed {branch_name} to origin/main as {merge_commit[:9]}")
+        return success, error
+
+    return False, f"origin/main kept moving, gave up after {max_attempts} attempts"
@@ -0,0 +1,364 @@
+"""Local merge queue with batched speculative validation.
+
+When several ZTE runs finish together, merging each one straight to main
+races and invalidates the others' test results. With ADW_MERGE_QUEUE=1
+the ship workflow enqueues its branch instead, and the queue merges it:
+
+1. Up to ADW_MERGE_QUEUE_BATCH_SIZE pending requests (oldest first) are
+   merged, one after another, onto origin/main to build a speculative
+   head. Requests that conflict are failed and dropped from the batch.
+2. The speculative head is checked out in a detached worktree under
+   trees/_merge_queue/ with leased ports and cached dependencies, and the
+   test command runs there.
+3. Green: the whole batch is pushed to main in one compare-and-swap push.
+   Red: the batch is bisected. Each half is rebuilt and tested on its own
+   until the failing requests are isolated and failed.
+
+The queue is stored as one JSON file per request in agents/_merge_queue/.
+Any ship waiting on the queue processes it while no other process does,
+so no daemon is required. adw_merge_queue.py runs it as a service.
+
+Configuration (environment):
+    ADW_MERGE_QUEUE               Enable the queue for adw_ship_iso.py (default off)
+    ADW_MERGE_QUEUE_BATCH_SIZE    Requests validated together at most (default 4)
+    ADW_MERGE_QUEUE_TEST_CMD      Shell command run in the batch worktree
+                                  (default "cd app/server && uv run pytest")
+    ADW_MERGE_QUEUE_TEST_TIMEOUT  Seconds before the test command fails (default 1800)
+    ADW_MERGE_QUEUE_TIMEOUT       Seconds a ship waits for its request (default 7200)
+"""
+
+import os
+import time
+import uuid
+import signal
+import logging
+import subprocess
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from adw_modules.data_types import MergeQueueRequest
+from adw_modules.utils import file_lock, get_safe_subprocess_env
+from adw_modules.fetch_coordinator import fetch_origin
+from adw_modules.merge_ops import (
+    MergeConflictError,
+    StaleMainError,
+    create_merge_commit,
+    get_branch_commit,
+    get_origin_main,
+    push_to_main,
+)
+from adw_modules.port_leases import acquire_ports, release_ports
+from adw_modules.worktree_ops import setup_worktree_environment
+from adw_modules.dependency_cache import materialise_dependencies
+
+DEFAULT_TEST_CMD = "cd app/server && uv run pytest"
+POLL_SECONDS = 5
+
+
+def get_project_root() -> str:
+    """Get the project root (parent of adws directory)."""
+    return os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+
+
+def get_queue_dir() -> str:
+    """Get the directory holding queued ship requests."""
+    return os.path.join(get_project_root(), "agents", "_merge_queue")
+
+
+def is_merge_queue_enabled() -> bool:
+    """Check whether ships go through the merge queue."""
+    return os.getenv("ADW_MERGE_QUEUE", "").lower() in ("1", "true", "yes")
+
+
+def get_batch_size() -> int:
+    """Get the maximum number of requests validated together."""
+    return max(1, int(os.getenv("ADW_MERGE_QUEUE_BATCH_SIZE", "4")))
+
+
+def _get_request_path(adw_id: str) -> str:
+    return os.path.join(get_queue_dir(), f"{adw_id}.json")
+
+
+def _save_request(request: MergeQueueRequest) -> None:
+    os.makedirs(get_queue_dir(), exist_ok=True)
+    path = _get_request_path(request.adw_id)
+    temp_path = f"{path}.{os.getpid()}"
+    with open(temp_path, "w") as f:
+        f.write(request.model_dump_json(indent=2))
+    os.replace(temp_path, path)
+
+
+def get_request(adw_id: str) -> Optional[MergeQueueRequest]:
+    """Load a ship request by ADW ID."""
+    try:
+        with open(_get_request_path(adw_id), "r") as f:
+            return MergeQueueRequest.model_validate_json(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def list_requests(status: Optional[str] = None) -> List[MergeQueueRequest]:
+    """List ship requests in queue order, optionally filtered by status."""
+    queue_dir = get_queue_dir()
+    if not os.path.isdir(queue_dir):
+        return []
+
+    requests = []
+    for filename in os.listdir(queue_dir):
+        if not filename.endswith(".json"):
+            continue
+        request = get_request(filename[: -len(".json")])
+        if request and (status is None or request.status == status):
+            requests.append(request)
+    return sorted(requests, key=lambda request: request.enqueued_at)
+
+
+def enqueue(adw_id: str, branch_name: str, logger: logging.Logger) -> MergeQueueRequest:
+    """Add a branch to the merge queue.
+
+    A request that is already pending or being tested is left as is;
+    a finished one is replaced.
+
+    Raises:
+        ValueError: If the branch does not exist
+    """
+    existing = get_request(adw_id)
+    if existing and existing.status in ("pending", "testing"):
+        logger.info(f"{adw_id} is already in the merge queue ({existing.status})")
+        return existing
+
+    branch_commit = get_branch_commit(branch_name)
+    if not branch_commit:
+        raise ValueError(f"Branch {branch_name} not found")
+
+    request = MergeQueueRequest(
+        adw_id=adw_id, branch_name=branch_name, branch_commit=branch_commit
+    )
+    _save_request(request)
+    logger.info(f"Queued {branch_name} ({branch_commit[:9]}) for merge")
+    return request
+
+
+def _finish(request: MergeQueueRequest, status: str, **fields) -> None:
+    request.status = status
+    request.finished_at = datetime.now()
+    for key, value in fields.items():
+        setattr(request, key, value)
+    _save_request(request)
+
+
+def build_speculative_head(
+    base: str, batch: List[MergeQueueRequest], logger: logging.Logger
+) -> Tuple[str, List[Tuple[MergeQueueRequest, str]]]:
+    """Merge a batch of branches onto base, one merge commit each.
+
+    Requests that conflict are failed and left out.
+
+    Returns:
+        Tuple of (head commit, [(request, its merge commit)] for included requests)
+    """
+    head = base
+    included = []
+    for request in batch:
+        message = f"Merge branch '{request.branch_name}' via ADW merge queue"
+        try:
+            head = create_merge_commit(head, request.branch_commit, message, logger)
+        except (MergeConflictError, RuntimeError) as e:
+            logger.warning(f"Dropping {request.adw_id} from batch: {e}")
+            _finish(request, "failed", error=str(e))
+            continue
+        included.append((request, head))
+    return head, included
+
+
+def run_batch_tests(head: str, logger: logging.Logger) -> Tuple[bool, str]:
+    """Run the test command against a speculative head in a throwaway worktree.
+
+    Returns:
+        Tuple of (passed, tail of the test output)
+    """
+    batch_id = f"mq-{uuid.uuid4().hex[:8]}"
+    worktree_path = os.path.join(get_project_root(), "trees", "_merge_queue", batch_id)
+    project_root = get_project_root()
+
+    result = subprocess.run(
+        ["git", "worktree", "add", "--detach", worktree_path, head],
+        capture_output=True,
+        text=True,
+        cwd=project_root,
+    )
+    if result.returncode != 0:
+        return False, f"Failed to create batch worktree: {result.stderr}"
+
+    try:
+        materialise_dependencies(worktree_path, logger)
+        backend_port, frontend_port = acquire_ports(batch_id, logger)
+        setup_worktree_environment(worktree_path, backend_port, frontend_port, logger)
+
+        test_cmd = os.getenv("ADW_MERGE_QUEUE_TEST_CMD", DEFAULT_TEST_CMD)
+        timeout = float(os.getenv("ADW_MERGE_QUEUE_TEST_TIMEOUT", "1800"))
+        env = get_safe_subprocess_env()
+        env["BACKEND_PORT"] = str(backend_port)
+        env["FRONTEND_PORT"] = str(frontend_port)
+
+        logger.info(f"Testing {head[:9]} in {worktree_path}: {test_cmd}")
+        # Own process group, so a timeout kills the test runner and not just
+        # the shell before the ports and worktree are taken away
+        process = subprocess.Popen(
+            test_cmd,
+            shell=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            cwd=worktree_path,
+            env=env,
+            start_new_session=True,
+        )
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except OSError:
+                pass
+            process.communicate()
+            return False, f"Tests timed out after {timeout:.0f}s"
+
+        output = (stdout + stderr).strip()
+        return process.returncode == 0, output[-2000:]
+    except RuntimeError as e:
+        return False, str(e)
+    finally:
+        release_ports(batch_id, logger)
+        subprocess.run(
+            ["git", "worktree", "remove", "--force", worktree_path],
+            capture_output=True,
+            cwd=project_root,
+        )
+
+
+def process_batch(batch: List[MergeQueueRequest], logger: logging.Logger) -> None:
+    """Validate and merge a batch, bisecting it when its tests fail."""
+    success, error = fetch_origin(["main"], logger, force=True)
+    base = get_origin_main() if success else None
+    if not base:
+        logger.error(f"Cannot read origin/main, leaving batch queued: {error}")
+        for request in batch:
+            request.status = "pending"
+            _save_request(request)
+        return
+
+    for request in batch:
+        request.status = "testing"
+        _save_request(request)
+
+    head, included = build_speculative_head(base, batch, logger)
+    if not included:
+        return
+
+    names = ", ".join(request.branch_name for request, _ in included)
+    passed, output = run_batch_tests(head, logger)
+
+    if passed:
+        try:
+            pushed, error = push_to_main(base, head, logger)
+        except StaleMainError:
+            # Someone pushed to main outside the queue - rebuild on the new main
+            logger.warning("origin/main moved during validation, requeueing batch")
+            for request, _ in included:
+                request.status = "pending"
+                _save_request(request)
+            return
+
+        for request, merge_commit in included:
+            if pushed:
+                _finish(request, "merged", merge_commit=merge_commit, batch_size=len(included))
+            else:
+                _finish(request, "failed", error=error)
+        if pushed:
+            logger.info(f"Merged batch of {len(included)} to main: {names}")
+        return
+
+    if len(included) == 1:
+        request = included[0][0]
+        logger.warning(f"Tests failed for {request.branch_name}")
+        _finish(request, "failed", error=f"Tests failed on merged head:\n{output}")
+        return
+
+    # Bisect: the first half is merged (or narrowed down) before the second is rebuilt on it
+    logger.info(f"Batch failed ({names}), bisecting")
+    requests = [request for request, _ in included]
+    middle = len(requests) // 2
+    process_batch(requests[:middle], logger)
+    process_batch(requests[middle:], logger)
+
+
+def _process_pending(logger: logging.Logger, deadline: Optional[float] = None) -> int:
+    """Process pending batches until the queue is empty or the deadline passes.
+
+    The deadline is checked before each batch; a batch already started runs
+    to completion. Caller holds the lock.
+    """
+    # Requests left in testing were abandoned by a processor that died
+    for request in list_requests("testing"):
+        request.status = "pending"
+        _save_request(request)
+
+    batches = 0
+    while True:
+        pending = list_requests("pending")
+        if not pending:
+            return batches
+        if deadline is not None and time.time() >= deadline:
+            logger.info(f"Deadline reached, leaving {len(pending)} request(s) pending")
+            return batches
+        process_batch(pending[: get_batch_size()], logger)
+        batches += 1
+
+
+def process_queue(
+    logger: logging.Logger, wait: bool = True, deadline: Optional[float] = None
+) -> int:
+    """Process the queue if no other process is doing so.
+
+    Args:
+        logger: Logger instance
+        wait: Block until the processor lock is free
+        deadline: Epoch time after which no new batch is started
+
+    Returns:
+        Number of batches processed (0 if another process holds the lock)
+    """
+    try:
+        with file_lock(os.path.join(get_queue_dir(), "processor.lock"), blocking=wait):
+            return _process_pending(logger, deadline)
+    except BlockingIOError:
+        return 0
+
+
+def wait_for_ship(
+    adw_id: str, logger: logging.Logger, timeout: Optional[float] = None
+) -> Tuple[bool, Optional[str]]:
+    """Wait for a queued request to be merged, processing the queue if idle.
+
+    Returns:
+        Tuple of (success, error_message)
+    """
+    timeout = timeout or float(os.getenv("ADW_MERGE_QUEUE_TIMEOUT", "7200"))
+    deadline = time.time() + timeout
+
+    while time.time() < deadline:
+        request = get_request(adw_id)
+        if not request:
+            return False, f"{adw_id} is not in the merge queue"
+        if request.status == "merged":
+            return True, None
+        if request.status == "failed":
+            return False, request.error
+
+        if process_queue(logger, wait=False, deadline=deadline) == 0:
+            time.sleep(POLL_SECONDS)
+
+    return False, f"Timed out after {timeout:.0f}s waiting for the merge queue"
@@ -0,0 +1,185 @@
+"""Phase result cache keyed by the code a phase ran on.
+
+Re-running the test or review phase on a worktree whose code has not changed
+since its last successful run repeats the whole agent loop. After a phase
+succeeds and commits, its parsed results (TestResult lists, ReviewResult) are
+stored under a key built from:
+
+- the phase name
+- the git tree hash of the committed worktree
+- a hash of the spec file the phase ran against
+- the model set
+- the flags that change what the phase does (e.g., --skip-e2e)
+
+The next run of the phase on the same tree replays the stored results
+instead of calling the agents. Worktrees with uncommitted changes are never
+looked up or stored, since their tree hash does not describe the code
+(for a phase running in parallel, only changes in its commit scope count).
+
+Entries live in agents/_cache/phase_results/ and are shared between ADWs.
+Pass --force to a phase to ignore the cache.
+
+Configuration (environment):
+    ADW_PHASE_CACHE              Set to 0 to always rerun phases (default on)
+    ADW_PHASE_CACHE_MAX_ENTRIES  Entries kept, oldest removed first (default 200)
+"""
+
+import os
+import json
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional
+
+from adw_modules.data_types import PhaseCacheEntry
+from adw_modules.git_backend import get_git_backend
+from adw_modules.git_ops import get_commit_scope
+from adw_modules.state import ADWState
+
+
+def get_cache_dir() -> str:
+    """Get the directory holding cached phase results."""
+    project_root = os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    return os.path.join(project_root, "agents", "_cache", "phase_results")
+
+
+def is_phase_cache_enabled() -> bool:
+    """Check whether phase results may be replayed."""
+    return os.getenv("ADW_PHASE_CACHE", "1").lower() not in ("0", "false", "no")
+
+
+def get_max_entries() -> int:
+    """Get how many cached phase results to keep."""
+    return int(os.getenv("ADW_PHASE_CACHE_MAX_ENTRIES", "200"))
+
+
+def get_spec_hash(state: ADWState) -> Optional[str]:
+    """Hash the contents of the ADW's spec file, if it has one."""
+    spec_file = state.get("plan_file")
+    if not spec_file:
+        return None
+    worktree_path = state.get("worktree_path")
+    if worktree_path and not os.path.isabs(spec_file):
+        spec_file = os.path.join(worktree_path, spec_file)
+    try:
+        with open(spec_file, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()[:16]
+    except OSError:
+        return None
+
+
+def _describe(phase: str, state: ADWState, args: List[str]) -> Optional[Dict[str, Any]]:
+    """Collect the inputs a phase's results depend on, or None if uncacheable."""
+    worktree_path = state.get("worktree_path")
+    if not worktree_path or not os.path.isdir(worktree_path):
+        return None
+
+    # A phase running in parallel only answers for the paths it commits
+    backend = get_git_backend()
+    if backend.has_changes(worktree_path, get_commit_scope()):
+        return None
+    tree_hash = backend.head_tree(worktree_path)
+    if not tree_hash:
+        return None
+
+    return {
+        "phase": phase,
+        "tree_hash": tree_hash,
+        "spec_hash": get_spec_hash(state),
+        "model_set": state.get("model_set") or "base",
+        "args": sorted(args),
+    }
+
+
+def _get_entry_path(inputs: Dict[str, Any]) -> str:
+    digest = hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+    return os.path.join(get_cache_dir(), f"{inputs['phase']}-{digest[:16]}.json")
+
+
+def load_phase_results(
+    phase: str, state: ADWState, args: List[str], logger: logging.Logger
+) -> Optional[PhaseCacheEntry]:
+    """Get the cached results of a phase for the worktree's current code.
+
+    Args:
+        phase: Phase name (e.g., "test")
+        state: ADW state (worktree path, spec file, model set)
+        args: Flags that change what the phase does
+        logger: Logger instance
+
+    Returns:
+        The cache entry to replay, or None if the phase must run
+    """
+    if not is_phase_cache_enabled():
+        return None
+    inputs = _describe(phase, state, args)
+    if not inputs:
+        return None
+
+    try:
+        with open(_get_entry_path(inputs), "r") as f:
+            entry = PhaseCacheEntry.model_validate_json(f.read())
+    except (OSError, ValueError):
+        return None
+
+    logger.info(
+        f"Reusing {phase} results of {entry.adw_id} for unchanged tree {entry.tree_hash[:9]}"
+    )
+    return entry
+
+
+def store_phase_results(
+    phase: str,
+    state: ADWState,
+    args: List[str],
+    results: Dict[str, Any],
+    logger: logging.Logger,
+) -> None:
+    """Cache the results of a successful phase run on the worktree's committed code."""
+    if not is_phase_cache_enabled():
+        return
+    inputs = _describe(phase, state, args)
+    if not inputs:
+        logger.debug(f"Not caching {phase} results: worktree has uncommitted changes")
+        return
+
+    entry = PhaseCacheEntry(results=results, adw_id=state.get("adw_id"), **inputs)
+    path = _get_entry_path(inputs)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}"
+    with open(temp_path, "w") as f:
+        f.write(entry.model_dump_json(indent=2))
+    os.replace(temp_path, path)
+    logger.info(f"Cached {phase} results for tree {inputs['tree_hash'][:9]}")
+
+    prune_phase_cache(logger)
+
+
+def prune_phase_cache(logger: logging.Logger) -> int:
+    """Remove the oldest entries beyond ADW_PHASE_CACHE_MAX_ENTRIES.
+
+    Returns:
+        Number of entries removed
+    """
+    cache_dir = get_cache_dir()
+    entries = []
+    try:
+        for name in os.listdir(cache_dir):
+            if name.endswith(".json"):
+                path = os.path.join(cache_dir, name)
+                entries.append((os.path.getmtime(path), path))
+    except OSError:
+        return 0
+
+    entries.sort(reverse=True)
+    removed = 0
+    for _, path in entries[get_max_entries():]:
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError:
+            pass
+    if removed:
+        logger.debug(f"Pruned {removed} cached phase result(s)")
+    return removed
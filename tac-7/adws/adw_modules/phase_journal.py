@@ -0,0 +1,301 @@
+"""Phase checkpoint journal for composite ADW workflows.
+
+Records every phase run in an append-only JSONL file at
+agents/{adw_id}/phase_journal.jsonl so composite runners can resume
+a workflow from the first phase whose inputs changed instead of
+restarting from planning.
+
+Phases run on their own (adw_build_iso.py etc.) write no journal, so each
+phase process also marks itself running under agents/{adw_id}/running/
+until it exits. Worktree GC never collects an ADW with a phase running.
+"""
+
+import atexit
+import json
+import os
+import subprocess
+import time
+import logging
+from typing import Callable, List, Optional, Dict, Any, Tuple
+from adw_modules.data_types import PhaseJournalEntry, PhaseStatus
+from adw_modules.state import ADWState
+from adw_modules.git_backend import get_git_backend
+
+
+def get_tree_hash(cwd: Optional[str]) -> Optional[str]:
+    """Get the git tree hash of HEAD in the given directory.
+
+    Returns None if the directory does not exist or is not a git checkout.
+    """
+    if not cwd or not os.path.isdir(cwd):
+        return None
+
+    return get_git_backend().head_tree(cwd)
+
+
+def get_running_dir(adw_id: str) -> str:
+    """Get the directory holding one file per process running a phase of the ADW."""
+    project_root = os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    return os.path.join(project_root, "agents", adw_id, "running")
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def mark_phase_running(adw_id: str) -> None:
+    """Mark this process as running a phase of the ADW until it exits."""
+    path = os.path.join(get_running_dir(adw_id), str(os.getpid()))
+    if os.path.exists(path):
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w"):
+        pass
+    atexit.register(_remove_file, path)
+
+
+def get_running_pids(adw_id: str) -> List[int]:
+    """Get the live processes running a phase of the ADW.
+
+    Files left behind by processes that died without cleaning up are removed.
+    """
+    running_dir = get_running_dir(adw_id)
+    if not os.path.isdir(running_dir):
+        return []
+
+    pids = []
+    for name in os.listdir(running_dir):
+        if not name.isdigit():
+            continue
+        if _pid_alive(int(name)):
+            pids.append(int(name))
+        else:
+            _remove_file(os.path.join(running_dir, name))
+    return pids
+
+
+class PhaseJournal:
+    """Append-only journal of phase runs for a single ADW."""
+
+    JOURNAL_FILENAME = "phase_journal.jsonl"
+
+    def __init__(self, adw_id: str, logger: Optional[logging.Logger] = None):
+        """Initialize PhaseJournal with a required ADW ID.
+
+        Args:
+            adw_id: The ADW ID this journal belongs to (required)
+            logger: Optional logger instance
+        """
+        if not adw_id:
+            raise ValueError("adw_id is required for PhaseJournal")
+
+        self.adw_id = adw_id
+        self.logger = logger or logging.getLogger(__name__)
+
+    def get_journal_path(self) -> str:
+        """Get path to the journal file."""
+        project_root = os.path.dirname(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        )
+        return os.path.join(project_root, "agents", self.adw_id, self.JOURNAL_FILENAME)
+
+    def record(
+        self,
+        phase: str,
+        status: PhaseStatus,
+        args: Optional[List[str]] = None,
+        input_tree: Optional[str] = None,
+        output_tree: Optional[str] = None,
+        outputs: Optional[Dict[str, Any]] = None,
+        duration_seconds: Optional[float] = None,
+        pid: Optional[int] = None,
+    ) -> PhaseJournalEntry:
+        """Append a phase record to the journal and return it."""
+        entry = PhaseJournalEntry(
+            phase=phase,
+            status=status,
+            args=args or [],
+            input_tree=input_tree,
+            output_tree=output_tree,
+            outputs=outputs or {},
+            duration_seconds=duration_seconds,
+            pid=pid,
+        )
+
+        journal_path = self.get_journal_path()
+        os.makedirs(os.path.dirname(journal_path), exist_ok=True)
+
+        # Single write in append mode so concurrent writers never interleave lines
+        with open(journal_path, "a") as f:
+            f.write(entry.model_dump_json() + "\n")
+
+        self.logger.debug(f"Journal: {phase} {status} (tree {output_tree or input_tree})")
+        return entry
+
+    def read_entries(self) -> List[PhaseJournalEntry]:
+        """Read all journal entries in the order they were recorded.
+
+        Lines that cannot be parsed (e.g., a partial write from a crash)
+        are skipped.
+        """
+        journal_path = self.get_journal_path()
+        if not os.path.exists(journal_path):
+            return []
+
+        entries = []
+        with open(journal_path, "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entries.append(PhaseJournalEntry(**json.loads(line)))
+                except Exception as e:
+                    self.logger.warning(f"Skipping unreadable journal line: {e}")
+        return entries
+
+    def last_entry(
+        self, phase: str, status: Optional[PhaseStatus] = None
+    ) -> Optional[PhaseJournalEntry]:
+        """Get the most recent entry for a phase, optionally filtered by status."""
+        for entry in reversed(self.read_entries()):
+            if entry.phase == phase and (status is None or entry.status == status):
+                return entry
+        return None
+
+    def get_unfinished_entries(self) -> List[PhaseJournalEntry]:
+        """Get "started" entries with no completed or failed entry after them.
+
+        These phases are still running, or their runner died mid-phase.
+        """
+        unfinished: Dict[str, PhaseJournalEntry] = {}
+        for entry in self.read_entries():
+            if entry.status == "started":
+                unfinished[entry.phase] = entry
+            else:
+                unfinished.pop(entry.phase, None)
+        return list(unfinished.values())
+
+    def get_resumable_entry(
+        self,
+        phase: str,
+        args: List[str],
+        expected_input_tree: Optional[str],
+        is_first_phase: bool,
+    ) -> Optional[PhaseJournalEntry]:
+        """Return the completed entry that lets a phase be skipped, if any.
+
+        A phase can be skipped when its most recent run completed with the
+        same arguments and, unless it is the first phase of the workflow,
+        started from the tree the previous phase produced. Callers must also
+        check that the worktree has not moved on since the skipped phases
+        ran (see workflow_engine.get_resume_plan).
+
+        Args:
+            phase: Phase name
+            args: Extra CLI flags the phase would run with now
+            expected_input_tree: Output tree of the previous (skipped) phase
+            is_first_phase: Whether this is the first phase in the workflow
+
+        Returns:
+            The completed entry to reuse, or None if the phase must run
+        """
+        last = self.last_entry(phase)
+        if not last or last.status != "completed":
+            return None
+
+        if sorted(last.args) != sorted(args):
+            return None
+
+        if is_first_phase:
+            # The first phase creates the worktree - only reuse it if it still exists
+            worktree_path = last.outputs.get("worktree_path")
+            if not worktree_path or not os.path.isdir(worktree_path):
+                return None
+        elif last.input_tree != expected_input_tree:
+            return None
+
+        return last
+
+    def run_phase(
+        self,
+        phase: str,
+        cmd: List[str],
+        args: List[str],
+        env: Optional[Dict[str, str]] = None,
+    ) -> Tuple[int, PhaseJournalEntry]:
+        """Run a phase subprocess and journal its start and outcome.
+
+        Args:
+            phase: Phase name
+            cmd: Full command to run the phase script
+            args: Extra CLI flags included in cmd (used to detect changed inputs)
+            env: Environment for the phase process (defaults to the current one)
+
+        Returns:
+            Tuple of (returncode, completed or failed journal entry)
+        """
+        return self.run_callable(
+            phase, lambda: subprocess.run(cmd, env=env).returncode, args
+        )
+
+    def run_callable(
+        self, phase: str, run: Callable[[], int], args: List[str]
+    ) -> Tuple[int, PhaseJournalEntry]:
+        """Run a phase and journal its start and outcome.
+
+        Args:
+            phase: Phase name
+            run: Runs the phase and returns its exit code
+            args: Extra CLI flags the phase runs with (used to detect changed inputs)
+
+        Returns:
+            Tuple of (returncode, completed or failed journal entry)
+        """
+        input_tree = get_tree_hash(self._get_worktree_path())
+        self.record(phase, "started", args=args, input_tree=input_tree, pid=os.getpid())
+
+        start_time = time.time()
+        returncode = run()
+        duration = round(time.time() - start_time, 2)
+
+        # Reload state - the phase may have created or changed the worktree
+        state = ADWState.load(self.adw_id)
+        outputs = state.data if state else {}
+        output_tree = get_tree_hash(outputs.get("worktree_path"))
+
+        entry = self.record(
+            phase,
+            "completed" if returncode == 0 else "failed",
+            args=args,
+            input_tree=input_tree,
+            output_tree=output_tree,
+            outputs=outputs,
+            duration_seconds=duration,
+        )
+        return returncode, entry
+
+    def current_tree(self) -> Optional[str]:
+        """Get the tree hash of the ADW worktree's HEAD now."""
+        return get_tree_hash(self._get_worktree_path())
+
+    def _get_worktree_path(self) -> Optional[str]:
+        """Get the worktree path from the ADW state, if any."""
+        state = ADWState.load(self.adw_id)
+        return state.get("worktree_path") if state else None
@@ -0,0 +1,408 @@
+"""Cross-issue pipeline scheduler.
+
+Running several issues one workflow at a time leaves model capacity idle:
+an ADW that is testing (sonnet) holds no opus capacity, while the next
+issue waits to plan (opus). The scheduler runs the phase DAGs of many ADWs
+together instead, so issue B plans while issue A builds.
+
+Every phase is classed by the models its slash commands use under the ADW's
+model set (SLASH_COMMAND_MODEL_MAP):
+
+- heavy: at least one command runs on opus
+- light: agent commands, all on sonnet
+- none:  no agent (e.g. ship)
+
+A phase starts when its dependencies are done and a slot of its class is
+free. ADWs are admitted oldest first while fewer than
+ADW_PIPELINE_MAX_WORKTREES of them hold a worktree, and free slots go to
+the oldest admitted ADW first, so early issues finish early.
+
+Phases run through the workflow engine (journal, resume, deferred git
+finalize, path-scoped commits for parallel siblings). Each run writes a
+throughput report to agents/_pipeline/{run_id}.json.
+
+Configuration (environment):
+    ADW_PIPELINE_HEAVY_SLOTS    Heavy (opus) phases running at once (default 2)
+    ADW_PIPELINE_LIGHT_SLOTS    Light (sonnet) phases running at once (default 4)
+    ADW_PIPELINE_MAX_WORKTREES  ADWs in flight at once (default 6)
+"""
+
+import os
+import logging
+from datetime import datetime
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from adw_modules.agent import SLASH_COMMAND_MODEL_MAP
+from adw_modules.app_supervisor import stop_app
+from adw_modules.data_types import (
+    PhaseResult,
+    PhaseSpec,
+    PipelinePhaseRun,
+    PipelineReport,
+    SlashCommand,
+    SlotClass,
+)
+from adw_modules.git_ops import finalize_deferred_git_operations
+from adw_modules.phase_journal import PhaseJournal
+from adw_modules.state import ADWState
+from adw_modules.utils import make_adw_id
+from adw_modules.workflow_engine import (
+    DEFER_FINALIZE_ENV,
+    execute_phase,
+    get_commit_pathspecs,
+    get_resume_plan,
+    topological_order,
+)
+
+# Slash commands each phase script may run
+PHASE_SLASH_COMMANDS: Dict[str, List[SlashCommand]] = {
+    "plan": [
+        "/classify_issue",
+        "/generate_branch_name",
+        "/chore",
+        "/bug",
+        "/feature",
+        "/install_worktree",
+        "/commit",
+        "/pull_request",
+    ],
+    "build": ["/implement", "/commit"],
+    "test": ["/test", "/resolve_failed_test", "/test_e2e", "/resolve_failed_e2e_test", "/commit"],
+    "review": ["/review", "/patch", "/implement", "/commit"],
+    "document": ["/document", "/commit"],
+    "patch": ["/patch", "/implement", "/commit"],
+    "ship": [],
+}
+
+
+def get_project_root() -> str:
+    """Get the project root (parent of adws directory)."""
+    return os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+
+
+def get_report_dir() -> str:
+    """Get the directory holding pipeline throughput reports."""
+    return os.path.join(get_project_root(), "agents", "_pipeline")
+
+
+def get_slot_limits() -> Dict[str, int]:
+    """Get the number of heavy and light slots and the worktree limit."""
+    return {
+        "heavy": max(1, int(os.getenv("ADW_PIPELINE_HEAVY_SLOTS", "2"))),
+        "light": max(1, int(os.getenv("ADW_PIPELINE_LIGHT_SLOTS", "4"))),
+        "worktrees": max(1, int(os.getenv("ADW_PIPELINE_MAX_WORKTREES", "6"))),
+    }
+
+
+def get_slot_class(phase: str, model_set: str = "base") -> SlotClass:
+    """Class a phase by the models its slash commands use under model_set."""
+    commands = PHASE_SLASH_COMMANDS.get(phase)
+    if commands is None:
+        return "light"  # Unknown phases are assumed to run an agent
+    models = set()
+    for command in commands:
+        config = SLASH_COMMAND_MODEL_MAP.get(command)
+        if config:
+            models.add(config.get(model_set, config["base"]))
+    if "opus" in models:
+        return "heavy"
+    return "light" if models else "none"
+
+
+def _concurrent_siblings(spec: PhaseSpec, phases: List[PhaseSpec]) -> List[PhaseSpec]:
+    """Phases that may run at the same time as spec (neither depends on the other)."""
+    by_name = {p.name: p for p in phases}
+
+    def ancestors(name: str) -> Set[str]:
+        found: Set[str] = set()
+        stack = list(by_name[name].depends_on)
+        while stack:
+            current = stack.pop()
+            if current not in found:
+                found.add(current)
+                stack.extend(by_name[current].depends_on)
+        return found
+
+    own = ancestors(spec.name)
+    return [
+        other
+        for other in phases
+        if other.name != spec.name
+        and other.name not in own
+        and spec.name not in ancestors(other.name)
+    ]
+
+
+class _AdwPipeline:
+    """Scheduling state of one ADW's phase DAG."""
+
+    def __init__(self, issue_number: str, adw_id: str, phases: List[PhaseSpec]):
+        self.issue_number = issue_number
+        self.adw_id = adw_id
+        self.phases = phases
+        self.journal = PhaseJournal(adw_id)
+        self.pending = topological_order(phases)
+        self.results: Dict[str, PhaseResult] = {}
+        self.resume_plan: Dict[str, PhaseResult] = {}
+        self.ready_at: Dict[str, datetime] = {}
+        self.running = 0
+        self.admitted = False
+        self.failed = False
+        self.finished = False
+
+    def model_set(self) -> str:
+        state = ADWState.load(self.adw_id)
+        return (state.get("model_set") if state else None) or "base"
+
+    def ready_phases(self) -> List[PhaseSpec]:
+        if self.failed:
+            return []
+        ready = [
+            spec
+            for spec in self.pending
+            if all(d in self.results for d in spec.depends_on)
+        ]
+        now = datetime.now()
+        for spec in ready:
+            self.ready_at.setdefault(spec.name, now)
+        return ready
+
+    def commit_pathspecs(self, spec: PhaseSpec) -> Optional[List[str]]:
+        siblings = _concurrent_siblings(spec, self.phases)
+        if not siblings:
+            return None
+        return get_commit_pathspecs(spec, [spec] + siblings)
+
+
+def run_pipeline(
+    issues: List[Tuple[str, str]],
+    phases: List[PhaseSpec],
+    workflow: str,
+    logger: logging.Logger,
+    resume: bool = True,
+    get_failure_handler: Optional[
+        Callable[[str, str], Callable[[PhaseSpec, PhaseResult], None]]
+    ] = None,
+) -> PipelineReport:
+    """Run the same phase DAG for many ADWs, overlapping their phases.
+
+    Args:
+        issues: (issue_number, adw_id) per ADW, oldest first
+        phases: Phase DAG every ADW runs
+        workflow: Workflow name recorded in the report
+        logger: Logger instance
+        resume: Skip phases the journal shows completed with unchanged inputs
+        get_failure_handler: Builds the workflow's on_failure callback for an
+            (issue_number, adw_id); it is called once, for the first phase
+            that fails an ADW (as run_workflow does)
+
+    Returns:
+        The throughput report (also saved under agents/_pipeline/)
+    """
+    limits = get_slot_limits()
+    pipelines = [_AdwPipeline(issue, adw_id, phases) for issue, adw_id in issues]
+    busy = {"heavy": 0, "light": 0}
+    running: Dict[Future, Tuple[_AdwPipeline, PhaseSpec, SlotClass, datetime]] = {}
+    runs: List[PipelinePhaseRun] = []
+    started_at = datetime.now()
+
+    previous_env = os.environ.get(DEFER_FINALIZE_ENV)
+    os.environ[DEFER_FINALIZE_ENV] = "1"
+
+    def finish(pipeline: _AdwPipeline) -> None:
+        pipeline.finished = True
+        finalize_deferred_git_operations(pipeline.adw_id)
+        stop_app(pipeline.adw_id, logger)
+        outcome = "failed" if pipeline.failed else "completed"
+        logger.info(f"{pipeline.adw_id} (issue #{pipeline.issue_number}) {outcome}")
+
+    def schedule(executor: ThreadPoolExecutor) -> None:
+        for pipeline in pipelines:
+            if pipeline.finished:
+                continue
+            if not pipeline.admitted:
+                in_flight = sum(1 for p in pipelines if p.admitted and not p.finished)
+                if in_flight >= limits["worktrees"]:
+                    return  # Admit strictly in order
+                pipeline.admitted = True
+                if resume:
+                    pipeline.resume_plan = get_resume_plan(pipeline.journal, pipeline.phases)
+                logger.info(f"Admitting {pipeline.adw_id} (issue #{pipeline.issue_number})")
+
+            progressed = True
+            while progressed:
+                progressed = False
+                for spec in pipeline.ready_phases():
+                    skipped = pipeline.resume_plan.get(spec.name)
+                    if skipped:
+                        logger.info(f"{pipeline.adw_id}: skipping {spec.name}, inputs unchanged")
+                        pipeline.results[spec.name] = skipped
+                        pipeline.pending.remove(spec)
+                        now = datetime.now()
+                        runs.append(
+                            PipelinePhaseRun(
+                                adw_id=pipeline.adw_id,
+                                issue_number=pipeline.issue_number,
+                                phase=spec.name,
+                                slot_class="none",
+                                status="skipped",
+                                ready_at=pipeline.ready_at[spec.name],
+                                started_at=now,
+                                finished_at=now,
+                            )
+                        )
+                        progressed = True
+                        continue
+
+                    slot_class = get_slot_class(spec.name, pipeline.model_set())
+                    if slot_class != "none" and busy[slot_class] >= limits[slot_class]:
+                        continue
+                    if spec.finalize_before:
+                        finalize_deferred_git_operations(pipeline.adw_id)
+                    if slot_class != "none":
+                        busy[slot_class] += 1
+
+                    pipeline.pending.remove(spec)
+                    pipeline.running += 1
+                    logger.info(f"{pipeline.adw_id}: starting {spec.name} ({slot_class} slot)")
+                    future = executor.submit(
+                        execute_phase,
+                        pipeline.journal,
+                        spec,
+                        pipeline.issue_number,
+                        pipeline.adw_id,
+                        pipeline.commit_pathspecs(spec),
+                    )
+                    running[future] = (pipeline, spec, slot_class, datetime.now())
+
+            if not pipeline.pending and pipeline.running == 0:
+                finish(pipeline)
+
+    max_workers = limits["heavy"] + limits["light"] + limits["worktrees"]
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            schedule(executor)
+            while running:
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    pipeline, spec, slot_class, phase_started = running.pop(future)
+                    if slot_class != "none":
+                        busy[slot_class] -= 1
+                    pipeline.running -= 1
+
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = PhaseResult(phase=spec.name, status="failed", exit_code=1, error=str(e))
+                    pipeline.results[spec.name] = result
+                    runs.append(
+                        PipelinePhaseRun(
+                            adw_id=pipeline.adw_id,
+                            issue_number=pipeline.issue_number,
+                            phase=spec.name,
+                            slot_class=slot_class,
+                            status=result.status,
+                            ready_at=pipeline.ready_at[spec.name],
+                            started_at=phase_started,
+                            finished_at=datetime.now(),
+                        )
+                    )
+                    logger.info(
+                        f"{pipeline.adw_id}: {spec.name} {result.status} "
+                        f"in {result.duration_seconds:.1f}s"
+                    )
+
+                    if result.status == "failed" and not spec.allow_failure:
+                        if not pipeline.failed and get_failure_handler:
+                            get_failure_handler(pipeline.issue_number, pipeline.adw_id)(spec, result)
+                        pipeline.failed = True
+                    if pipeline.running == 0 and (pipeline.failed or not pipeline.pending):
+                        finish(pipeline)
+                schedule(executor)
+    finally:
+        if previous_env is None:
+            os.environ.pop(DEFER_FINALIZE_ENV, None)
+        else:
+            os.environ[DEFER_FINALIZE_ENV] = previous_env
+
+    report = build_report(
+        make_adw_id(), workflow, limits, pipelines, runs, started_at, datetime.now()
+    )
+    save_report(report)
+    return report
+
+
+def build_report(
+    run_id: str,
+    workflow: str,
+    limits: Dict[str, int],
+    pipelines: List[_AdwPipeline],
+    runs: List[PipelinePhaseRun],
+    started_at: datetime,
+    finished_at: datetime,
+) -> PipelineReport:
+    """Summarise a pipeline run's throughput and slot usage."""
+    wall = max((finished_at - started_at).total_seconds(), 0.001)
+    executed = [run for run in runs if run.status != "skipped"]
+
+    utilisation = {}
+    mean_wait = {}
+    for slot_class in ("heavy", "light"):
+        class_runs = [run for run in executed if run.slot_class == slot_class]
+        busy_seconds = sum((r.finished_at - r.started_at).total_seconds() for r in class_runs)
+        utilisation[slot_class] = round(busy_seconds / (limits[slot_class] * wall), 3)
+        if class_runs:
+            waits = [(r.started_at - r.ready_at).total_seconds() for r in class_runs]
+            mean_wait[slot_class] = round(sum(waits) / len(waits), 1)
+
+    return PipelineReport(
+        run_id=run_id,
+        workflow=workflow,
+        slots=limits,
+        started_at=started_at,
+        finished_at=finished_at,
+        wall_seconds=round(wall, 1),
+        serial_seconds=round(
+            sum((r.finished_at - r.started_at).total_seconds() for r in executed), 1
+        ),
+        completed_adws=[p.adw_id for p in pipelines if p.finished and not p.failed],
+        failed_adws=[p.adw_id for p in pipelines if p.failed or not p.finished],
+        slot_utilisation=utilisation,
+        mean_wait_seconds=mean_wait,
+        runs=runs,
+    )
+
+
+def save_report(report: PipelineReport) -> str:
+    """Write a report to agents/_pipeline/{run_id}.json and return its path."""
+    os.makedirs(get_report_dir(), exist_ok=True)
+    path = os.path.join(get_report_dir(), f"{report.run_id}.json")
+    with open(path, "w") as f:
+        f.write(report.model_dump_json(indent=2))
+    return path
+
+
+def format_report(report: PipelineReport) -> str:
+    """Render a report as a short plain-text summary."""
+    total = len(report.completed_adws) + len(report.failed_adws)
+    speedup = report.serial_seconds / report.wall_seconds if report.wall_seconds else 0.0
+    per_hour = len(report.completed_adws) * 3600 / report.wall_seconds if report.wall_seconds else 0.0
+    lines = [
+        f"Pipeline {report.run_id} ({report.workflow}): "
+        f"{len(report.completed_adws)}/{total} ADWs completed",
+        f"  Wall time:   {report.wall_seconds / 60:.1f} min "
+        f"(phases one by one: {report.serial_seconds / 60:.1f} min, {speedup:.2f}x)",
+        f"  Throughput:  {per_hour:.2f} issues/hour",
+    ]
+    for slot_class in ("heavy", "light"):
+        lines.append(
+            f"  {slot_class.capitalize():<6} slots: {report.slots[slot_class]}, "
+            f"{report.slot_utilisation.get(slot_class, 0.0):.0%} busy, "
+            f"mean wait {report.mean_wait_seconds.get(slot_class, 0.0):.0f}s"
+        )
+    if report.failed_adws:
+        lines.append(f"  Failed:      {', '.join(report.failed_adws)}")
+    return "\n".join(lines)
@@ -0,0 +1,309 @@
+"""Lease-based port allocation for isolated ADW workflows.
+
+Backend/frontend port pairs are leased to an owner (an ADW ID or a pool
+slot ID) through a SQLite registry at agents/port_leases.db. Leases expire
+after ADW_PORT_LEASE_TTL seconds unless renewed, and leases whose owner no
+longer has a worktree are reclaimed, so crashed workflows never leak ports.
+
+Configuration (environment):
+    ADW_BACKEND_PORT_START   First backend port (default 9100)
+    ADW_FRONTEND_PORT_START  First frontend port (default 9200)
+    ADW_PORT_POOL_SIZE       Number of port pairs (default 100)
+    ADW_PORT_LEASE_TTL       Lease lifetime in seconds (default 86400)
+"""
+
+import os
+import socket
+import sqlite3
+import time
+import logging
+from typing import Dict, List, Optional, Tuple
+
+# Leases younger than this are never reclaimed for a missing worktree,
+# since ports are leased before the worktree is created
+WORKTREE_GRACE_SECONDS = 10 * 60
+
+
+def get_project_root() -> str:
+    """Get the project root (parent of adws directory)."""
+    return os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+
+
+def get_registry_path() -> str:
+    """Get path to the port lease registry database."""
+    return os.path.join(get_project_root(), "agents", "port_leases.db")
+
+
+def get_port_ranges() -> Tuple[int, int, int]:
+    """Get the configured port ranges.
+
+    Returns:
+        Tuple of (backend_start, frontend_start, pool_size)
+
+    Raises:
+        ValueError: If the configuration is invalid or the ranges overlap
+    """
+    backend_start = int(os.getenv("ADW_BACKEND_PORT_START", "9100"))
+    frontend_start = int(os.getenv("ADW_FRONTEND_PORT_START", "9200"))
+    pool_size = int(os.getenv("ADW_PORT_POOL_SIZE", "100"))
+
+    if pool_size < 1:
+        raise ValueError("ADW_PORT_POOL_SIZE must be at least 1")
+    if max(backend_start, frontend_start) + pool_size - 1 > 65535:
+        raise ValueError("Port range exceeds 65535")
+    if abs(backend_start - frontend_start) < pool_size:
+        raise ValueError(
+            f"Backend ports {backend_start}-{backend_start + pool_size - 1} overlap "
+            f"frontend ports {frontend_start}-{frontend_start + pool_size - 1}"
+        )
+    return backend_start, frontend_start, pool_size
+
+
+def get_lease_ttl() -> int:
+    """Get the lease lifetime in seconds."""
+    return int(os.getenv("ADW_PORT_LEASE_TTL", str(24 * 60 * 60)))
+
+
+def is_port_available(port: int) -> bool:
+    """Check if a port is available for binding.
+
+    Args:
+        port: Port number to check
+
+    Returns:
+        True if port is available, False otherwise
+    """
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.settimeout(1)
+            s.bind(('localhost', port))
+            return True
+    except (socket.error, OSError):
+        return False
+
+
+def _connect() -> sqlite3.Connection:
+    """Open the registry, creating it if needed.
+
+    Autocommit mode is used so callers control transactions with
+    BEGIN IMMEDIATE, which serializes writers across processes.
+    """
+    registry_path = get_registry_path()
+    os.makedirs(os.path.dirname(registry_path), exist_ok=True)
+
+    conn = sqlite3.connect(registry_path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS port_leases (
+            slot INTEGER PRIMARY KEY,
+            owner TEXT NOT NULL UNIQUE,
+            backend_port INTEGER NOT NULL,
+            frontend_port INTEGER NOT NULL,
+            leased_at REAL NOT NULL,
+            expires_at REAL NOT NULL
+        )
+        """
+    )
+    return conn
+
+
+def _owner_worktree_exists(owner: str) -> bool:
+    """Check whether the lease owner still has a worktree (ADW, pool slot, resolver or batch)."""
+    trees_dir = os.path.join(get_project_root(), "trees")
+    return any(
+        os.path.isdir(os.path.join(trees_dir, parent, owner))
+        for parent in ("", "_pool", "_resolvers", "_merge_queue")
+    )
+
+
+def _reclaim_stale(conn: sqlite3.Connection, logger: Optional[logging.Logger]) -> int:
+    """Delete expired leases and leases whose owner's worktree is gone.
+
+    Must be called inside a write transaction.
+    """
+    now = time.time()
+    reclaimed = 0
+    for row in conn.execute("SELECT * FROM port_leases").fetchall():
+        expired = row["expires_at"] < now
+        leaked = (
+            now - row["leased_at"] > WORKTREE_GRACE_SECONDS
+            and not _owner_worktree_exists(row["owner"])
+        )
+        if expired or leaked:
+            conn.execute("DELETE FROM port_leases WHERE slot = ?", (row["slot"],))
+            reclaimed += 1
+            if logger:
+                reason = "expired" if expired else "worktree missing"
+                logger.info(
+                    f"Reclaimed ports {row['backend_port']}/{row['frontend_port']} "
+                    f"from {row['owner']} ({reason})"
+                )
+    return reclaimed
+
+
+def acquire_ports(owner: str, logger: Optional[logging.Logger] = None) -> Tuple[int, int]:
+    """Lease a backend/frontend port pair to an owner.
+
+    Returns the owner's existing lease (renewed) if it already holds one.
+    Otherwise picks the lowest free pair whose ports are also not bound
+    by some other process.
+
+    Args:
+        owner: ADW ID or pool slot ID
+        logger: Optional logger instance
+
+    Returns:
+        Tuple of (backend_port, frontend_port)
+
+    Raises:
+        RuntimeError: If every port pair is leased or in use
+    """
+    backend_start, frontend_start, pool_size = get_port_ranges()
+    now = time.time()
+    expires_at = now + get_lease_ttl()
+
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+
+        row = conn.execute(
+            "SELECT * FROM port_leases WHERE owner = ?", (owner,)
+        ).fetchone()
+        if row:
+            conn.execute(
+                "UPDATE port_leases SET expires_at = ? WHERE owner = ?",
+                (expires_at, owner),
+            )
+            conn.execute("COMMIT")
+            return row["backend_port"], row["frontend_port"]
+
+        _reclaim_stale(conn, logger)
+
+        leased_slots = {
+            r["slot"] for r in conn.execute("SELECT slot FROM port_leases").fetchall()
+        }
+        for slot in range(pool_size):
+            if slot in leased_slots:
+                continue
+            backend_port = backend_start + slot
+            frontend_port = frontend_start + slot
+            if not (is_port_available(backend_port) and is_port_available(frontend_port)):
+                continue
+
+            conn.execute(
+                "INSERT INTO port_leases VALUES (?, ?, ?, ?, ?, ?)",
+                (slot, owner, backend_port, frontend_port, now, expires_at),
+            )
+            conn.execute("COMMIT")
+            if logger:
+                logger.info(
+                    f"Leased ports {backend_port}/{frontend_port} to {owner}"
+                )
+            return backend_port, frontend_port
+
+        conn.execute("ROLLBACK")
+        raise RuntimeError(
+            f"No available ports in the allocated range ({pool_size} pairs)"
+        )
+    except sqlite3.Error:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+
+def renew_lease(owner: str) -> bool:
+    """Extend an owner's lease by the TTL (heartbeat).
+
+    Returns:
+        True if the owner holds a lease, False otherwise
+    """
+    conn = _connect()
+    try:
+        cursor = conn.execute(
+            "UPDATE port_leases SET expires_at = ? WHERE owner = ?",
+            (time.time() + get_lease_ttl(), owner),
+        )
+        return cursor.rowcount > 0
+    finally:
+        conn.close()
+
+
+def transfer_lease(old_owner: str, new_owner: str) -> bool:
+    """Hand an existing lease to a new owner (e.g., pool slot to ADW ID).
+
+    Returns:
+        True if the lease was transferred, False if old_owner held none
+    """
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM port_leases WHERE owner = ?", (new_owner,))
+        cursor = conn.execute(
+            "UPDATE port_leases SET owner = ?, leased_at = ?, expires_at = ? WHERE owner = ?",
+            (new_owner, time.time(), time.time() + get_lease_ttl(), old_owner),
+        )
+        conn.execute("COMMIT")
+        return cursor.rowcount > 0
+    finally:
+        conn.close()
+
+
+def release_ports(owner: str, logger: Optional[logging.Logger] = None) -> bool:
+    """Release an owner's lease.
+
+    Returns:
+        True if a lease was released, False if the owner held none
+    """
+    conn = _connect()
+    try:
+        cursor = conn.execute("DELETE FROM port_leases WHERE owner = ?", (owner,))
+        released = cursor.rowcount > 0
+    finally:
+        conn.close()
+
+    if released and logger:
+        logger.info(f"Released port lease for {owner}")
+    return released
+
+
+def reclaim_stale_leases(logger: Optional[logging.Logger] = None) -> int:
+    """Reclaim expired and leaked leases.
+
+    Returns:
+        Number of leases reclaimed
+    """
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        reclaimed = _reclaim_stale(conn, logger)
+        conn.execute("COMMIT")
+        return reclaimed
+    finally:
+        conn.close()
+
+
+def list_leases() -> List[Dict]:
+    """List all current leases ordered by port."""
+    conn = _connect()
+    try:
+        rows = conn.execute("SELECT * FROM port_leases ORDER BY slot").fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        conn.close()
+
+
+def get_lease(owner: str) -> Optional[Dict]:
+    """Get an owner's lease, if any."""
+    conn = _connect()
+    try:
+        row = conn.execute(
+            "SELECT * FROM port_leases WHERE owner = ?", (owner,)
+        ).fetchone()
+        return dict(row) if row else None
+    finally:
+        conn.close()
@@ -1,126 +1,270 @@
-"""Cloudflare R2 uploader for ADW screenshots."""
+"""Cloudflare R2 uploader for ADW screenshots.
+
+Uploads run in parallel through one boto3 client per endpoint and
+credentials, shared by every R2Uploader in the process, with a connection
+pool sized for the upload threads. Large files (browser videos) are sent as
+multipart uploads. Each object carries the SHA-256 of its content in its
+metadata, so a file already uploaded under the same key is skipped. Failed
+uploads are retried with exponential backoff.
+
+Configuration (environment):
+    CLOUDFLARE_R2_ENDPOINT_URL     S3 endpoint (default: the account's R2 endpoint),
+                                   e.g. a local S3-compatible server for testing
+    ADW_R2_MAX_CONCURRENCY         Files uploaded at once (default 16)
+    ADW_R2_MULTIPART_THRESHOLD_MB  Files this large use multipart uploads (default 8)
+    ADW_R2_MAX_ATTEMPTS            Attempts per file before giving up (default 4)
+"""
 
 import os
+import time
+import hashlib
 import logging
-from typing import Optional, Dict, List
+import mimetypes
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, List, Tuple
 from pathlib import Path
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.client import Config
-from botocore.exceptions import ClientError
+from botocore.exceptions import BotoCoreError, ClientError
+from boto3.exceptions import S3UploadFailedError
+
+# Metadata key holding the SHA-256 of an object's content
+HASH_METADATA_KEY = "sha256"
+
+# First retry delay in seconds; doubles with each attempt
+RETRY_BACKOFF_SECONDS = 0.5
+
+_clients: Dict[Tuple[str, str], object] = {}
+_clients_lock = threading.Lock()
+
+
+def get_max_concurrency() -> int:
+    """Get how many files are uploaded at once."""
+    return max(1, int(os.getenv("ADW_R2_MAX_CONCURRENCY", "16")))
+
+
+def get_max_attempts() -> int:
+    """Get how many times an upload is tried."""
+    return max(1, int(os.getenv("ADW_R2_MAX_ATTEMPTS", "4")))
+
+
+def get_transfer_config() -> TransferConfig:
+    """Get the multipart settings for uploads."""
+    threshold = int(float(os.getenv("ADW_R2_MULTIPART_THRESHOLD_MB", "8")) * 1024 * 1024)
+    return TransferConfig(
+        multipart_threshold=threshold,
+        multipart_chunksize=max(threshold, 5 * 1024 * 1024),
+        max_concurrency=4,
+    )
+
+
+def get_r2_client(endpoint_url: str, access_key_id: str, secret_access_key: str):
+    """Get the shared S3 client for an endpoint and credentials."""
+    key = (endpoint_url, access_key_id)
+    with _clients_lock:
+        if key not in _clients:
+            # Pool room for every upload thread and their multipart parts
+            pool_size = get_max_concurrency() * 4
+            _clients[key] = boto3.client(
+                's3',
+                endpoint_url=endpoint_url,
+                aws_access_key_id=access_key_id,
+                aws_secret_access_key=secret_access_key,
+                config=Config(
+                    signature_version='s3v4',
+                    max_pool_connections=pool_size,
+                    retries={'max_attempts': 3, 'mode': 'standard'},
+                ),
+                region_name='us-east-1'
+            )
+        return _clients[key]
+
+
+def file_sha256(file_path: str) -> str:
+    """Hash a file's content."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
 
 
 class R2Uploader:
     """Handle uploads to Cloudflare R2 public bucket."""
-    
+
     def __init__(self, logger: logging.Logger):
         self.logger = logger
         self.client = None
         self.bucket_name = None
         self.public_domain = None
         self.enabled = False
-        
+        # Outcome counts of uploads made by this uploader
+        self.stats = {"uploaded": 0, "skipped": 0, "failed": 0}
+        self._stats_lock = threading.Lock()
+
         # Initialize if all required env vars exist
         self._initialize()
-    
+
     def _initialize(self) -> None:
         """Initialize R2 client if all required environment variables are set."""
         account_id = os.getenv("CLOUDFLARE_ACCOUNT_ID")
         access_key_id = os.getenv("CLOUDFLARE_R2_ACCESS_KEY_ID")
         secret_access_key = os.getenv("CLOUDFLARE_R2_SECRET_ACCESS_KEY")
+        endpoint_url = os.getenv("CLOUDFLARE_R2_ENDPOINT_URL")
         self.bucket_name = os.getenv("CLOUDFLARE_R2_BUCKET_NAME")
         self.public_domain = os.getenv("CLOUDFLARE_R2_PUBLIC_DOMAIN", "tac-public-imgs.iddagents.com")
-        
+
         # Check if all required vars are present
-        if not all([account_id, access_key_id, secret_access_key, self.bucket_name]):
+        if not all([account_id or endpoint_url, access_key_id, secret_access_key, self.bucket_name]):
             self.logger.info("R2 upload disabled - missing required environment variables")
             return
-        
+
         try:
-            # Create R2 client
-            self.client = boto3.client(
-                's3',
-                endpoint_url=f'https://{account_id}.r2.cloudflarestorage.com',
-                aws_access_key_id=access_key_id,
-                aws_secret_access_key=secret_access_key,
-                config=Config(signature_version='s3v4'),
-                region_name='us-east-1'
+            # Shared R2 client
+            self.client = get_r2_client(
+                endpoint_url or f'https://{account_id}.r2.cloudflarestorage.com',
+                access_key_id,
+                secret_access_key,
             )
             self.enabled = True
             self.logger.info(f"R2 upload enabled - bucket: {self.bucket_name}, domain: {self.public_domain}")
         except Exception as e:
             self.logger.warning(f"Failed to initialize R2 client: {e}")
             self.enabled = False
-    
+
+    def _count(self, outcome: str) -> None:
+        with self._stats_lock:
+            self.stats[outcome] += 1
+
+    def _is_uploaded(self, object_key: str, content_hash: str) -> bool:
+        """Check whether the object already holds content with this hash."""
+        try:
+            head = self.client.head_object(Bucket=self.bucket_name, Key=object_key)
+        except (ClientError, BotoCoreError):
+            return False
+        return head.get("Metadata", {}).get(HASH_METADATA_KEY) == content_hash
+
     def upload_file(self, file_path: str, object_key: Optional[str] = None) -> Optional[str]:
         """
         Upload a file to R2 and return the public URL.
-        
+
+        The upload is skipped if the object already has the same content, and
+        retried with backoff if it fails.
+
         Args:
             file_path: Path to the file to upload (absolute or relative)
             object_key: Optional S3 object key. If not provided, will use default pattern
-            
+
         Returns:
             Public URL if upload successful, None if upload is disabled or fails
         """
         if not self.enabled:
             return None
-        
+
         # Convert to absolute path if relative
         if not os.path.isabs(file_path):
             self.logger.info(f"Converting relative path to absolute: {file_path}")
             file_path = os.path.abspath(file_path)
             self.logger.info(f"Absolute path: {file_path}")
-            
+
         if not os.path.exists(file_path):
             self.logger.warning(f"File not found at absolute path: {file_path}")
+            self._count("failed")
             return None
-        
+
         # Generate object key if not provided
         if not object_key:
             # Use pattern: adw/{adw_id}/review/{filename}
             object_key = f"adw/review/{Path(file_path).name}"
-        
-        try:
-            # Upload file
-            self.client.upload_file(file_path, self.bucket_name, object_key)
-            self.logger.info(f"Uploaded {file_path} to R2 as {object_key}")
-            
-            # Generate public URL
-            public_url = f"https://{self.public_domain}/{object_key}"
+        public_url = f"https://{self.public_domain}/{object_key}"
+
+        content_hash = file_sha256(file_path)
+        if self._is_uploaded(object_key, content_hash):
+            self.logger.debug(f"{object_key} is unchanged in R2, skipping upload")
+            self._count("skipped")
             return public_url
-            
-        except ClientError as e:
-            self.logger.error(f"Failed to upload {file_path} to R2: {e}")
-            return None
-        except Exception as e:
-            self.logger.error(f"Unexpected error uploading to R2: {e}")
-            return None
-    
+
+        extra_args = {"Metadata": {HASH_METADATA_KEY: content_hash}}
+        content_type = mimetypes.guess_type(file_path)[0]
+        if content_type:
+            extra_args["ContentType"] = content_type
+
+        attempts = get_max_attempts()
+        for attempt in range(1, attempts + 1):
+            try:
+                self.client.upload_file(
+                    file_path,
+                    self.bucket_name,
+                    object_key,
+                    ExtraArgs=extra_args,
+                    Config=get_transfer_config(),
+                )
+                self.logger.info(f"Uploaded {file_path} to R2 as {object_key}")
+                self._count("uploaded")
+                return public_url
+            except (ClientError, BotoCoreError, S3UploadFailedError) as e:
+                if attempt == attempts:
+                    self.logger.error(f"Failed to upload {file_path} to R2 after {attempts} attempts: {e}")
+                    break
+                delay = RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1)
+                self.logger.warning(f"Upload of {file_path} failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+            except Exception as e:
+                self.logger.error(f"Unexpected error uploading to R2: {e}")
+                break
+
+        self._count("failed")
+        return None
+
+    def upload_files(self, files: Dict[str, str]) -> Dict[str, Optional[str]]:
+        """
+        Upload files in parallel.
+
+        Args:
+            files: Dict mapping local file paths to object keys
+
+        Returns:
+            Dict mapping local paths to public URLs (None where the upload failed
+            or upload is disabled)
+        """
+        if not self.enabled or not files:
+            return {path: None for path in files}
+
+        started = time.monotonic()
+        workers = min(get_max_concurrency(), len(files))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            urls = list(executor.map(lambda item: self.upload_file(*item), files.items()))
+
+        url_mapping = dict(zip(files, urls))
+        failed = sum(1 for url in urls if url is None)
+        self.logger.info(
+            f"Uploaded {len(files) - failed}/{len(files)} file(s) to R2 in "
+            f"{time.monotonic() - started:.1f}s ({self.stats['skipped']} unchanged so far)"
+        )
+        return url_mapping
+
     def upload_screenshots(self, screenshots: List[str], adw_id: str) -> Dict[str, str]:
         """
         Upload multiple screenshots and return mapping of local paths to public URLs.
-        
+
         Args:
             screenshots: List of local screenshot file paths
             adw_id: ADW workflow ID for organizing uploads
-            
+
         Returns:
             Dict mapping local paths to public URLs (or original paths if upload disabled/failed)
         """
-        url_mapping = {}
-        
-        for screenshot_path in screenshots:
-            if not screenshot_path:
-                continue
-                
-            # Generate object key with ADW ID for organization
-            filename = Path(screenshot_path).name
-            object_key = f"adw/{adw_id}/review/{filename}"
-            
-            # Upload and get public URL
-            public_url = self.upload_file(screenshot_path, object_key)
-            
-            # Map to public URL if successful, otherwise keep original path
-            url_mapping[screenshot_path] = public_url or screenshot_path
-            
-        return url_mapping
\ No newline at end of file
+        # Generate object keys with ADW ID for organization
+        files = {
+            screenshot_path: f"adw/{adw_id}/review/{Path(screenshot_path).name}"
+            for screenshot_path in screenshots
+            if screenshot_path
+        }
+
+        # Map to public URL if successful, otherwise keep original path
+        return {
+            screenshot_path: public_url or screenshot_path
+            for screenshot_path, public_url in self.upload_files(files).items()
+        }
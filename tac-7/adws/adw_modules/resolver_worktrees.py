@@ -0,0 +1,289 @@
+"""Run resolver agents in parallel, each in a throwaway worktree.
+
+Resolving failed tests one agent at a time makes a round as slow as the sum
+of its fixes. run_parallel_resolvers() instead:
+
+1. Snapshots the ADW worktree, including uncommitted changes from earlier
+   rounds, as a commit built through a temporary index (HEAD and the
+   worktree's index are not touched).
+2. Checks the snapshot out in one detached worktree per resolver under
+   trees/_resolvers/, with cached dependencies, the worktree's .env files
+   and its own leased ports.
+3. Runs up to ADW_MAX_PARALLEL_RESOLVERS agents at once.
+4. Merges the fixes of successful resolvers back in request order.
+   Each diff is applied with `git apply --cached --3way` onto a temporary
+   index, so overlapping but compatible edits still merge. A fix that
+   conflicts with the ones merged before it is dropped and reported, so
+   the caller can rerun that resolver on its own.
+5. Applies the combined result to the ADW worktree and removes the
+   resolver worktrees.
+
+create_throwaway_worktree() is also used by the E2E shards
+(e2e_shards.py) to give tests that change app data their own app and ports.
+
+Configuration (environment):
+    ADW_MAX_PARALLEL_RESOLVERS  Resolvers running at once (default 4, 1 = sequential)
+"""
+
+import os
+import uuid
+import shutil
+import logging
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Set, Tuple
+
+from adw_modules.agent import execute_template
+from adw_modules.app_supervisor import stop_app
+from adw_modules.data_types import AgentPromptResponse, AgentTemplateRequest, RetryCode
+from adw_modules.dependency_cache import materialise_dependencies
+from adw_modules.port_leases import acquire_ports, release_ports
+from adw_modules.worktree_ops import setup_worktree_environment
+
+# Untracked configuration copied from the ADW worktree into resolver worktrees
+ENV_FILES = [".env", "app/server/.env", "app/client/.env"]
+
+# Resolver-specific files never merged back (each resolver has its own ports)
+NOT_MERGED = [":(exclude).ports.env"]
+
+
+def get_project_root() -> str:
+    """Get the project root (parent of adws directory)."""
+    return os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+
+
+def get_resolvers_dir() -> str:
+    """Get the directory holding resolver worktrees."""
+    return os.path.join(get_project_root(), "trees", "_resolvers")
+
+
+def get_max_parallel_resolvers() -> int:
+    """Get how many resolvers may run at once."""
+    return max(1, int(os.getenv("ADW_MAX_PARALLEL_RESOLVERS", "4")))
+
+
+def _git(
+    args: List[str],
+    cwd: str,
+    index_file: Optional[str] = None,
+    input: Optional[str] = None,
+) -> subprocess.CompletedProcess:
+    env = None
+    if index_file:
+        env = os.environ.copy()
+        env["GIT_INDEX_FILE"] = index_file
+    return subprocess.run(
+        ["git"] + args, capture_output=True, text=True, cwd=cwd, env=env, input=input
+    )
+
+
+def snapshot_worktree(worktree_path: str) -> Tuple[str, str]:
+    """Record the worktree's current files as a commit on top of HEAD.
+
+    Returns:
+        Tuple of (snapshot commit, its tree)
+
+    Raises:
+        RuntimeError: If git fails
+    """
+    with tempfile.TemporaryDirectory(prefix="adw_snapshot_") as temp_dir:
+        index_file = os.path.join(temp_dir, "index")
+        for args in (["read-tree", "HEAD"], ["add", "-A"]):
+            result = _git(args, worktree_path, index_file)
+            if result.returncode != 0:
+                raise RuntimeError(f"Failed to snapshot worktree: {result.stderr}")
+        result = _git(["write-tree"], worktree_path, index_file)
+        if result.returncode != 0:
+            raise RuntimeError(f"Failed to snapshot worktree: {result.stderr}")
+        tree = result.stdout.strip()
+
+    result = _git(
+        ["commit-tree", tree, "-p", "HEAD", "-m", "ADW resolver snapshot"], worktree_path
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Failed to snapshot worktree: {result.stderr}")
+    return result.stdout.strip(), tree
+
+
+def create_throwaway_worktree(
+    worktree_path: str, snapshot: str, logger: logging.Logger, prefix: str = "resolver"
+) -> Tuple[str, str]:
+    """Check a snapshot out in a detached worktree with its own ports.
+
+    Returns:
+        Tuple of (worktree id, path); the id owns the port lease
+
+    Raises:
+        RuntimeError: If the worktree cannot be created or set up (a
+            partially set up worktree is removed first)
+    """
+    resolver_id = f"{prefix}-{uuid.uuid4().hex[:8]}"
+    path = os.path.join(get_resolvers_dir(), resolver_id)
+    result = _git(["worktree", "add", "--detach", path, snapshot], worktree_path)
+    if result.returncode != 0:
+        raise RuntimeError(f"Failed to create resolver worktree: {result.stderr}")
+
+    try:
+        for env_file in ENV_FILES:
+            src = os.path.join(worktree_path, env_file)
+            if os.path.exists(src):
+                shutil.copy2(src, os.path.join(path, env_file))
+        materialise_dependencies(path, logger)
+        backend_port, frontend_port = acquire_ports(resolver_id, logger)
+        setup_worktree_environment(path, backend_port, frontend_port, logger)
+    except Exception as e:
+        remove_throwaway_worktree(resolver_id, path, worktree_path, logger)
+        raise RuntimeError(f"Failed to set up resolver worktree {resolver_id}: {e}") from e
+    return resolver_id, path
+
+
+def remove_throwaway_worktree(
+    resolver_id: str, path: str, worktree_path: str, logger: logging.Logger
+) -> None:
+    """Stop a throwaway worktree's app, release its ports and remove it."""
+    stop_app(resolver_id, logger)
+    release_ports(resolver_id, logger)
+    _git(["worktree", "remove", "--force", path], worktree_path)
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def _resolver_tree(path: str) -> Optional[str]:
+    """Stage everything in a resolver worktree and return the resulting tree."""
+    if _git(["add", "-A"], path).returncode != 0:
+        return None
+    result = _git(["write-tree"], path)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def _run_in_worktree(
+    request: AgentTemplateRequest,
+    worktree_path: str,
+    snapshot: str,
+    logger: logging.Logger,
+) -> Tuple[AgentPromptResponse, Optional[str]]:
+    """Run one resolver in its own worktree. Returns (response, resulting tree)."""
+    try:
+        resolver_id, path = create_throwaway_worktree(worktree_path, snapshot, logger)
+    except RuntimeError as e:
+        logger.error(str(e))
+        return (
+            AgentPromptResponse(
+                output=str(e), success=False, retry_code=RetryCode.EXECUTION_ERROR
+            ),
+            None,
+        )
+
+    try:
+        response = execute_template(request.model_copy(update={"working_dir": path}))
+        tree = _resolver_tree(path) if response.success else None
+        return response, tree
+    except Exception as e:
+        # One broken resolver must not abort the others in the pool
+        logger.error(f"Resolver in {resolver_id} failed: {e}")
+        return (
+            AgentPromptResponse(
+                output=str(e), success=False, retry_code=RetryCode.EXECUTION_ERROR
+            ),
+            None,
+        )
+    finally:
+        remove_throwaway_worktree(resolver_id, path, worktree_path, logger)
+
+
+def merge_resolver_trees(
+    worktree_path: str,
+    base_tree: str,
+    trees: List[Tuple[int, str]],
+    logger: logging.Logger,
+) -> Tuple[str, Set[int]]:
+    """Merge resolver results onto base_tree in order.
+
+    Args:
+        worktree_path: ADW worktree (any worktree of the repository works)
+        base_tree: Tree every resolver started from
+        trees: (request index, resulting tree) for each successful resolver
+        logger: Logger instance
+
+    Returns:
+        Tuple of (merged tree, indexes whose changes conflicted)
+    """
+    merged = base_tree
+    conflicted: Set[int] = set()
+
+    with tempfile.TemporaryDirectory(prefix="adw_resolver_merge_") as temp_dir:
+        index_file = os.path.join(temp_dir, "index")
+        _git(["read-tree", merged], worktree_path, index_file)
+
+        for idx, tree in trees:
+            patch = _git(
+                ["diff", "--binary", base_tree, tree, "--", "."] + NOT_MERGED, worktree_path
+            ).stdout
+            if not patch.strip():
+                continue
+
+            result = _git(
+                ["apply", "--cached", "--3way", "--whitespace=nowarn", "-"],
+                worktree_path,
+                index_file,
+                input=patch,
+            )
+            written = _git(["write-tree"], worktree_path, index_file)
+            if result.returncode != 0 or written.returncode != 0:
+                logger.warning(f"Fix from resolver {idx} conflicts with earlier fixes")
+                conflicted.add(idx)
+                _git(["read-tree", merged], worktree_path, index_file)
+                continue
+            merged = written.stdout.strip()
+
+    return merged, conflicted
+
+
+def run_parallel_resolvers(
+    requests: List[AgentTemplateRequest],
+    worktree_path: str,
+    logger: logging.Logger,
+) -> Tuple[List[AgentPromptResponse], Set[int]]:
+    """Run resolver agents concurrently and merge their fixes into the worktree.
+
+    Args:
+        requests: One template request per failure (working_dir is replaced)
+        worktree_path: ADW worktree the fixes are merged into
+        logger: Logger instance
+
+    Returns:
+        Tuple of (responses in request order, indexes of successful
+        resolvers whose fixes conflicted and were not applied)
+
+    Raises:
+        RuntimeError: If the worktree cannot be snapshotted or updated
+    """
+    snapshot, base_tree = snapshot_worktree(worktree_path)
+    max_workers = min(get_max_parallel_resolvers(), len(requests))
+    logger.info(
+        f"Running {len(requests)} resolvers, {max_workers} at a time, from snapshot {snapshot[:9]}"
+    )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        outcomes = list(
+            executor.map(
+                lambda request: _run_in_worktree(request, worktree_path, snapshot, logger),
+                requests,
+            )
+        )
+    _git(["worktree", "prune"], worktree_path)
+
+    responses = [response for response, _ in outcomes]
+    trees = [(idx, tree) for idx, (_, tree) in enumerate(outcomes) if tree]
+    merged, conflicted = merge_resolver_trees(worktree_path, base_tree, trees, logger)
+
+    if merged != base_tree:
+        patch = _git(["diff", "--binary", base_tree, merged], worktree_path).stdout
+        result = _git(["apply", "--whitespace=nowarn", "-"], worktree_path, input=patch)
+        if result.returncode != 0:
+            raise RuntimeError(f"Failed to apply merged fixes: {result.stderr}")
+        logger.info(f"Merged fixes from {len(trees) - len(conflicted)} resolver(s)")
+
+    return responses, conflicted
@@ -0,0 +1,243 @@
+"""Sparse-checkout and partial-clone worktree mode.
+
+Optional mode (ADW_SPARSE_CHECKOUT=1) that creates worktrees with a
+cone-mode sparse checkout, so checkout time and disk use scale with the
+directories a task touches instead of the whole repository.
+
+Cone patterns come from adws/sparse_checkout.json (or the file named by
+ADW_SPARSE_CONFIG), keyed by issue class with a "default" fallback:
+
+    {
+        "default": ["app/server", "app/client"],
+        "/bug": ["app/server"],
+        "/feature": ["app/server", "app/client"]
+    }
+
+ADW_SPARSE_PATTERNS (comma-separated) overrides the config file. The
+directories agents always need (ALWAYS_INCLUDED) are added to every cone.
+
+With ADW_PARTIAL_CLONE=1, origin is configured as a blob:none promisor
+remote, so later fetches skip file contents and blobs are downloaded on
+demand for only the paths that get checked out.
+
+Checkouts can be widened later with widen_sparse_checkout(), or by agents
+running `git sparse-checkout add <dir>` inside the worktree.
+"""
+
+import os
+import re
+import json
+import logging
+import subprocess
+from typing import List, Optional, Tuple
+
+# Directories every ADW agent reads or writes, regardless of the task
+ALWAYS_INCLUDED = ["adws", "specs", ".claude", "app_docs", "ai_docs"]
+
+
+def get_project_root() -> str:
+    """Get the project root (parent of adws directory)."""
+    return os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+
+
+def is_sparse_checkout_enabled() -> bool:
+    """Check whether new worktrees should use sparse checkout."""
+    return os.getenv("ADW_SPARSE_CHECKOUT", "").lower() in ("1", "true", "yes")
+
+
+def is_partial_clone_enabled() -> bool:
+    """Check whether origin should be used as a blob-filtered promisor remote."""
+    return os.getenv("ADW_PARTIAL_CLONE", "").lower() in ("1", "true", "yes")
+
+
+def get_config_path() -> str:
+    """Get the path of the sparse pattern config file."""
+    return os.getenv(
+        "ADW_SPARSE_CONFIG",
+        os.path.join(get_project_root(), "adws", "sparse_checkout.json"),
+    )
+
+
+def get_sparse_patterns(issue_class: Optional[str] = None) -> Optional[List[str]]:
+    """Get cone directories for a worktree.
+
+    Args:
+        issue_class: Issue classification (e.g., "/bug") to pick patterns for
+
+    Returns:
+        Directories to check out, or None if no patterns are configured
+        (in which case the full tree should be checked out)
+    """
+    env_patterns = os.getenv("ADW_SPARSE_PATTERNS")
+    if env_patterns:
+        patterns = [p.strip() for p in env_patterns.split(",") if p.strip()]
+    else:
+        config_path = get_config_path()
+        if not os.path.exists(config_path):
+            return None
+        with open(config_path, "r") as f:
+            config = json.load(f)
+        patterns = config.get(issue_class or "", config.get("default"))
+        if patterns is None:
+            return None
+
+    # Cone mode takes directories; strip trailing slashes and keep order stable
+    combined = []
+    for pattern in ALWAYS_INCLUDED + patterns:
+        pattern = pattern.strip("/")
+        if pattern and pattern not in combined:
+            combined.append(pattern)
+    return combined
+
+
+def configure_partial_clone(logger: logging.Logger) -> None:
+    """Make origin a blob:none promisor remote (idempotent)."""
+    project_root = get_project_root()
+    for key, value in [
+        ("remote.origin.promisor", "true"),
+        ("remote.origin.partialclonefilter", "blob:none"),
+    ]:
+        result = subprocess.run(
+            ["git", "config", "--get", key], capture_output=True, text=True, cwd=project_root
+        )
+        if result.stdout.strip() != value:
+            subprocess.run(["git", "config", key, value], cwd=project_root)
+            logger.info(f"Configured {key}={value} for partial clone")
+
+
+def create_sparse_worktree(
+    worktree_path: str,
+    branch_name: str,
+    patterns: List[str],
+    logger: logging.Logger,
+) -> Tuple[bool, Optional[str]]:
+    """Create a worktree that checks out only the given cone directories.
+
+    The worktree is added without a checkout, the sparse cone is set, and
+    only then are files materialised, so the full tree is never written.
+
+    Returns:
+        Tuple of (success, error_message)
+    """
+    project_root = get_project_root()
+
+    if is_partial_clone_enabled():
+        configure_partial_clone(logger)
+
+    cmd = ["git", "worktree", "add", "--no-checkout", "-b", branch_name, worktree_path, "origin/main"]
+    result = subprocess.run(cmd, capture_output=True, text=True, cwd=project_root)
+    if result.returncode != 0 and "already exists" in result.stderr:
+        cmd = ["git", "worktree", "add", "--no-checkout", worktree_path, branch_name]
+        result = subprocess.run(cmd, capture_output=True, text=True, cwd=project_root)
+    if result.returncode != 0:
+        return False, f"Failed to create worktree: {result.stderr}"
+
+    result = subprocess.run(
+        ["git", "sparse-checkout", "set", "--cone"] + patterns,
+        capture_output=True,
+        text=True,
+        cwd=worktree_path,
+    )
+    if result.returncode != 0:
+        return False, f"Failed to configure sparse checkout: {result.stderr}"
+
+    result = subprocess.run(
+        ["git", "checkout"], capture_output=True, text=True, cwd=worktree_path
+    )
+    if result.returncode != 0:
+        return False, f"Failed to check out sparse worktree: {result.stderr}"
+
+    logger.info(f"Created sparse worktree with cone: {', '.join(patterns)}")
+    return True, None
+
+
+def is_sparse_worktree(worktree_path: str) -> bool:
+    """Check whether a worktree has sparse checkout enabled."""
+    result = subprocess.run(
+        ["git", "config", "--get", "core.sparseCheckout"],
+        capture_output=True,
+        text=True,
+        cwd=worktree_path,
+    )
+    return result.stdout.strip() == "true"
+
+
+def get_sparse_directories(worktree_path: str) -> List[str]:
+    """List the cone directories currently checked out."""
+    result = subprocess.run(
+        ["git", "sparse-checkout", "list"],
+        capture_output=True,
+        text=True,
+        cwd=worktree_path,
+    )
+    if result.returncode != 0:
+        return []
+    return [line.strip() for line in result.stdout.splitlines() if line.strip()]
+
+
+def widen_sparse_checkout(
+    worktree_path: str, directories: List[str], logger: logging.Logger
+) -> Tuple[bool, Optional[str]]:
+    """Add directories to a sparse worktree's cone.
+
+    Returns:
+        Tuple of (success, error_message)
+    """
+    if not directories or not is_sparse_worktree(worktree_path):
+        return True, None
+
+    result = subprocess.run(
+        ["git", "sparse-checkout", "add"] + directories,
+        capture_output=True,
+        text=True,
+        cwd=worktree_path,
+    )
+    if result.returncode != 0:
+        return False, f"Failed to widen sparse checkout: {result.stderr}"
+
+    logger.info(f"Widened sparse checkout with: {', '.join(directories)}")
+    return True, None
+
+
+def widen_for_referenced_paths(
+    worktree_path: str, text: str, logger: logging.Logger
+) -> Tuple[bool, Optional[str]]:
+    """Widen a sparse worktree to cover repository paths mentioned in text.
+
+    Used before implementation so the agent finds every directory the plan
+    references. Paths are reduced to their parent directory and only
+    directories that exist at HEAD and are outside the cone are added.
+
+    Returns:
+        Tuple of (success, error_message)
+    """
+    if not is_sparse_worktree(worktree_path):
+        return True, None
+
+    candidates = set()
+    for match in re.findall(r"[\w.-]+(?:/[\w.-]+)+", text):
+        path = match.strip("./")
+        directory = path if "." not in os.path.basename(path) else os.path.dirname(path)
+        if directory:
+            candidates.add(directory)
+    if not candidates:
+        return True, None
+
+    # Keep only directories that exist in the tree
+    result = subprocess.run(
+        ["git", "ls-tree", "-d", "--name-only", "HEAD", "--"] + sorted(candidates),
+        capture_output=True,
+        text=True,
+        cwd=worktree_path,
+    )
+    existing = [line.strip() for line in result.stdout.splitlines() if line.strip()]
+
+    cone = get_sparse_directories(worktree_path)
+    missing = [
+        directory
+        for directory in existing
+        if not any(directory == c or directory.startswith(f"{c}/") for c in cone)
+    ]
+    return widen_sparse_checkout(worktree_path, missing, logger)
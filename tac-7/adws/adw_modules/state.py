@@ -8,8 +8,9 @@ import json
 import os
 import sys
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Set
 from adw_modules.data_types import ADWStateData
+from adw_modules.utils import file_lock
 
 
 class ADWState:
@@ -29,15 +30,19 @@ class ADWState:
         self.adw_id = adw_id
         # Start with minimal state
         self.data: Dict[str, Any] = {"adw_id": self.adw_id}
+        # Keys changed since load - save() merges only these into the file,
+        # so phases running in parallel don't overwrite each other's updates
+        self._dirty: Set[str] = {"adw_id"}
         self.logger = logging.getLogger(__name__)
 
     def update(self, **kwargs):
         """Update state with new key-value pairs."""
         # Filter to only our core fields
-        core_fields = {"adw_id", "issue_number", "branch_name", "plan_file", "issue_class", "worktree_path", "backend_port", "frontend_port", "model_set", "all_adws"}
+        core_fields = {"adw_id", "issue_number", "branch_name", "plan_file", "issue_class", "worktree_path", "backend_port", "frontend_port", "model_set", "all_adws", "pr_number", "pr_url", "last_pushed_commit"}
         for key, value in kwargs.items():
             if key in core_fields:
                 self.data[key] = value
+                self._dirty.add(key)
 
     def get(self, key: str, default=None):
         """Get value from state by key."""
@@ -49,6 +54,7 @@ class ADWState:
         if adw_id not in all_adws:
             all_adws.append(adw_id)
             self.data["all_adws"] = all_adws
+            self._dirty.add("all_adws")
 
     def get_working_directory(self) -> str:
         """Get the working directory for this ADW instance.
@@ -73,41 +79,76 @@ class ADWState:
         return os.path.join(project_root, "agents", self.adw_id, self.STATE_FILENAME)
 
     def save(self, workflow_step: Optional[str] = None) -> None:
-        """Save state to file in agents/{adw_id}/adw_state.json."""
+        """Save state to file in agents/{adw_id}/adw_state.json.
+
+        The file is re-read under a lock and only keys changed through this
+        instance are written over it (all_adws is merged), then it is
+        replaced atomically.
+        """
         state_path = self.get_state_path()
         os.makedirs(os.path.dirname(state_path), exist_ok=True)
 
-        # Create ADWStateData for validation
-        state_data = ADWStateData(
-            adw_id=self.data.get("adw_id"),
-            issue_number=self.data.get("issue_number"),
-            branch_name=self.data.get("branch_name"),
-            plan_file=self.data.get("plan_file"),
-            issue_class=self.data.get("issue_class"),
-            worktree_path=self.data.get("worktree_path"),
-            backend_port=self.data.get("backend_port"),
-            frontend_port=self.data.get("frontend_port"),
-            model_set=self.data.get("model_set", "base"),
-            all_adws=self.data.get("all_adws", []),
-        )
-
-        # Save as JSON
-        with open(state_path, "w") as f:
-            json.dump(state_data.model_dump(), f, indent=2)
+        with file_lock(f"{state_path}.lock"):
+            data = self._merge_with_file(state_path)
+
+            # Create ADWStateData for validation
+            state_data = ADWStateData(
+                adw_id=data.get("adw_id"),
+                issue_number=data.get("issue_number"),
+                branch_name=data.get("branch_name"),
+                plan_file=data.get("plan_file"),
+                issue_class=data.get("issue_class"),
+                worktree_path=data.get("worktree_path"),
+                backend_port=data.get("backend_port"),
+                frontend_port=data.get("frontend_port"),
+                model_set=data.get("model_set", "base"),
+                all_adws=data.get("all_adws", []),
+                pr_number=data.get("pr_number"),
+                pr_url=data.get("pr_url"),
+                last_pushed_commit=data.get("last_pushed_commit"),
+            )
+
+            # Save as JSON
+            temp_path = f"{state_path}.{os.getpid()}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump(state_data.model_dump(), f, indent=2)
+            os.replace(temp_path, state_path)
+
+        self.data = data
+        self._dirty.clear()
 
         self.logger.info(f"Saved state to {state_path}")
         if workflow_step:
             self.logger.info(f"State updated by: {workflow_step}")
 
+    def _merge_with_file(self, state_path: str) -> Dict[str, Any]:
+        """Apply this instance's changed keys on top of the saved state."""
+        try:
+            with open(state_path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return dict(self.data)
+
+        for key in self._dirty:
+            if key == "all_adws":
+                saved = data.get("all_adws") or []
+                data["all_adws"] = saved + [
+                    adw for adw in self.data.get("all_adws", []) if adw not in saved
+                ]
+            else:
+                data[key] = self.data.get(key)
+        return data
+
     @classmethod
     def load(
         cls, adw_id: str, logger: Optional[logging.Logger] = None
     ) -> Optional["ADWState"]:
-        """Load state from file if it exists."""
-        project_root = os.path.dirname(
-            os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        )
-        state_path = os.path.join(project_root, "agents", adw_id, cls.STATE_FILENAME)
+        """Load state from file if it exists.
+
+        The loaded state has no changed keys: only update() and
+        append_adw_id() mark keys for save() to write.
+        """
+        state_path = cls(adw_id).get_state_path()
 
         if not os.path.exists(state_path):
             return None
@@ -122,6 +163,7 @@ class ADWState:
             # Create ADWState instance
             state = cls(state_data.adw_id)
             state.data = state_data.model_dump()
+            state._dirty = set()
 
             if logger:
                 logger.info(f"🔍 Found existing state from {state_path}")
@@ -151,6 +193,7 @@ class ADWState:
                 return None  # No valid state without adw_id
             state = cls(adw_id)
             state.data = data
+            state._dirty = set()
             return state
         except (json.JSONDecodeError, EOFError):
             return None
@@ -168,5 +211,8 @@ class ADWState:
             "backend_port": self.data.get("backend_port"),
             "frontend_port": self.data.get("frontend_port"),
             "all_adws": self.data.get("all_adws", []),
+            "pr_number": self.data.get("pr_number"),
+            "pr_url": self.data.get("pr_url"),
+            "last_pushed_commit": self.data.get("last_pushed_commit"),
         }
         print(json.dumps(output_data, indent=2))
@@ -0,0 +1,411 @@
+"""Choose the tests affected by a branch's changes.
+
+The test phase used to run every test command and E2E test whatever the
+branch changed, so a CSS tweak paid for the whole backend suite.
+select_tests() maps the files changed against origin/main (committed,
+uncommitted and untracked) to the tests they can affect:
+
+- Python test commands (TestCommands with test_glob and select_command)
+  run only the test files that import a changed module, directly or
+  through other modules. The import graph is read from the source with ast.
+- Other test commands run when a file under their cwd changed.
+- Path rules add commands and E2E tests for matching files. By default any
+  app/client or app/server change runs every E2E test, and a changed E2E
+  test file runs that test. A rules file that cannot be read makes
+  everything run.
+- The coverage map adds tests that failed before when the same files
+  changed. It is learned from earlier runs (record_failures()) and kept in
+  agents/_cache/test_impact/coverage_map.json.
+
+Everything runs when a file matching FULL_RUN_PATTERNS changed (dependency
+manifests, conftest.py), when the diff cannot be computed, when forced, and
+on every ADW_TEST_IMPACT_FULL_EVERY-th test phase as a safety net.
+
+Configuration (environment):
+    ADW_TEST_IMPACT             Select affected tests (default on)
+    ADW_TEST_IMPACT_BASE        Ref the branch is compared with (default origin/main)
+    ADW_TEST_IMPACT_RULES_FILE  JSON file (relative to the worktree) whose list of
+                                path rules replaces the defaults:
+                                [{"pattern": "app/client/*", "commands": [...],
+                                  "e2e": ["*"]}]
+    ADW_TEST_IMPACT_FULL_EVERY  Run everything every N test phases (default 10, 0 = never)
+"""
+
+import os
+import ast
+import glob
+import json
+import fnmatch
+import logging
+import subprocess
+from typing import Dict, List, Optional, Set
+
+from adw_modules.data_types import TestCommand, TestSelection
+from adw_modules.utils import file_lock
+
+# Changes that can affect any test
+FULL_RUN_PATTERNS = [
+    "*pyproject.toml",
+    "*uv.lock",
+    "*package.json",
+    "*bun.lockb",
+    "*conftest.py",
+    "*.env.sample",
+]
+
+# Path rules: files matching pattern run these commands and E2E tests
+DEFAULT_PATH_RULES = [
+    {"pattern": "app/client/*", "commands": [], "e2e": ["*"]},
+    {"pattern": "app/server/*", "commands": [], "e2e": ["*"]},
+]
+
+# Directories never scanned for Python modules
+SKIPPED_DIRS = {".venv", "venv", "node_modules", "__pycache__", ".git", ".pytest_cache"}
+
+
+def get_project_root() -> str:
+    """Get the project root (parent of adws directory)."""
+    return os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+
+
+def get_impact_dir() -> str:
+    """Get the directory holding the coverage map and run counter."""
+    return os.path.join(get_project_root(), "agents", "_cache", "test_impact")
+
+
+def is_test_impact_enabled() -> bool:
+    """Check whether only affected tests are run."""
+    return os.getenv("ADW_TEST_IMPACT", "1").lower() not in ("0", "false", "no")
+
+
+def get_full_run_interval() -> int:
+    """Get how many selective runs happen between safety-net full runs."""
+    return int(os.getenv("ADW_TEST_IMPACT_FULL_EVERY", "10"))
+
+
+def get_path_rules(worktree_path: str) -> List[dict]:
+    """Get the path rules (from ADW_TEST_IMPACT_RULES_FILE or the defaults).
+
+    Raises:
+        ValueError: If the rules file cannot be read or is not a list of rules
+    """
+    rules_file = os.getenv("ADW_TEST_IMPACT_RULES_FILE")
+    if not rules_file:
+        return DEFAULT_PATH_RULES
+
+    path = os.path.join(worktree_path, rules_file)
+    try:
+        with open(path, "r") as f:
+            rules = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Cannot read test impact rules from {path}: {e}")
+    if not isinstance(rules, list) or not all(
+        isinstance(rule, dict) and isinstance(rule.get("pattern"), str) for rule in rules
+    ):
+        raise ValueError(f"Test impact rules in {path} must be a list of objects with a pattern")
+    return rules
+
+
+def _git(args: List[str], cwd: str) -> subprocess.CompletedProcess:
+    return subprocess.run(["git"] + args, capture_output=True, text=True, cwd=cwd)
+
+
+def get_changed_files(worktree_path: str) -> Optional[List[str]]:
+    """Get the files changed against the base ref, including uncommitted ones.
+
+    Returns:
+        Sorted paths relative to the worktree, or None if the base ref is unknown
+    """
+    base = os.getenv("ADW_TEST_IMPACT_BASE", "origin/main")
+    merge_base = _git(["merge-base", base, "HEAD"], worktree_path)
+    if merge_base.returncode != 0:
+        return None
+
+    changed: Set[str] = set()
+    for args in (
+        ["diff", "--name-only", merge_base.stdout.strip()],
+        ["ls-files", "--others", "--exclude-standard"],
+    ):
+        result = _git(args, worktree_path)
+        if result.returncode != 0:
+            return None
+        changed.update(line for line in result.stdout.splitlines() if line)
+    return sorted(changed)
+
+
+def _matches(path: str, patterns: List[str]) -> bool:
+    return any(fnmatch.fnmatch(path, pattern) for pattern in patterns)
+
+
+def _under(path: str, directory: str) -> Optional[str]:
+    """Path relative to directory, or None if it is outside it."""
+    if directory in (".", ""):
+        return path
+    prefix = directory.rstrip("/") + "/"
+    return path[len(prefix):] if path.startswith(prefix) else None
+
+
+def _python_files(root: str) -> List[str]:
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIPPED_DIRS]
+        for filename in filenames:
+            if filename.endswith(".py"):
+                files.append(os.path.relpath(os.path.join(dirpath, filename), root))
+    return files
+
+
+def _resolve_module(module: str, modules: Set[str]) -> Optional[str]:
+    """Map a dotted module name to a file under root, if it is one."""
+    base = module.replace(".", "/")
+    for candidate in (base + ".py", base + "/__init__.py"):
+        if candidate in modules:
+            return candidate
+    return None
+
+
+def build_import_graph(root: str, deleted: Optional[Set[str]] = None) -> Dict[str, Set[str]]:
+    """Map each Python file under root to the files under root it imports.
+
+    Absolute imports are resolved from root and from the importing file's
+    directory; relative imports from the importing file's package. A
+    submodule import also counts as importing its parent packages. Imports
+    of deleted files (paths relative to root) are kept, so their importers
+    count as affected.
+    """
+    modules = set(_python_files(root)) | (deleted or set())
+    graph: Dict[str, Set[str]] = {}
+
+    for path in modules - (deleted or set()):
+        try:
+            with open(os.path.join(root, path), "r") as f:
+                tree = ast.parse(f.read(), filename=path)
+        except (OSError, SyntaxError, ValueError):
+            graph[path] = set()
+            continue
+
+        package = os.path.dirname(path).replace("/", ".")
+        names = []
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names.extend(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                if node.level:
+                    parts = package.split(".") if package else []
+                    parts = parts[: len(parts) - node.level + 1]
+                    base = ".".join(p for p in parts + [node.module or ""] if p)
+                else:
+                    base = node.module or ""
+                names.append(base)
+                names.extend(f"{base}.{alias.name}" if base else alias.name for alias in node.names)
+
+        imports = set()
+        for name in names:
+            for candidate in (name, f"{package}.{name}" if package else None):
+                if not candidate:
+                    continue
+                # Importing a.b.c also runs the __init__.py of a and a.b
+                parts = candidate.split(".")
+                for depth in range(1, len(parts) + 1):
+                    resolved = _resolve_module(".".join(parts[:depth]), modules)
+                    if resolved and resolved != path:
+                        imports.add(resolved)
+        graph[path] = imports
+    return graph
+
+
+def affected_files(graph: Dict[str, Set[str]], changed: Set[str]) -> Set[str]:
+    """Get the files that import a changed file, directly or indirectly, plus the changed files."""
+    importers: Dict[str, Set[str]] = {}
+    for path, imports in graph.items():
+        for imported in imports:
+            importers.setdefault(imported, set()).add(path)
+
+    affected = set(changed)
+    pending = list(changed)
+    while pending:
+        for importer in importers.get(pending.pop(), ()):
+            if importer not in affected:
+                affected.add(importer)
+                pending.append(importer)
+    return affected
+
+
+def load_coverage_map() -> Dict[str, List[str]]:
+    """Load the coverage map: changed file -> "command::test file" that failed with it."""
+    try:
+        with open(os.path.join(get_impact_dir(), "coverage_map.json"), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def record_failures(selection: TestSelection, failed: Dict[str, List[str]]) -> None:
+    """Remember which tests failed with which changed files.
+
+    Args:
+        selection: Selection the run was made with (holds the changed files)
+        failed: Command name -> failed test files (relative to its cwd)
+    """
+    entries = [f"{command}::{test}" for command, tests in failed.items() for test in tests]
+    if not entries or not selection.changed_files:
+        return
+
+    path = os.path.join(get_impact_dir(), "coverage_map.json")
+    os.makedirs(get_impact_dir(), exist_ok=True)
+    with file_lock(path + ".lock"):
+        coverage = load_coverage_map()
+        for changed in selection.changed_files:
+            known = coverage.setdefault(changed, [])
+            known.extend(entry for entry in entries if entry not in known)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(coverage, f, indent=2, sort_keys=True)
+        os.replace(temp_path, path)
+
+
+def is_periodic_full_run() -> bool:
+    """Count a test phase; True when the safety-net full run is due.
+
+    Call once per test phase, not per attempt.
+    """
+    interval = get_full_run_interval()
+    if interval <= 0:
+        return False
+
+    path = os.path.join(get_impact_dir(), "runs.json")
+    os.makedirs(get_impact_dir(), exist_ok=True)
+    with file_lock(path + ".lock"):
+        try:
+            with open(path, "r") as f:
+                count = json.load(f).get("selective_runs", 0)
+        except (OSError, ValueError):
+            count = 0
+        count += 1
+        due = count >= interval
+        with open(path, "w") as f:
+            json.dump({"selective_runs": 0 if due else count}, f)
+    return due
+
+
+def select_tests(
+    worktree_path: str,
+    commands: List[TestCommand],
+    e2e_tests: List[str],
+    logger: logging.Logger,
+    force_full: bool = False,
+) -> TestSelection:
+    """Choose the test commands, test files and E2E tests a branch's changes affect.
+
+    Args:
+        worktree_path: ADW worktree
+        commands: Test commands that apply to the worktree
+        e2e_tests: E2E test files of the worktree
+        logger: Logger instance
+        force_full: Run everything (e.g. --full-tests or is_periodic_full_run())
+
+    Returns:
+        The selection; full=True means run everything
+    """
+    if not is_test_impact_enabled():
+        return TestSelection(full=True, reason="test impact disabled")
+
+    changed = get_changed_files(worktree_path)
+    if changed is None:
+        return TestSelection(full=True, reason="base ref not found")
+    if force_full:
+        return TestSelection(full=True, reason="full run requested", changed_files=changed)
+    full_run_files = [path for path in changed if _matches(path, FULL_RUN_PATTERNS)]
+    if full_run_files:
+        return TestSelection(
+            full=True,
+            reason=f"{full_run_files[0]} changed",
+            changed_files=changed,
+        )
+    try:
+        path_rules = get_path_rules(worktree_path)
+    except ValueError as e:
+        logger.warning(str(e))
+        return TestSelection(full=True, reason="test impact rules unreadable", changed_files=changed)
+
+    selected: Dict[str, Optional[List[str]]] = {}
+    selected_e2e: Set[str] = set()
+
+    def select_whole(name: str) -> None:
+        selected[name] = None
+
+    def select_files(name: str, files: Set[str]) -> None:
+        if name in selected and selected[name] is None:
+            return
+        selected[name] = sorted(set(selected.get(name) or []) | files)
+
+    # Path rules
+    for rule in path_rules:
+        if any(fnmatch.fnmatch(path, rule["pattern"]) for path in changed):
+            for name in rule.get("commands", []):
+                select_whole(name)
+            for pattern in rule.get("e2e", []):
+                selected_e2e.update(
+                    test
+                    for test in e2e_tests
+                    if _matches(os.path.basename(test), [pattern, pattern + ".md"])
+                )
+    selected_e2e.update(path for path in changed if path in e2e_tests)
+
+    # Files under each command's directory
+    for command in commands:
+        local = [rel for rel in (_under(path, command.cwd) for path in changed) if rel]
+        if not local:
+            continue
+        if not (command.test_glob and command.select_command):
+            select_whole(command.name)
+            continue
+        if any(not rel.endswith(".py") for rel in local):
+            select_whole(command.name)
+            continue
+
+        root = os.path.join(worktree_path, command.cwd)
+        tests = {
+            os.path.relpath(path, root)
+            for path in glob.glob(os.path.join(root, command.test_glob), recursive=True)
+        }
+        deleted = {rel for rel in local if not os.path.exists(os.path.join(root, rel))}
+        affected = affected_files(build_import_graph(root, deleted), set(local))
+        select_files(command.name, affected & tests)
+
+    # Tests that failed before when the same files changed
+    coverage = load_coverage_map()
+    names = {command.name for command in commands}
+    for path in changed:
+        for entry in coverage.get(path, []):
+            name, _, test = entry.partition("::")
+            if name in names:
+                select_files(name, {test})
+
+    # A selective command with no affected tests does not run
+    selected = {name: files for name, files in selected.items() if files is None or files}
+    selection = TestSelection(
+        full=False,
+        reason=f"{len(changed)} changed file(s)",
+        changed_files=changed,
+        commands=selected,
+        e2e_tests=sorted(selected_e2e),
+    )
+    logger.info(f"Test impact: {format_selection(selection, e2e_tests)}")
+    return selection
+
+
+def format_selection(selection: TestSelection, e2e_tests: List[str]) -> str:
+    """Describe a selection in one line."""
+    if selection.full:
+        return f"running all tests ({selection.reason})"
+    commands = ", ".join(
+        name if files is None else f"{name} ({len(files)} test files)"
+        for name, files in selection.commands.items()
+    )
+    return (
+        f"{selection.reason}; running {commands or 'no test commands'} "
+        f"and {len(selection.e2e_tests)}/{len(e2e_tests)} E2E tests"
+    )
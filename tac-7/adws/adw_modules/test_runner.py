@@ -0,0 +1,516 @@
+"""Run the project's test commands directly, without an agent.
+
+The /test command has an agent run the test suite and write TestResult
+JSON, which takes minutes and tokens just to run pytest and read its output.
+run_native_tests() runs the configured TestCommands in the worktree instead,
+with the worktree's ports from .ports.env, and turns their results into
+TestResult objects:
+
+- "junit" commands write a JUnit XML report; each testcase becomes a result
+- "json" commands write a Jest/Vitest JSON report; each assertion becomes a result
+- "exit_code" commands (linters, type checks, builds) become one result
+
+Agents are then only needed to resolve the failures. After a resolution
+round, rerun_failed_tests() runs only the tests that failed, one at a time
+with their execution_command, fastest first and stopping at the first
+failure, so a retry costs about as much as its failures rather than the
+whole suite. Per-test durations are kept in agents/{adw_id}/test_durations.json
+across attempts to order these reruns.
+
+The default commands mirror the /test command. A project can replace them
+with a JSON list of TestCommand objects in ADW_TEST_COMMANDS_FILE.
+Commands whose cwd does not exist in the worktree are skipped.
+
+Configuration (environment):
+    ADW_NATIVE_TESTS           Run test commands natively (default on)
+    ADW_TEST_COMMANDS_FILE     JSON list of TestCommands (absolute or relative
+                               to the worktree)
+    ADW_TEST_COMMAND_TIMEOUT   Seconds before a test command is stopped (default 1800)
+    ADW_TEST_FAILURE_FIRST     Rerun failed tests alone before the suite (default on)
+"""
+
+import os
+import json
+import time
+import logging
+import shlex
+import tempfile
+import subprocess
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Optional
+
+from adw_modules.data_types import TestCommand, TestResult, TestSelection
+from adw_modules.test_impact import record_failures
+from adw_modules.utils import file_lock, get_safe_subprocess_env
+
+# Exit code of a shell that could not find the command
+COMMAND_NOT_FOUND = 127
+
+# Longest error text kept per result
+MAX_ERROR_CHARS = 2000
+
+DEFAULT_TEST_COMMANDS = [
+    TestCommand(
+        name="python_syntax_check",
+        command="uv run python -m py_compile server.py main.py",
+        cwd="app/server",
+        purpose="Validates Python syntax by compiling source files to bytecode",
+    ),
+    TestCommand(
+        name="backend_linting",
+        command="uv run ruff check .",
+        cwd="app/server",
+        purpose="Validates Python code quality and style with ruff",
+    ),
+    TestCommand(
+        name="all_backend_tests",
+        command="uv run pytest -o junit_family=xunit1 --junitxml={report}",
+        cwd="app/server",
+        purpose="Runs the backend test suite",
+        report="junit",
+        rerun_command="uv run pytest {test}",
+        test_glob="tests/**/test_*.py",
+        select_command="uv run pytest -o junit_family=xunit1 --junitxml={report} {tests}",
+    ),
+    TestCommand(
+        name="typescript_check",
+        command="bun tsc --noEmit",
+        cwd="app/client",
+        purpose="Validates TypeScript types across the frontend",
+    ),
+    TestCommand(
+        name="frontend_build",
+        command="bun run build",
+        cwd="app/client",
+        purpose="Validates the frontend builds for production",
+    ),
+]
+
+
+class TestRunnerError(Exception):
+    """Raised when the test commands cannot be run natively."""
+
+
+def is_native_runner_enabled() -> bool:
+    """Check whether test commands run natively instead of through /test."""
+    return os.getenv("ADW_NATIVE_TESTS", "1").lower() not in ("0", "false", "no")
+
+
+def is_failure_first_enabled() -> bool:
+    """Check whether failed tests are rerun on their own before the full suite."""
+    return os.getenv("ADW_TEST_FAILURE_FIRST", "1").lower() not in ("0", "false", "no")
+
+
+def get_command_timeout() -> int:
+    """Get the timeout in seconds for one test command."""
+    return int(os.getenv("ADW_TEST_COMMAND_TIMEOUT", "1800"))
+
+
+def get_project_root() -> str:
+    """Get the project root (parent of adws directory)."""
+    return os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+
+
+def get_durations_path(adw_id: str) -> str:
+    """Get the file holding an ADW's per-test durations."""
+    return os.path.join(get_project_root(), "agents", adw_id, "test_durations.json")
+
+
+def load_test_durations(adw_id: str) -> Dict[str, float]:
+    """Load the last known duration of each test (empty if none recorded)."""
+    try:
+        with open(get_durations_path(adw_id), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_test_durations(adw_id: str, results: List[TestResult]) -> None:
+    """Record the durations of the results that have one."""
+    measured = {
+        r.test_name: r.duration_seconds for r in results if r.duration_seconds is not None
+    }
+    if not measured:
+        return
+    path = get_durations_path(adw_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with file_lock(path + ".lock"):
+        durations = load_test_durations(adw_id)
+        durations.update(measured)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(durations, f, indent=2, sort_keys=True)
+        os.replace(temp_path, path)
+
+
+def get_test_commands(worktree_path: str) -> List[TestCommand]:
+    """Get the test commands that apply to a worktree.
+
+    Raises:
+        TestRunnerError: If ADW_TEST_COMMANDS_FILE cannot be read
+    """
+    commands = DEFAULT_TEST_COMMANDS
+    commands_file = os.getenv("ADW_TEST_COMMANDS_FILE")
+    if commands_file:
+        path = os.path.join(worktree_path, commands_file)
+        try:
+            with open(path, "r") as f:
+                commands = [TestCommand(**item) for item in json.load(f)]
+        except (OSError, ValueError, TypeError) as e:
+            raise TestRunnerError(f"Cannot read test commands from {path}: {e}")
+
+    return [c for c in commands if os.path.isdir(os.path.join(worktree_path, c.cwd))]
+
+
+def load_ports_env(worktree_path: str) -> Dict[str, str]:
+    """Read the worktree's .ports.env into a dict (empty if missing)."""
+    ports = {}
+    try:
+        with open(os.path.join(worktree_path, ".ports.env"), "r") as f:
+            for line in f:
+                key, sep, value = line.strip().partition("=")
+                if sep and not key.startswith("#"):
+                    ports[key.strip()] = value.strip()
+    except OSError:
+        pass
+    return ports
+
+
+def _truncate(text: str) -> str:
+    text = text.strip()
+    if len(text) <= MAX_ERROR_CHARS:
+        return text
+    return "..." + text[-MAX_ERROR_CHARS:]
+
+
+def _in_cwd(command: TestCommand, shell_command: str) -> str:
+    if command.cwd == ".":
+        return shell_command
+    return f"cd {command.cwd} && {shell_command}"
+
+
+def _execution_command(command: TestCommand, test_id: Optional[str] = None) -> str:
+    """Command that reruns one test (or the whole command), for resolvers and humans."""
+    if command.rerun_command and test_id:
+        return _in_cwd(command, command.rerun_command.replace("{test}", test_id))
+    return _in_cwd(command, command.command.replace("{report}", os.devnull))
+
+
+def _pytest_node_id(testcase: ET.Element) -> str:
+    """Build a pytest node ID (file::Class::test) from an xunit1 testcase."""
+    name = testcase.get("name", "")
+    classname = testcase.get("classname", "")
+    file = testcase.get("file")
+    if not file:
+        return f"{classname}::{name}" if classname else name
+
+    module = os.path.splitext(file)[0].replace("/", ".")
+    node = file
+    if classname.startswith(module + "."):
+        node += "::" + classname[len(module) + 1 :].replace(".", "::")
+    return f"{node}::{name}"
+
+
+def parse_junit_report(path: str, command: TestCommand) -> List[TestResult]:
+    """Turn each testcase of a JUnit XML report into a TestResult.
+
+    Raises:
+        TestRunnerError: If the report cannot be parsed
+    """
+    try:
+        root = ET.parse(path).getroot()
+    except (OSError, ET.ParseError) as e:
+        raise TestRunnerError(f"Cannot parse JUnit report {path}: {e}")
+
+    results = []
+    for testcase in root.iter("testcase"):
+        test_id = _pytest_node_id(testcase)
+        problem = testcase.find("failure")
+        if problem is None:
+            problem = testcase.find("error")
+
+        error = None
+        if problem is not None:
+            error = _truncate(
+                "\n".join(p for p in (problem.get("message"), problem.text) if p)
+            ) or "Test failed"
+
+        try:
+            duration = float(testcase.get("time", ""))
+        except ValueError:
+            duration = None
+
+        results.append(
+            TestResult(
+                test_name=test_id,
+                passed=problem is None,
+                execution_command=_execution_command(command, test_id),
+                test_purpose=command.purpose or f"Test from {command.name}",
+                error=error,
+                duration_seconds=duration,
+            )
+        )
+    return results
+
+
+def parse_json_report(path: str, command: TestCommand, cwd: str) -> List[TestResult]:
+    """Turn each assertion of a Jest/Vitest JSON report into a TestResult.
+
+    Test file paths are made relative to cwd, where the command ran.
+
+    Raises:
+        TestRunnerError: If the report cannot be parsed
+    """
+    try:
+        with open(path, "r") as f:
+            report = json.load(f)
+        suites = report["testResults"]
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        raise TestRunnerError(f"Cannot parse JSON report {path}: {e}")
+
+    results = []
+    for suite in suites:
+        file = os.path.relpath(suite.get("name", ""), cwd)
+        for assertion in suite.get("assertionResults", []):
+            if assertion.get("status") in ("skipped", "pending", "todo"):
+                continue
+            passed = assertion.get("status") == "passed"
+            test_name = assertion.get("fullName") or assertion.get("title", "")
+            duration = assertion.get("duration")
+            results.append(
+                TestResult(
+                    test_name=f"{file} > {test_name}",
+                    passed=passed,
+                    duration_seconds=duration / 1000 if duration is not None else None,
+                    execution_command=_execution_command(command, file),
+                    test_purpose=command.purpose or f"Test from {command.name}",
+                    error=None
+                    if passed
+                    else _truncate("\n".join(assertion.get("failureMessages", [])))
+                    or "Test failed",
+                )
+            )
+
+        # A suite that failed to load has no assertions
+        if not suite.get("assertionResults") and suite.get("status") == "failed":
+            results.append(
+                TestResult(
+                    test_name=file,
+                    passed=False,
+                    execution_command=_execution_command(command, file),
+                    test_purpose=command.purpose or f"Test from {command.name}",
+                    error=_truncate(suite.get("message", "")) or "Test file failed to run",
+                )
+            )
+    return results
+
+
+def run_test_command(
+    command: TestCommand,
+    worktree_path: str,
+    env: Dict[str, str],
+    logger: logging.Logger,
+) -> List[TestResult]:
+    """Run one test command and return its results.
+
+    Raises:
+        TestRunnerError: If the command's tool is missing or its report
+            cannot be read
+    """
+    cwd = os.path.join(worktree_path, command.cwd)
+    whole_command = TestResult(
+        test_name=command.name,
+        passed=True,
+        execution_command=_execution_command(command),
+        test_purpose=command.purpose or command.name,
+    )
+
+    with tempfile.TemporaryDirectory(prefix="adw_test_report_") as temp_dir:
+        ext = "xml" if command.report == "junit" else "json"
+        report_path = os.path.join(temp_dir, f"{command.name}.{ext}")
+        shell_command = command.command.replace("{report}", report_path)
+
+        logger.info(f"Running {command.name}: {shell_command} (in {command.cwd})")
+        started = time.monotonic()
+        try:
+            result = subprocess.run(
+                shell_command,
+                shell=True,
+                capture_output=True,
+                text=True,
+                cwd=cwd,
+                env=env,
+                timeout=get_command_timeout(),
+            )
+        except subprocess.TimeoutExpired:
+            whole_command.passed = False
+            whole_command.error = f"Timed out after {get_command_timeout()}s"
+            return [whole_command]
+
+        if result.returncode == COMMAND_NOT_FOUND:
+            raise TestRunnerError(f"{command.name}: {_truncate(result.stderr)}")
+        whole_command.duration_seconds = round(time.monotonic() - started, 3)
+
+        output = _truncate(result.stdout + "\n" + result.stderr)
+        if command.report == "exit_code" or not os.path.exists(report_path):
+            if command.report != "exit_code" and result.returncode == 0:
+                raise TestRunnerError(f"{command.name} passed but wrote no report")
+            whole_command.passed = result.returncode == 0
+            whole_command.error = None if whole_command.passed else output or (
+                f"Exited with code {result.returncode}"
+            )
+            return [whole_command]
+
+        if command.report == "junit":
+            results = parse_junit_report(report_path, command)
+        else:
+            results = parse_json_report(report_path, command, cwd)
+
+    # A non-zero exit without failing tests (e.g. a collection error)
+    if result.returncode != 0 and all(r.passed for r in results):
+        whole_command.passed = False
+        whole_command.error = output or f"Exited with code {result.returncode}"
+        results.append(whole_command)
+    return results
+
+
+def apply_selection(
+    commands: List[TestCommand], selection: Optional[TestSelection]
+) -> List[TestCommand]:
+    """Keep the commands a test impact selection chose, narrowed to its test files."""
+    if selection is None or selection.full:
+        return commands
+
+    selected = []
+    for command in commands:
+        if command.name not in selection.commands:
+            continue
+        files = selection.commands[command.name]
+        if files is not None and command.select_command:
+            tests = " ".join(shlex.quote(f) for f in files)
+            command = command.model_copy(
+                update={"command": command.select_command.replace("{tests}", tests)}
+            )
+        selected.append(command)
+    return selected
+
+
+def run_native_tests(
+    worktree_path: str,
+    logger: logging.Logger,
+    selection: Optional[TestSelection] = None,
+) -> List[TestResult]:
+    """Run every applicable test command in the worktree.
+
+    Args:
+        worktree_path: ADW worktree
+        logger: Logger instance
+        selection: Test impact selection; only the affected commands and
+            test files run (default: everything)
+
+    Returns:
+        Results of all commands, failed tests first
+
+    Raises:
+        TestRunnerError: If the tests cannot be run natively and the /test
+            agent should be used instead
+    """
+    commands = get_test_commands(worktree_path)
+    if not commands:
+        raise TestRunnerError(f"No test commands apply to {worktree_path}")
+    commands = apply_selection(commands, selection)
+
+    env = get_safe_subprocess_env()
+    env.update(load_ports_env(worktree_path))
+
+    results: List[TestResult] = []
+    failed_files: Dict[str, List[str]] = {}
+    for command in commands:
+        command_results = run_test_command(command, worktree_path, env, logger)
+        results.extend(command_results)
+        if command.test_glob:
+            failed_files[command.name] = sorted(
+                {
+                    r.test_name.split("::")[0]
+                    for r in command_results
+                    if not r.passed and "::" in r.test_name
+                }
+            )
+
+    # Teach the coverage map which tests these changes broke
+    if selection:
+        record_failures(selection, failed_files)
+
+    failed = sum(1 for r in results if not r.passed)
+    logger.info(f"Native test run: {len(results) - failed} passed, {failed} failed")
+    return sorted(results, key=lambda r: r.passed)
+
+
+def rerun_failed_tests(
+    worktree_path: str,
+    failed: List[TestResult],
+    adw_id: str,
+    logger: logging.Logger,
+) -> List[TestResult]:
+    """Rerun previously failed tests one at a time, stopping at the first failure.
+
+    Each test runs alone through its execution_command, fastest first by
+    recorded duration (tests without one last).
+
+    Returns:
+        Results of the tests that ran, in run order; tests after the first
+        failure are not run
+
+    Raises:
+        TestRunnerError: If a test's command cannot be run
+    """
+    durations = load_test_durations(adw_id)
+    ordered = sorted(
+        failed, key=lambda r: durations.get(r.test_name, float("inf"))
+    )
+
+    env = get_safe_subprocess_env()
+    env.update(load_ports_env(worktree_path))
+
+    results: List[TestResult] = []
+    for test in ordered:
+        logger.info(f"Rerunning {test.test_name}: {test.execution_command}")
+        started = time.monotonic()
+        rerun = test.model_copy(update={"passed": False, "error": None})
+        try:
+            result = subprocess.run(
+                test.execution_command,
+                shell=True,
+                capture_output=True,
+                text=True,
+                cwd=worktree_path,
+                env=env,
+                timeout=get_command_timeout(),
+            )
+        except subprocess.TimeoutExpired:
+            rerun.error = f"Timed out after {get_command_timeout()}s"
+            results.append(rerun)
+            break
+
+        if result.returncode == COMMAND_NOT_FOUND:
+            raise TestRunnerError(f"{test.test_name}: {_truncate(result.stderr)}")
+
+        rerun.passed = result.returncode == 0
+        rerun.duration_seconds = round(time.monotonic() - started, 3)
+        if not rerun.passed:
+            rerun.error = _truncate(result.stdout + "\n" + result.stderr) or (
+                f"Exited with code {result.returncode}"
+            )
+        results.append(rerun)
+        if not rerun.passed:
+            break
+
+    save_test_durations(adw_id, results)
+    passed = sum(1 for r in results if r.passed)
+    logger.info(
+        f"Failure-first rerun: {passed}/{len(failed)} previously failed tests pass"
+        + ("" if passed == len(failed) else ", stopped at the first failure")
+    )
+    return results
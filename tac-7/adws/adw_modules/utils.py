@@ -6,8 +6,14 @@ import os
 import re
 import sys
 import uuid
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, TypeVar, Type, Union, Dict, Optional
+from typing import Any, TypeVar, Type, Union, Dict, Optional, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows - file locks degrade to no-ops
+    fcntl = None
 
 T = TypeVar('T')
 
@@ -36,11 +42,14 @@ def setup_logger(adw_id: str, trigger_type: str = "adw_plan_build") -> logging.L
     # Log file path: agents/{adw_id}/adw_plan_build/execution.log
     log_file = os.path.join(log_dir, "execution.log")
     
-    # Create logger with unique name using adw_id
-    logger = logging.getLogger(f"adw_{adw_id}")
+    # Create logger with unique name using adw_id and trigger type, so phases
+    # running in parallel threads of one workflow keep their own handlers
+    logger = logging.getLogger(f"adw_{adw_id}_{trigger_type}")
     logger.setLevel(logging.DEBUG)
     
-    # Clear any existing handlers to avoid duplicates
+    # Close and clear any existing handlers to avoid duplicates and leaked file handles
+    for handler in list(logger.handlers):
+        handler.close()
     logger.handlers.clear()
     
     # File handler - captures everything
@@ -73,16 +82,37 @@ def setup_logger(adw_id: str, trigger_type: str = "adw_plan_build") -> logging.L
     return logger
 
 
-def get_logger(adw_id: str) -> logging.Logger:
+def get_logger(adw_id: str, trigger_type: str = "adw_plan_build") -> logging.Logger:
     """Get existing logger by ADW ID.
     
     Args:
         adw_id: The ADW workflow ID
+        trigger_type: Type of trigger the logger was set up with
         
     Returns:
         Logger instance
     """
-    return logging.getLogger(f"adw_{adw_id}")
+    return logging.getLogger(f"adw_{adw_id}_{trigger_type}")
+
+
+@contextmanager
+def file_lock(lock_path: str, blocking: bool = True) -> Iterator[None]:
+    """Hold an exclusive advisory lock on lock_path for the duration of the block.
+
+    Used to serialize operations shared between concurrent ADW processes
+    (e.g., claiming a pooled worktree). The lock file is created if missing.
+    With blocking=False, BlockingIOError is raised if the lock is held.
+    """
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    with open(lock_path, "a") as lock_file:
+        if fcntl:
+            flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+            fcntl.flock(lock_file.fileno(), flags)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
 
 
 def parse_json(text: str, target_type: Type[T] = None) -> Union[T, Any]:
@@ -233,6 +263,11 @@ def get_safe_subprocess_env() -> Dict[str, str]:
         "PWD": os.getcwd(),
     }
     
+    # Pass through ADW tuning variables (e.g., ADW_WORKTREE_POOL_SIZE)
+    for key, value in os.environ.items():
+        if key.startswith("ADW_"):
+            safe_env_vars[key] = value
+
     # Add GH_TOKEN as alias for GITHUB_PAT if it exists
     github_pat = os.getenv("GITHUB_PAT")
     if github_pat:
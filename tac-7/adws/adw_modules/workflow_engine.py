@@ -0,0 +1,354 @@
+"""In-process workflow engine for composite ADW workflows.
+
+Composite scripts used to start every phase with `uv run <phase>.py`, paying
+for uv environment resolution, interpreter startup and module imports on
+each transition. The engine instead imports each phase script once and
+calls its main(argv) in the current process, so phases share imported
+modules and cached lookups (repo URL, Claude CLI probe) and a phase
+transition costs milliseconds.
+
+Workflows are declared as PhaseSpec DAGs (see data_types.py). Phases run in
+dependency order and every run is recorded in the phase journal, so a
+resumed workflow skips phases that completed with unchanged inputs, as long
+as the worktree is still at the tree the last skipped phase left. Phase
+failures stop the workflow unless the phase is marked allow_failure.
+
+Phases whose dependencies have all finished run together in threads, in the
+same worktree (e.g. review and document both only need test). Their commits
+are serialised, and a phase that declares commit_paths commits only those
+paths while its siblings commit everything else, so each commit holds one
+phase's work. Results are reported in declaration order. A failure in a
+parallel group stops the workflow once the whole group has finished.
+
+Phases run with ADW_DEFER_GIT_FINALIZE=1; the engine pushes the branch and
+updates the PR once at the end (and before phases marked finalize_before).
+App servers the supervisor kept running for the workflow are stopped when
+it ends.
+
+Configuration (environment):
+    ADW_PHASE_SUBPROCESS  Run each phase as `uv run <script>` instead (default off)
+    ADW_PARALLEL_PHASES   Run independent phases in parallel (default on;
+                          always off with ADW_PHASE_SUBPROCESS)
+"""
+
+import os
+import sys
+import importlib
+import subprocess
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from adw_modules.app_supervisor import stop_app
+from adw_modules.data_types import PhaseInput, PhaseResult, PhaseSpec
+from adw_modules.phase_journal import PhaseJournal
+from adw_modules.git_ops import commit_scope, finalize_deferred_git_operations
+
+# Directory holding the phase scripts (adws/)
+ADWS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFER_FINALIZE_ENV = "ADW_DEFER_GIT_FINALIZE"
+
+# Paths the document phase writes (/document output and its doc index)
+DOCUMENT_COMMIT_PATHS = ["app_docs", ".claude/commands/conditional_docs.md"]
+
+
+def sequential(phases: List[PhaseSpec]) -> List[PhaseSpec]:
+    """Chain phases so each depends on the one before it."""
+    chained = []
+    previous = None
+    for spec in phases:
+        if previous and not spec.depends_on:
+            spec = spec.model_copy(update={"depends_on": [previous]})
+        chained.append(spec)
+        previous = spec.name
+    return chained
+
+
+def topological_order(phases: List[PhaseSpec]) -> List[PhaseSpec]:
+    """Order phases so dependencies come first, keeping declaration order otherwise.
+
+    Raises:
+        ValueError: If a dependency is unknown or the graph has a cycle
+    """
+    by_name = {spec.name: spec for spec in phases}
+    for spec in phases:
+        for dependency in spec.depends_on:
+            if dependency not in by_name:
+                raise ValueError(f"Phase {spec.name} depends on unknown phase {dependency}")
+
+    ordered: List[PhaseSpec] = []
+    done = set()
+    while len(ordered) < len(phases):
+        ready = [
+            spec
+            for spec in phases
+            if spec.name not in done and all(d in done for d in spec.depends_on)
+        ]
+        if not ready:
+            pending = [spec.name for spec in phases if spec.name not in done]
+            raise ValueError(f"Dependency cycle between phases: {', '.join(pending)}")
+        ordered.append(ready[0])
+        done.add(ready[0].name)
+    return ordered
+
+
+def load_phase(script: str) -> Callable[[List[str]], None]:
+    """Import a phase script from adws/ and return its main() entry point."""
+    if ADWS_DIR not in sys.path:
+        sys.path.insert(0, ADWS_DIR)
+    module = importlib.import_module(os.path.splitext(script)[0])
+    return module.main
+
+
+def _exit_code(exit: SystemExit) -> int:
+    if exit.code is None:
+        return 0
+    if isinstance(exit.code, int):
+        return exit.code
+    print(exit.code, file=sys.stderr)
+    return 1
+
+
+def run_phase_in_process(spec: PhaseSpec, phase_input: PhaseInput) -> int:
+    """Call a phase's main() in this process and return its exit code."""
+    main = load_phase(spec.script)
+    try:
+        main(phase_input.to_argv(spec.script))
+    except SystemExit as exit:
+        return _exit_code(exit)
+    except Exception:
+        traceback.print_exc()
+        return 1
+    return 0
+
+
+def run_phase_subprocess(spec: PhaseSpec, phase_input: PhaseInput) -> int:
+    """Run a phase as `uv run <script>` and return its exit code."""
+    cmd = ["uv", "run", os.path.join(ADWS_DIR, spec.script)]
+    cmd += phase_input.to_argv(spec.script)[1:]
+    print(f"Running: {' '.join(cmd)}")
+    return subprocess.run(cmd).returncode
+
+
+def _use_subprocess() -> bool:
+    return os.getenv("ADW_PHASE_SUBPROCESS", "").lower() in ("1", "true", "yes")
+
+
+def is_parallel_enabled() -> bool:
+    """Check whether independent phases run in parallel."""
+    if _use_subprocess():
+        return False
+    return os.getenv("ADW_PARALLEL_PHASES", "1").lower() not in ("0", "false", "no")
+
+
+def run_phase(spec: PhaseSpec, phase_input: PhaseInput) -> int:
+    """Run a phase in the configured mode and return its exit code."""
+    if _use_subprocess():
+        return run_phase_subprocess(spec, phase_input)
+    return run_phase_in_process(spec, phase_input)
+
+
+def get_commit_pathspecs(spec: PhaseSpec, group: List[PhaseSpec]) -> Optional[List[str]]:
+    """Get the paths a phase may commit while its group runs in parallel.
+
+    Returns:
+        The phase's own commit_paths, or everything but its siblings'
+        commit_paths, or None when nothing needs to be kept apart
+    """
+    if spec.commit_paths:
+        return list(spec.commit_paths)
+    excluded = [
+        path for sibling in group if sibling.name != spec.name for path in sibling.commit_paths
+    ]
+    if not excluded:
+        return None
+    return ["."] + [f":(exclude){path}" for path in excluded]
+
+
+def _header(spec: PhaseSpec) -> str:
+    return spec.header or f"{spec.name.upper()} PHASE"
+
+
+def _expected_input_tree(
+    journal: PhaseJournal, dependencies: List[PhaseResult]
+) -> Optional[str]:
+    """Tree a phase starts from: the output of the dependency that finished last."""
+    if len(dependencies) < 2:
+        return dependencies[-1].output_tree if dependencies else None
+
+    def finished_at(result: PhaseResult):
+        entry = journal.last_entry(result.phase, "completed")
+        return entry.recorded_at if entry else None
+
+    finished = [(finished_at(result), result) for result in dependencies]
+    if any(at is None for at, _ in finished):
+        return None
+    return max(finished, key=lambda item: item[0])[1].output_tree
+
+
+def get_resumed_result(
+    journal: PhaseJournal, spec: PhaseSpec, results: Dict[str, PhaseResult]
+) -> Optional[PhaseResult]:
+    """Get a skipped result if the journal shows the phase need not run again.
+
+    Only phases whose dependencies were all skipped can be skipped.
+    """
+    dependencies = [results[d] for d in spec.depends_on]
+    if not all(d.status == "skipped" for d in dependencies):
+        return None
+    entry = journal.get_resumable_entry(
+        spec.name,
+        spec.args,
+        _expected_input_tree(journal, dependencies),
+        is_first_phase=not spec.depends_on,
+    )
+    if not entry:
+        return None
+    return PhaseResult(phase=spec.name, status="skipped", output_tree=entry.output_tree)
+
+
+def get_resume_plan(
+    journal: PhaseJournal, phases: List[PhaseSpec]
+) -> Dict[str, PhaseResult]:
+    """Get the phases a resumed workflow skips, with their skipped results.
+
+    Phases are skipped in dependency order while the journal shows them
+    completed with unchanged inputs. The skipped chain must also end at the
+    worktree's current tree: if commits landed after the journaled runs
+    (manual fixes, a later phase that failed after committing, a rebase),
+    skipped phases are dropped from the end of the chain until the last one
+    produced the current tree, so nothing is reported as skipped over code
+    it never saw. Phases without dependencies (the one that creates the
+    worktree) stay skipped.
+    """
+    skipped: Dict[str, PhaseResult] = {}
+    for spec in topological_order(phases):
+        if not all(d in skipped for d in spec.depends_on):
+            continue
+        result = get_resumed_result(journal, spec, skipped)
+        if result:
+            skipped[spec.name] = result
+
+    chain = [spec for spec in topological_order(phases) if spec.name in skipped]
+    current_tree = journal.current_tree()
+    while chain and chain[-1].depends_on and skipped[chain[-1].name].output_tree != current_tree:
+        del skipped[chain.pop().name]
+    return skipped
+
+
+def execute_phase(
+    journal: PhaseJournal,
+    spec: PhaseSpec,
+    issue_number: str,
+    adw_id: str,
+    pathspecs: Optional[List[str]] = None,
+) -> PhaseResult:
+    """Run one phase under the journal, committing only pathspecs if given."""
+    phase_input = PhaseInput(issue_number=issue_number, adw_id=adw_id, args=spec.args)
+    with commit_scope(pathspecs):
+        exit_code, entry = journal.run_callable(
+            spec.name, lambda: run_phase(spec, phase_input), spec.args
+        )
+    return PhaseResult(
+        phase=spec.name,
+        status="completed" if exit_code == 0 else "failed",
+        exit_code=exit_code,
+        duration_seconds=entry.duration_seconds or 0.0,
+        output_tree=entry.output_tree,
+    )
+
+
+def run_workflow(
+    phases: List[PhaseSpec],
+    issue_number: str,
+    adw_id: str,
+    resume: bool = True,
+    on_failure: Optional[Callable[[PhaseSpec, PhaseResult], None]] = None,
+) -> Tuple[bool, List[PhaseResult]]:
+    """Run a phase DAG for one ADW.
+
+    Args:
+        phases: Phase specs (dependencies must be declared in the list)
+        issue_number: GitHub issue number
+        adw_id: ADW ID shared by every phase
+        resume: Skip phases the journal shows completed with unchanged inputs.
+            Once a phase runs, every phase depending on it runs too.
+        on_failure: Called when a phase that is not allow_failure fails
+
+    Returns:
+        Tuple of (success, results in execution order)
+    """
+    journal = PhaseJournal(adw_id)
+    results: Dict[str, PhaseResult] = {}
+    pending = topological_order(phases)
+    resume_plan = get_resume_plan(journal, phases) if resume else {}
+    previous_env = os.environ.get(DEFER_FINALIZE_ENV)
+    os.environ[DEFER_FINALIZE_ENV] = "1"
+
+    def execute(spec: PhaseSpec, group: List[PhaseSpec]) -> PhaseResult:
+        pathspecs = get_commit_pathspecs(spec, group) if len(group) > 1 else None
+        return execute_phase(journal, spec, issue_number, adw_id, pathspecs)
+
+    try:
+        while pending:
+            ready = [
+                spec for spec in pending if all(d in results for d in spec.depends_on)
+            ]
+            group = ready if is_parallel_enabled() else ready[:1]
+            started = {spec.name for spec in group}
+            pending = [spec for spec in pending if spec.name not in started]
+
+            if any(spec.finalize_before for spec in group):
+                finalize_deferred_git_operations(adw_id)
+
+            to_run = []
+            for spec in group:
+                skipped = resume_plan.get(spec.name)
+                if skipped:
+                    print(f"\n=== {_header(spec)} ===")
+                    print(f"Skipping {spec.name} phase - already completed with unchanged inputs")
+                    results[spec.name] = skipped
+                    continue
+                to_run.append(spec)
+
+            if len(to_run) > 1:
+                headers = " | ".join(_header(spec) for spec in to_run)
+                print(f"\n=== {headers} (parallel) ===")
+                with ThreadPoolExecutor(max_workers=len(to_run)) as executor:
+                    futures = [executor.submit(execute, spec, to_run) for spec in to_run]
+                    group_results = [future.result() for future in futures]
+            elif to_run:
+                spec = to_run[0]
+                print(f"\n=== {_header(spec)} ===")
+                group_results = [execute(spec, to_run)]
+            else:
+                group_results = []
+
+            failed = None
+            for spec, result in zip(to_run, group_results):
+                results[spec.name] = result
+                print(f"{spec.name} phase {result.status} in {result.duration_seconds:.1f}s")
+                if result.status != "failed":
+                    continue
+                if spec.allow_failure:
+                    print(f"WARNING: {spec.name} phase failed but continuing")
+                elif failed is None:
+                    failed = (spec, result)
+
+            if failed:
+                if on_failure:
+                    on_failure(*failed)
+                # Push what the completed phases produced
+                finalize_deferred_git_operations(adw_id)
+                return False, list(results.values())
+
+        finalize_deferred_git_operations(adw_id)
+        return True, list(results.values())
+    finally:
+        # App servers kept for test and review phases end with the workflow
+        stop_app(adw_id)
+        if previous_env is None:
+            os.environ.pop(DEFER_FINALIZE_ENV, None)
+        else:
+            os.environ[DEFER_FINALIZE_ENV] = previous_env
@@ -0,0 +1,334 @@
+"""Garbage collection of ADW worktrees under trees/.
+
+Each trees/<adw_id>/ worktree is tied back to its ADW through ADWState and
+the phase journal. A worktree is collected when its branch was merged into
+origin/main (its own commits are in main and the worktree is clean), when it
+has been idle longer than the max age, or (least recently used first) when
+the worktree count or disk quota is exceeded. Worktrees with a phase in
+progress are never collected: a phase process marked running (see
+phase_journal.mark_phase_running), a journal phase started without a
+matching completed or failed entry whose runner is alive, or recent state
+activity all count. Before removal,
+the ADW's supervised app servers and any other processes still listening
+on its leased ports are stopped.
+
+Configuration (environment):
+    ADW_GC_MAX_AGE_DAYS       Idle days before a worktree is collected (default 7)
+    ADW_GC_MAX_WORKTREES      Worktrees to keep at most (default 30)
+    ADW_GC_DISK_QUOTA_GB      Size limit for trees/ in GB (default 0 = no limit)
+    ADW_GC_BATCH_SIZE         Worktrees removed per run at most (default 5)
+    ADW_GC_ACTIVE_MINUTES     State updated this recently counts as running (default 60)
+"""
+
+import os
+import signal
+import time
+import logging
+import subprocess
+from typing import List, Optional, Set
+
+from pydantic import BaseModel
+
+from adw_modules.app_supervisor import stop_app
+from adw_modules.state import ADWState
+from adw_modules.git_backend import get_git_backend
+from adw_modules.phase_journal import PhaseJournal, get_running_pids
+from adw_modules.port_leases import get_lease, reclaim_stale_leases
+from adw_modules.worktree_ops import remove_worktree
+
+
+class GCPolicy(BaseModel):
+    """Limits that decide which worktrees are collected."""
+
+    max_age_days: float = 7
+    max_worktrees: int = 30
+    disk_quota_gb: float = 0  # 0 disables the quota
+    batch_size: int = 5
+    active_minutes: float = 60
+
+    @classmethod
+    def from_env(cls) -> "GCPolicy":
+        """Build the policy from ADW_GC_* environment variables."""
+        return cls(
+            max_age_days=float(os.getenv("ADW_GC_MAX_AGE_DAYS", "7")),
+            max_worktrees=int(os.getenv("ADW_GC_MAX_WORKTREES", "30")),
+            disk_quota_gb=float(os.getenv("ADW_GC_DISK_QUOTA_GB", "0")),
+            batch_size=int(os.getenv("ADW_GC_BATCH_SIZE", "5")),
+            active_minutes=float(os.getenv("ADW_GC_ACTIVE_MINUTES", "60")),
+        )
+
+
+class WorktreeCandidate(BaseModel):
+    """A worktree under trees/ with the facts GC decides on."""
+
+    adw_id: str
+    path: str
+    branch_name: Optional[str] = None
+    last_active: float  # Epoch seconds of the latest state/journal/worktree change
+    running: bool = False
+    merged: bool = False
+    size_kb: Optional[int] = None
+    reason: Optional[str] = None  # Why it was selected for collection
+
+
+def get_project_root() -> str:
+    """Get the project root (parent of adws directory)."""
+    return os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+
+
+def get_trees_dir() -> str:
+    """Get the directory holding ADW worktrees."""
+    return os.path.join(get_project_root(), "trees")
+
+
+def get_disk_usage_kb(path: str) -> int:
+    """Get the disk usage of a path in KB (hardlinks counted once)."""
+    result = subprocess.run(["du", "-sk", path], capture_output=True, text=True)
+    try:
+        return int(result.stdout.split()[0])
+    except (IndexError, ValueError):
+        return 0
+
+
+def get_merged_branches() -> Set[str]:
+    """Get local branches whose own commits were merged into origin/main.
+
+    A branch with no commits of its own (fresh from origin/main) is also
+    contained in main, so branches whose tip lies on main's first-parent
+    history are left out: ADW branches are merged with --no-ff merge
+    commits, which keep their commits off that line.
+    """
+    project_root = get_project_root()
+    result = subprocess.run(
+        [
+            "git", "for-each-ref", "--merged", "origin/main",
+            "--format=%(objectname) %(refname:short)", "refs/heads",
+        ],
+        capture_output=True,
+        text=True,
+        cwd=project_root,
+    )
+    if result.returncode != 0:
+        return set()
+
+    mainline = subprocess.run(
+        ["git", "rev-list", "--first-parent", "origin/main"],
+        capture_output=True,
+        text=True,
+        cwd=project_root,
+    )
+    if mainline.returncode != 0:
+        return set()
+    mainline_commits = set(mainline.stdout.split())
+
+    merged = set()
+    for line in result.stdout.splitlines():
+        sha, _, branch = line.partition(" ")
+        if branch and sha not in mainline_commits:
+            merged.add(branch)
+    return merged
+
+
+def _get_mtime(path: str) -> float:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def collect_candidates(policy: GCPolicy) -> List[WorktreeCandidate]:
+    """Describe every ADW worktree under trees/, least recently active first.
+
+    Pool slots (trees/_pool) and caches (trees/.dep_cache) are skipped.
+    """
+    trees_dir = get_trees_dir()
+    if not os.path.isdir(trees_dir):
+        return []
+
+    merged_branches = get_merged_branches()
+    now = time.time()
+    candidates = []
+
+    for adw_id in os.listdir(trees_dir):
+        path = os.path.join(trees_dir, adw_id)
+        if adw_id.startswith(("_", ".")) or not os.path.isdir(path):
+            continue
+
+        state = ADWState.load(adw_id)
+        journal = PhaseJournal(adw_id)
+
+        last_active = max(
+            _get_mtime(path),
+            _get_mtime(state.get_state_path()) if state else 0.0,
+            _get_mtime(journal.get_journal_path()),
+        )
+
+        # A journal phase without an outcome is running while its runner lives;
+        # entries written before runners were recorded go stale after max age
+        unfinished_running = any(
+            _pid_alive(entry.pid)
+            if entry.pid
+            else now - entry.recorded_at.timestamp() < policy.max_age_days * 86400
+            for entry in journal.get_unfinished_entries()
+        )
+        running = (
+            bool(get_running_pids(adw_id))
+            or unfinished_running
+            or now - last_active < policy.active_minutes * 60
+        )
+
+        branch_name = state.get("branch_name") if state else None
+        # Uncommitted work in a merged branch's worktree would be lost
+        merged = (
+            bool(branch_name)
+            and branch_name in merged_branches
+            and not get_git_backend().has_changes(cwd=path)
+        )
+        candidates.append(
+            WorktreeCandidate(
+                adw_id=adw_id,
+                path=path,
+                branch_name=branch_name,
+                last_active=last_active,
+                running=running,
+                merged=merged,
+            )
+        )
+
+    return sorted(candidates, key=lambda candidate: candidate.last_active)
+
+
+def select_for_collection(
+    candidates: List[WorktreeCandidate], policy: GCPolicy
+) -> List[WorktreeCandidate]:
+    """Apply the policy to candidates (oldest first) and pick what to remove.
+
+    Merged and expired worktrees go first, then least recently used ones
+    while over the count limit or disk quota. Capped at the batch size so
+    space is reclaimed incrementally.
+    """
+    now = time.time()
+    idle = [candidate for candidate in candidates if not candidate.running]
+    selected: List[WorktreeCandidate] = []
+
+    for candidate in idle:
+        if candidate.merged:
+            candidate.reason = f"branch {candidate.branch_name} merged"
+            selected.append(candidate)
+        elif now - candidate.last_active > policy.max_age_days * 86400:
+            days = (now - candidate.last_active) / 86400
+            candidate.reason = f"idle for {days:.1f} days"
+            selected.append(candidate)
+
+    remaining = [candidate for candidate in idle if candidate not in selected]
+    kept_count = len(candidates) - len(selected)
+    for candidate in remaining:
+        if kept_count <= policy.max_worktrees:
+            break
+        candidate.reason = f"over max of {policy.max_worktrees} worktrees"
+        selected.append(candidate)
+        kept_count -= 1
+
+    if policy.disk_quota_gb > 0:
+        quota_kb = policy.disk_quota_gb * 1024 * 1024
+        used_kb = get_disk_usage_kb(get_trees_dir())
+        for candidate in selected:
+            candidate.size_kb = get_disk_usage_kb(candidate.path)
+            used_kb -= candidate.size_kb
+        for candidate in remaining:
+            if used_kb <= quota_kb:
+                break
+            if candidate in selected:
+                continue
+            candidate.size_kb = get_disk_usage_kb(candidate.path)
+            candidate.reason = f"over disk quota of {policy.disk_quota_gb} GB"
+            selected.append(candidate)
+            used_kb -= candidate.size_kb
+
+    return selected[: policy.batch_size]
+
+
+def _get_listening_pids(port: int) -> List[int]:
+    """Get PIDs listening on a TCP port (via lsof)."""
+    result = subprocess.run(
+        ["lsof", "-t", f"-iTCP:{port}", "-sTCP:LISTEN"],
+        capture_output=True,
+        text=True,
+    )
+    return [int(pid) for pid in result.stdout.split() if pid.isdigit()]
+
+
+def stop_port_processes(adw_id: str, logger: logging.Logger) -> int:
+    """Stop processes still listening on an ADW's leased ports.
+
+    Returns:
+        Number of processes signalled
+    """
+    lease = get_lease(adw_id)
+    if not lease:
+        return 0
+
+    stopped = 0
+    for port in (lease["backend_port"], lease["frontend_port"]):
+        try:
+            pids = _get_listening_pids(port)
+        except FileNotFoundError:
+            logger.warning("lsof not available - cannot stop leftover processes")
+            return stopped
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+                logger.info(f"Stopped process {pid} on port {port} for {adw_id}")
+                stopped += 1
+            except ProcessLookupError:
+                pass
+            except PermissionError:
+                logger.warning(f"No permission to stop process {pid} on port {port}")
+    return stopped
+
+
+def run_gc(
+    policy: GCPolicy, logger: logging.Logger, dry_run: bool = False
+) -> List[WorktreeCandidate]:
+    """Run one incremental GC pass.
+
+    Returns:
+        The worktrees that were (or, in a dry run, would be) removed
+    """
+    candidates = collect_candidates(policy)
+    selected = select_for_collection(candidates, policy)
+    logger.info(
+        f"GC: {len(candidates)} worktree(s), "
+        f"{sum(1 for c in candidates if c.running)} running, "
+        f"{len(selected)} selected"
+    )
+
+    for candidate in selected:
+        logger.info(f"{'Would remove' if dry_run else 'Removing'} {candidate.adw_id}: {candidate.reason}")
+        if dry_run:
+            continue
+        stop_app(candidate.adw_id, logger)
+        stop_port_processes(candidate.adw_id, logger)
+        success, error = remove_worktree(candidate.adw_id, logger)
+        if not success:
+            logger.error(f"Failed to remove {candidate.adw_id}: {error}")
+
+    if not dry_run:
+        subprocess.run(
+            ["git", "worktree", "prune"], capture_output=True, cwd=get_project_root()
+        )
+        reclaim_stale_leases(logger)
+
+    return selected
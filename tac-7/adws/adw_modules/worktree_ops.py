@@ -1,24 +1,35 @@
 """Worktree and port management operations for isolated ADW workflows.
 
 Provides utilities for creating and managing git worktrees under trees/<adw_id>/
-and allocating unique ports for each isolated instance.
+and allocating unique ports for each isolated instance. Ports are leased
+through the registry in port_leases.py.
 """
 
 import os
+import shutil
 import subprocess
 import logging
-import socket
-from typing import Tuple, Optional
+from typing import List, Tuple, Optional
 from adw_modules.state import ADWState
-
-
-def create_worktree(adw_id: str, branch_name: str, logger: logging.Logger) -> Tuple[str, Optional[str]]:
+from adw_modules.fetch_coordinator import fetch_origin
+from adw_modules.worktree_registry import get_worktree_by_path, repair_state
+from adw_modules.sparse_checkout import create_sparse_worktree
+from adw_modules.port_leases import release_ports, renew_lease
+
+
+def create_worktree(
+    adw_id: str,
+    branch_name: str,
+    logger: logging.Logger,
+    sparse_patterns: Optional[List[str]] = None,
+) -> Tuple[str, Optional[str]]:
     """Create a git worktree for isolated ADW execution.
     
     Args:
         adw_id: The ADW ID for this worktree
         branch_name: The branch name to create the worktree from
         logger: Logger instance
+        sparse_patterns: Cone directories for a sparse checkout (None = full checkout)
         
     Returns:
         Tuple of (worktree_path, error_message)
@@ -41,16 +52,16 @@ def create_worktree(adw_id: str, branch_name: str, logger: logging.Logger) -> Tu
         logger.warning(f"Worktree already exists at {worktree_path}")
         return worktree_path, None
     
-    # First, fetch latest changes from origin
-    logger.info("Fetching latest changes from origin")
-    fetch_result = subprocess.run(
-        ["git", "fetch", "origin"], 
-        capture_output=True, 
-        text=True, 
-        cwd=project_root
-    )
-    if fetch_result.returncode != 0:
-        logger.warning(f"Failed to fetch from origin: {fetch_result.stderr}")
+    # First, fetch latest main from origin (coalesced with concurrent ADWs)
+    fetch_origin(["main"], logger)
+    
+    if sparse_patterns:
+        success, error = create_sparse_worktree(worktree_path, branch_name, sparse_patterns, logger)
+        if not success:
+            logger.error(error)
+            return None, error
+        logger.info(f"Created sparse worktree at {worktree_path} for branch {branch_name}")
+        return worktree_path, None
     
     # Create the worktree using git, branching from origin/main
     # Use -b to create the branch as part of worktree creation
@@ -80,6 +91,9 @@ def validate_worktree(adw_id: str, state: ADWState) -> Tuple[bool, Optional[str]
     2. Directory exists on filesystem
     3. Git knows about the worktree
     
+    A worktree_path recovered from git is set on state but not saved; the
+    phase's next state.save() persists it.
+    
     Args:
         adw_id: The ADW ID to validate
         state: The ADW state object
@@ -87,6 +101,10 @@ def validate_worktree(adw_id: str, state: ADWState) -> Tuple[bool, Optional[str]
     Returns:
         Tuple of (is_valid, error_message)
     """
+    # Reconcile state with git metadata first (recovers a lost or unlinked path)
+    if not get_worktree_by_path(state.get("worktree_path") or ""):
+        repair_state(adw_id, state)
+    
     # Check state has worktree_path
     worktree_path = state.get("worktree_path")
     if not worktree_path:
@@ -96,11 +114,13 @@ def validate_worktree(adw_id: str, state: ADWState) -> Tuple[bool, Optional[str]
     if not os.path.exists(worktree_path):
         return False, f"Worktree directory not found: {worktree_path}"
     
-    # Check git knows about it
-    result = subprocess.run(["git", "worktree", "list"], capture_output=True, text=True)
-    if worktree_path not in result.stdout:
+    # Check git knows about it (read from .git/worktrees, no process spawn)
+    if not get_worktree_by_path(worktree_path):
         return False, "Worktree not registered with git"
     
+    # Every isolated phase validates its worktree first, so this is the lease heartbeat
+    renew_lease(adw_id)
+    
     return True, None
 
 
@@ -131,9 +151,13 @@ def remove_worktree(adw_id: str, logger: logging.Logger) -> Tuple[bool, Optional
     """
     worktree_path = get_worktree_path(adw_id)
     
+    project_root = os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    
     # First remove via git
     cmd = ["git", "worktree", "remove", worktree_path, "--force"]
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    result = subprocess.run(cmd, capture_output=True, text=True, cwd=project_root)
     
     if result.returncode != 0:
         # Try to clean up manually if git command failed
@@ -144,6 +168,8 @@ def remove_worktree(adw_id: str, logger: logging.Logger) -> Tuple[bool, Optional
             except Exception as e:
                 return False, f"Failed to remove worktree: {result.stderr}, manual cleanup failed: {e}"
     
+    release_ports(adw_id, logger)
+    
     logger.info(f"Removed worktree at {worktree_path}")
     return True, None
 
@@ -169,75 +195,3 @@ def setup_worktree_environment(worktree_path: str, backend_port: int, frontend_p
         f.write(f"VITE_BACKEND_URL=http://localhost:{backend_port}\n")
     
     logger.info(f"Created .ports.env with Backend: {backend_port}, Frontend: {frontend_port}")
-
-
-# Port management functions
-
-def get_ports_for_adw(adw_id: str) -> Tuple[int, int]:
-    """Deterministically assign ports based on ADW ID.
-    
-    Args:
-        adw_id: The ADW ID
-        
-    Returns:
-        Tuple of (backend_port, frontend_port)
-    """
-    # Convert first 8 chars of ADW ID to index (0-14)
-    # Using base 36 conversion and modulo to get consistent mapping
-    try:
-        # Take first 8 alphanumeric chars and convert from base 36
-        id_chars = ''.join(c for c in adw_id[:8] if c.isalnum())
-        index = int(id_chars, 36) % 15
-    except ValueError:
-        # Fallback to simple hash if conversion fails
-        index = hash(adw_id) % 15
-    
-    backend_port = 9100 + index
-    frontend_port = 9200 + index
-    
-    return backend_port, frontend_port
-
-
-def is_port_available(port: int) -> bool:
-    """Check if a port is available for binding.
-    
-    Args:
-        port: Port number to check
-        
-    Returns:
-        True if port is available, False otherwise
-    """
-    try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.settimeout(1)
-            s.bind(('localhost', port))
-            return True
-    except (socket.error, OSError):
-        return False
-
-
-def find_next_available_ports(adw_id: str, max_attempts: int = 15) -> Tuple[int, int]:
-    """Find available ports starting from deterministic assignment.
-    
-    Args:
-        adw_id: The ADW ID
-        max_attempts: Maximum number of attempts (default 15)
-        
-    Returns:
-        Tuple of (backend_port, frontend_port)
-        
-    Raises:
-        RuntimeError: If no available ports found
-    """
-    base_backend, base_frontend = get_ports_for_adw(adw_id)
-    base_index = base_backend - 9100
-    
-    for offset in range(max_attempts):
-        index = (base_index + offset) % 15
-        backend_port = 9100 + index
-        frontend_port = 9200 + index
-        
-        if is_port_available(backend_port) and is_port_available(frontend_port):
-            return backend_port, frontend_port
-    
-    raise RuntimeError("No available ports in the allocated range")
\ No newline at end of file
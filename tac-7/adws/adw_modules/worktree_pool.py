@@ -0,0 +1,354 @@
+"""Pre-warmed worktree pool for isolated ADW workflows.
+
+Keeps up to ADW_WORKTREE_POOL_SIZE worktrees under trees/_pool/<slot_id>/,
+checked out at origin/main with ports allocated and dependencies installed.
+Entry point workflows claim a slot instead of creating a worktree from
+scratch: the slot is moved to trees/<adw_id>/, switched to the ADW branch
+and recorded in ADWState, and a background process refills the pool.
+"""
+
+import os
+import glob
+import hashlib
+import logging
+import shutil
+import subprocess
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from adw_modules.data_types import AgentTemplateRequest, WorktreePoolSlot
+from adw_modules.utils import file_lock, get_safe_subprocess_env
+from adw_modules.fetch_coordinator import fetch_origin
+from adw_modules.git_backend import get_git_backend
+from adw_modules.worktree_ops import get_worktree_path, setup_worktree_environment
+from adw_modules.port_leases import acquire_ports, release_ports, transfer_lease
+from adw_modules.dependency_cache import (
+    DEPENDENCY_LOCKFILES,
+    prepare_relocatable_venv,
+    materialise_dependencies,
+    populate_dependency_cache,
+)
+
+# Slots stuck in "filling" longer than this are assumed to be abandoned
+FILL_TIMEOUT_SECONDS = 30 * 60
+
+
+def get_project_root() -> str:
+    """Get the project root (parent of adws directory)."""
+    return os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+
+
+def get_pool_dir() -> str:
+    """Get the directory holding pooled worktrees and their metadata."""
+    return os.path.join(get_project_root(), "trees", "_pool")
+
+
+def get_pool_size() -> int:
+    """Get the target number of pooled worktrees (0 disables the pool)."""
+    try:
+        return max(0, int(os.getenv("ADW_WORKTREE_POOL_SIZE", "0")))
+    except ValueError:
+        return 0
+
+
+def _get_lock_path() -> str:
+    return os.path.join(get_pool_dir(), ".lock")
+
+
+def _get_slot_meta_path(slot_id: str) -> str:
+    return os.path.join(get_pool_dir(), f"{slot_id}.json")
+
+
+def _save_slot(slot: WorktreePoolSlot) -> None:
+    os.makedirs(get_pool_dir(), exist_ok=True)
+    with open(_get_slot_meta_path(slot.slot_id), "w") as f:
+        f.write(slot.model_dump_json(indent=2))
+
+
+def _delete_slot_meta(slot_id: str) -> None:
+    meta_path = _get_slot_meta_path(slot_id)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+
+def list_slots(logger: Optional[logging.Logger] = None) -> List[WorktreePoolSlot]:
+    """List all pool slots, oldest first."""
+    slots = []
+    for meta_path in glob.glob(os.path.join(get_pool_dir(), "*.json")):
+        try:
+            with open(meta_path, "r") as f:
+                slots.append(WorktreePoolSlot.model_validate_json(f.read()))
+        except Exception as e:
+            if logger:
+                logger.warning(f"Ignoring unreadable pool slot {meta_path}: {e}")
+    return sorted(slots, key=lambda slot: slot.created_at)
+
+
+def get_lockfile_hash(ref: str = "origin/main") -> Optional[str]:
+    """Hash the dependency lockfiles at a git ref.
+
+    Uses the blob ids from `git ls-tree`, so no files need to be read.
+    Returns None if the ref cannot be resolved.
+    """
+    result = subprocess.run(
+        ["git", "ls-tree", ref, "--"] + DEPENDENCY_LOCKFILES,
+        capture_output=True,
+        text=True,
+        cwd=get_project_root(),
+    )
+    if result.returncode != 0:
+        return None
+    return hashlib.sha256(result.stdout.encode()).hexdigest()[:16]
+
+
+def _is_abandoned(slot: WorktreePoolSlot) -> bool:
+    if slot.status == "claimed":
+        # A finished claim deletes its metadata; a leftover means the claimer died
+        return not os.path.exists(slot.worktree_path)
+    age = (datetime.now() - slot.created_at).total_seconds()
+    return slot.status == "filling" and age > FILL_TIMEOUT_SECONDS
+
+
+def remove_slot(slot: WorktreePoolSlot, logger: logging.Logger) -> None:
+    """Remove a slot's worktree and metadata."""
+    result = subprocess.run(
+        ["git", "worktree", "remove", slot.worktree_path, "--force"],
+        capture_output=True,
+        text=True,
+        cwd=get_project_root(),
+    )
+    if result.returncode != 0 and os.path.exists(slot.worktree_path):
+        shutil.rmtree(slot.worktree_path, ignore_errors=True)
+        subprocess.run(
+            ["git", "worktree", "prune"], capture_output=True, cwd=get_project_root()
+        )
+    _delete_slot_meta(slot.slot_id)
+    release_ports(slot.slot_id, logger)
+    logger.info(f"Removed pool slot {slot.slot_id}")
+
+
+def fill_slot(logger: logging.Logger) -> Tuple[Optional[WorktreePoolSlot], Optional[str]]:
+    """Create one pooled worktree at origin/main and install its dependencies.
+
+    Returns:
+        Tuple of (ready slot, error_message)
+    """
+    # Imported here to avoid pulling the agent module into every pool import
+    from adw_modules.agent import execute_template
+    from adw_modules.utils import make_adw_id
+
+    project_root = get_project_root()
+    slot_id = f"pool-{make_adw_id()}"
+    slot = WorktreePoolSlot(
+        slot_id=slot_id, worktree_path=os.path.join(get_pool_dir(), slot_id)
+    )
+
+    # Reserve the slot under the lock so concurrent fillers don't overfill
+    with file_lock(_get_lock_path()):
+        live_slots = [s for s in list_slots(logger) if s.status != "claimed"]
+        if len(live_slots) >= get_pool_size():
+            return None, None
+        _save_slot(slot)
+
+    fetch_origin(["main"], logger)
+
+    result = subprocess.run(
+        ["git", "worktree", "add", "--detach", slot.worktree_path, "origin/main"],
+        capture_output=True,
+        text=True,
+        cwd=project_root,
+    )
+    if result.returncode != 0:
+        _delete_slot_meta(slot_id)
+        return None, f"Failed to create pool worktree: {result.stderr}"
+
+    slot.base_commit = get_git_backend().head_commit(slot.worktree_path)
+    slot.lockfile_hash = get_lockfile_hash(slot.base_commit or "origin/main")
+
+    try:
+        slot.backend_port, slot.frontend_port = acquire_ports(slot_id, logger)
+    except RuntimeError as e:
+        remove_slot(slot, logger)
+        return None, f"Failed to lease ports for pool worktree: {e}"
+    setup_worktree_environment(
+        slot.worktree_path, slot.backend_port, slot.frontend_port, logger
+    )
+
+    # A relocatable venv keeps console scripts working after the slot is moved
+    materialise_dependencies(slot.worktree_path, logger)
+    prepare_relocatable_venv(slot.worktree_path)
+
+    install_request = AgentTemplateRequest(
+        agent_name="ops",
+        slash_command="/install_worktree",
+        args=[slot.worktree_path, str(slot.backend_port), str(slot.frontend_port)],
+        adw_id=slot_id,
+        working_dir=slot.worktree_path,
+    )
+    install_response = execute_template(install_request)
+    if not install_response.success:
+        remove_slot(slot, logger)
+        return None, f"Failed to install pool worktree: {install_response.output}"
+
+    populate_dependency_cache(slot.worktree_path, logger)
+
+    slot.status = "ready"
+    _save_slot(slot)
+    logger.info(f"Pool slot {slot_id} ready at {slot.base_commit}")
+    return slot, None
+
+
+def fill_pool(logger: logging.Logger) -> int:
+    """Fill the pool up to its target size.
+
+    Abandoned slots (a filler or claimer that died) are cleaned up first.
+
+    Returns:
+        Number of slots created
+    """
+    for slot in list_slots(logger):
+        if _is_abandoned(slot):
+            logger.warning(f"Removing abandoned pool slot {slot.slot_id}")
+            remove_slot(slot, logger)
+
+    created = 0
+    while True:
+        slot, error = fill_slot(logger)
+        if error:
+            logger.error(error)
+            break
+        if not slot:
+            break
+        created += 1
+    return created
+
+
+def drain_pool(logger: logging.Logger) -> int:
+    """Remove every ready slot from the pool.
+
+    Slots another process is still filling are left alone, unless their
+    filler has been gone longer than FILL_TIMEOUT_SECONDS.
+
+    Returns:
+        Number of slots removed
+    """
+    removed = 0
+    with file_lock(_get_lock_path()):
+        for slot in list_slots(logger):
+            if slot.status == "ready" or (slot.status == "filling" and _is_abandoned(slot)):
+                remove_slot(slot, logger)
+                removed += 1
+    return removed
+
+
+def start_background_refill(logger: logging.Logger) -> None:
+    """Refill the pool in a detached process so the caller isn't delayed."""
+    script = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "adw_worktree_pool.py",
+    )
+    subprocess.Popen(
+        ["uv", "run", script, "fill"],
+        cwd=get_project_root(),
+        env=get_safe_subprocess_env(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    logger.debug("Started background worktree pool refill")
+
+
+def _checkout_branch(worktree_path: str, branch_name: str) -> Optional[str]:
+    """Switch a claimed worktree to the ADW branch, creating it from origin/main."""
+    exists = subprocess.run(
+        ["git", "show-ref", "--verify", "--quiet", f"refs/heads/{branch_name}"],
+        cwd=worktree_path,
+    )
+    if exists.returncode == 0:
+        cmd = ["git", "checkout", branch_name]
+    else:
+        cmd = ["git", "checkout", "-b", branch_name, "origin/main"]
+
+    result = subprocess.run(cmd, capture_output=True, text=True, cwd=worktree_path)
+    if result.returncode != 0:
+        return result.stderr
+    return None
+
+
+def claim_worktree(
+    adw_id: str, branch_name: str, logger: logging.Logger
+) -> Optional[WorktreePoolSlot]:
+    """Claim a ready pooled worktree for an ADW.
+
+    The slot is moved to trees/<adw_id>/ and switched to branch_name.
+    Slots whose installed dependencies no longer match origin/main are
+    discarded. A background refill is started whenever a slot is claimed.
+
+    Args:
+        adw_id: The ADW ID claiming the worktree
+        branch_name: Branch to create (from origin/main) or check out
+        logger: Logger instance
+
+    Returns:
+        The claimed slot with worktree_path set to the new location,
+        or None if the pool is disabled or has no usable slot
+    """
+    if get_pool_size() == 0:
+        return None
+
+    project_root = get_project_root()
+    fetch_origin(["main"], logger)
+    current_lockfile_hash = get_lockfile_hash()
+
+    claimed = None
+    with file_lock(_get_lock_path()):
+        for slot in list_slots(logger):
+            if slot.status != "ready":
+                continue
+            if slot.lockfile_hash != current_lockfile_hash:
+                logger.info(f"Discarding pool slot {slot.slot_id}: dependencies changed")
+                remove_slot(slot, logger)
+                continue
+            slot.status = "claimed"
+            _save_slot(slot)
+            claimed = slot
+            break
+
+    if not claimed:
+        logger.info("No ready worktree in pool")
+        start_background_refill(logger)
+        return None
+
+    target_path = get_worktree_path(adw_id)
+    result = subprocess.run(
+        ["git", "worktree", "move", claimed.worktree_path, target_path],
+        capture_output=True,
+        text=True,
+        cwd=project_root,
+    )
+    if result.returncode != 0:
+        logger.error(f"Failed to move pool slot {claimed.slot_id}: {result.stderr}")
+        remove_slot(claimed, logger)
+        start_background_refill(logger)
+        return None
+
+    error = _checkout_branch(target_path, branch_name)
+    if error:
+        logger.error(f"Failed to check out {branch_name} in claimed worktree: {error}")
+        claimed.worktree_path = target_path
+        remove_slot(claimed, logger)
+        start_background_refill(logger)
+        return None
+
+    _delete_slot_meta(claimed.slot_id)
+    transfer_lease(claimed.slot_id, adw_id)
+    claimed.worktree_path = target_path
+    logger.info(
+        f"Claimed pooled worktree {claimed.slot_id} at {target_path} "
+        f"(ports {claimed.backend_port}/{claimed.frontend_port})"
+    )
+
+    start_background_refill(logger)
+    return claimed
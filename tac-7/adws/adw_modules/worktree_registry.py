@@ -0,0 +1,208 @@
+"""In-process registry of git worktrees.
+
+Reads the linked worktree metadata git keeps in <common-dir>/worktrees/<name>/
+(gitdir, HEAD, locked) directly instead of spawning `git worktree list`.
+Results are cached per process and re-read only when a worktree is added,
+removed or switches HEAD.
+"""
+
+import os
+import logging
+import subprocess
+from typing import Dict, List, Optional, Tuple
+
+from adw_modules.data_types import WorktreeInfo
+from adw_modules.state import ADWState
+
+# Cache of parsed worktrees, keyed by the metadata signature it was built from
+_cache: Dict[str, object] = {"signature": None, "worktrees": []}
+_common_dir: Optional[str] = None
+
+
+def get_project_root() -> str:
+    """Get the project root (parent of adws directory)."""
+    return os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+
+
+def _read_file(path: str) -> Optional[str]:
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def get_git_common_dir() -> Optional[str]:
+    """Find the repository's common git directory without spawning git.
+
+    Walks up from the project root to the first .git entry. A .git file
+    (the project root is itself a worktree) is followed to its commondir.
+    """
+    global _common_dir
+    if _common_dir:
+        return _common_dir
+
+    current = get_project_root()
+    while True:
+        dot_git = os.path.join(current, ".git")
+        if os.path.isdir(dot_git):
+            _common_dir = dot_git
+            break
+        if os.path.isfile(dot_git):
+            content = _read_file(dot_git) or ""
+            if content.startswith("gitdir:"):
+                gitdir = os.path.normpath(
+                    os.path.join(current, content[len("gitdir:"):].strip())
+                )
+                commondir = _read_file(os.path.join(gitdir, "commondir"))
+                _common_dir = (
+                    os.path.normpath(os.path.join(gitdir, commondir))
+                    if commondir
+                    else gitdir
+                )
+            break
+        parent = os.path.dirname(current)
+        if parent == current:
+            break
+        current = parent
+
+    return _common_dir
+
+
+def _get_signature(worktrees_dir: str) -> Tuple:
+    """Build a cheap signature of the worktree metadata for cache invalidation."""
+    try:
+        entries = sorted(os.listdir(worktrees_dir))
+    except OSError:
+        return ()
+
+    signature = []
+    for name in entries:
+        admin_dir = os.path.join(worktrees_dir, name)
+        try:
+            head_mtime = os.stat(os.path.join(admin_dir, "HEAD")).st_mtime_ns
+            gitdir_mtime = os.stat(os.path.join(admin_dir, "gitdir")).st_mtime_ns
+        except OSError:
+            head_mtime = gitdir_mtime = 0
+        locked = os.path.exists(os.path.join(admin_dir, "locked"))
+        signature.append((name, head_mtime, gitdir_mtime, locked))
+    return tuple(signature)
+
+
+def _parse_worktree(worktrees_dir: str, name: str) -> Optional[WorktreeInfo]:
+    admin_dir = os.path.join(worktrees_dir, name)
+    gitdir = _read_file(os.path.join(admin_dir, "gitdir"))
+    if not gitdir:
+        return None
+
+    # gitdir points at <worktree>/.git and may be relative to the admin dir
+    if not os.path.isabs(gitdir):
+        gitdir = os.path.normpath(os.path.join(admin_dir, gitdir))
+    path = os.path.dirname(gitdir)
+
+    head = _read_file(os.path.join(admin_dir, "HEAD")) or ""
+    branch = None
+    sha = None
+    if head.startswith("ref:"):
+        ref = head[len("ref:"):].strip()
+        branch = ref[len("refs/heads/"):] if ref.startswith("refs/heads/") else ref
+    elif head:
+        sha = head
+
+    return WorktreeInfo(
+        name=name,
+        path=path,
+        head=sha,
+        branch=branch,
+        locked=os.path.exists(os.path.join(admin_dir, "locked")),
+        prunable=not os.path.exists(gitdir),
+    )
+
+
+def list_worktrees() -> List[WorktreeInfo]:
+    """List linked worktrees (the main checkout is not included)."""
+    common_dir = get_git_common_dir()
+    if not common_dir:
+        return []
+
+    worktrees_dir = os.path.join(common_dir, "worktrees")
+    signature = _get_signature(worktrees_dir)
+    if signature != _cache["signature"]:
+        worktrees = []
+        for name, *_ in signature:
+            info = _parse_worktree(worktrees_dir, name)
+            if info:
+                worktrees.append(info)
+        _cache["signature"] = signature
+        _cache["worktrees"] = worktrees
+
+    return list(_cache["worktrees"])
+
+
+def get_worktree_by_path(path: str) -> Optional[WorktreeInfo]:
+    """Look up a worktree by its filesystem path."""
+    target = os.path.realpath(path)
+    for info in list_worktrees():
+        if os.path.realpath(info.path) == target:
+            return info
+    return None
+
+
+def get_worktree_by_branch(branch_name: str) -> Optional[WorktreeInfo]:
+    """Look up the worktree that has a branch checked out."""
+    for info in list_worktrees():
+        if info.branch == branch_name:
+            return info
+    return None
+
+
+def get_worktree_by_adw_id(adw_id: str) -> Optional[WorktreeInfo]:
+    """Look up the worktree at trees/<adw_id>/."""
+    return get_worktree_by_path(os.path.join(get_project_root(), "trees", adw_id))
+
+
+def repair_state(
+    adw_id: str, state: ADWState, logger: Optional[logging.Logger] = None
+) -> Tuple[bool, Optional[str]]:
+    """Reconcile ADWState's worktree_path with what git knows.
+
+    - State path registered with git: nothing to do.
+    - State path exists on disk but git lost track (e.g., the main repo
+      moved): re-link it with `git worktree repair`.
+    - State path missing or unset: adopt the worktree at trees/<adw_id>/
+      or the one holding the ADW's branch, and set it on state.
+
+    State is only updated in memory; the caller saves it.
+
+    Returns:
+        Tuple of (is_consistent, error_message)
+    """
+    worktree_path = state.get("worktree_path")
+    if worktree_path and get_worktree_by_path(worktree_path):
+        return True, None
+
+    if worktree_path and os.path.exists(os.path.join(worktree_path, ".git")):
+        result = subprocess.run(
+            ["git", "worktree", "repair", worktree_path],
+            capture_output=True,
+            text=True,
+            cwd=get_project_root(),
+        )
+        if result.returncode == 0 and get_worktree_by_path(worktree_path):
+            if logger:
+                logger.info(f"Repaired git worktree link for {worktree_path}")
+            return True, None
+
+    branch_name = state.get("branch_name")
+    info = get_worktree_by_adw_id(adw_id) or (
+        get_worktree_by_branch(branch_name) if branch_name else None
+    )
+    if info and not info.prunable:
+        state.update(worktree_path=info.path)
+        if logger:
+            logger.info(f"Recovered worktree_path from git: {info.path}")
+        return True, None
+
+    return False, f"No git worktree found for ADW {adw_id}"
@@ -11,7 +11,7 @@ Usage:
 
 Workflow:
 1. Create/validate isolated worktree
-2. Allocate dedicated ports (9100-9114 backend, 9200-9214 frontend)
+2. Lease dedicated ports from the port registry (default 9100-9199 backend, 9200-9299 frontend)
 3. Fetch GitHub issue details
 4. Check for 'adw_patch' keyword in comments or issue body
 5. Create patch plan based on content containing 'adw_patch'
@@ -35,7 +35,7 @@ import os
 import logging
 import json
 import subprocess
-from typing import Optional
+from typing import Optional, List
 from dotenv import load_dotenv
 
 from adw_modules.state import ADWState
@@ -58,12 +58,13 @@ from adw_modules.workflow_ops import (
 from adw_modules.worktree_ops import (
     create_worktree,
     validate_worktree,
-    get_ports_for_adw,
-    is_port_available,
-    find_next_available_ports,
     setup_worktree_environment,
 )
+from adw_modules.worktree_pool import claim_worktree
+from adw_modules.port_leases import acquire_ports
+from adw_modules.sparse_checkout import get_sparse_patterns, is_sparse_checkout_enabled
 from adw_modules.utils import setup_logger, check_env_vars
+from adw_modules.phase_journal import mark_phase_running
 from adw_modules.data_types import (
     GitHubIssue,
     AgentTemplateRequest,
@@ -138,18 +139,25 @@ def get_patch_content(
         sys.exit(1)
 
 
-def main():
-    """Main entry point."""
+def main(argv: Optional[List[str]] = None):
+    """Main entry point.
+
+    Args:
+        argv: Command line (defaults to sys.argv), so workflows can run the
+            phase in-process
+    """
+    argv = list(sys.argv if argv is None else argv)
+
     # Load environment variables
     load_dotenv()
 
     # Parse command line args
-    if len(sys.argv) < 2:
+    if len(argv) < 2:
         print("Usage: uv run adw_patch_iso.py <issue-number> [adw-id]")
         sys.exit(1)
 
-    issue_number = sys.argv[1]
-    adw_id = sys.argv[2] if len(sys.argv) > 2 else None
+    issue_number = argv[1]
+    adw_id = argv[2] if len(argv) > 2 else None
 
     # Ensure ADW ID exists with initialized state
     temp_logger = setup_logger(adw_id, "adw_patch_iso") if adw_id else None
@@ -167,6 +175,7 @@ def main():
 
     # Set up logger with ADW ID
     logger = setup_logger(adw_id, "adw_patch_iso")
+    mark_phase_running(adw_id)
     logger.info(f"ADW Patch Isolated starting - ID: {adw_id}, Issue: {issue_number}")
 
     # Validate environment
@@ -251,14 +260,38 @@ def main():
 
     # Check if worktree already exists
     worktree_path = state.get("worktree_path")
+    slot = None
+    if not (worktree_path and os.path.exists(worktree_path)):
+        # Claim a pre-warmed worktree from the pool if one is ready
+        slot = claim_worktree(adw_id, branch_name, logger)
+
     if worktree_path and os.path.exists(worktree_path):
         logger.info(f"Using existing worktree: {worktree_path}")
         backend_port = state.get("backend_port", 9100)
         frontend_port = state.get("frontend_port", 9200)
+    elif slot:
+        worktree_path = slot.worktree_path
+        backend_port = slot.backend_port
+        frontend_port = slot.frontend_port
+        logger.info(f"Using pre-warmed worktree at {worktree_path}")
+
+        state.update(
+            worktree_path=worktree_path,
+            backend_port=backend_port,
+            frontend_port=frontend_port,
+        )
+        state.save("adw_patch_iso")
     else:
         # Create isolated worktree
         logger.info("Creating isolated worktree")
-        worktree_path, error = create_worktree(adw_id, branch_name, logger)
+        sparse_patterns = (
+            get_sparse_patterns(state.get("issue_class"))
+            if is_sparse_checkout_enabled()
+            else None
+        )
+        worktree_path, error = create_worktree(
+            adw_id, branch_name, logger, sparse_patterns=sparse_patterns
+        )
 
         if error:
             logger.error(f"Error creating worktree: {error}")
@@ -270,15 +303,16 @@ def main():
             )
             sys.exit(1)
 
-        # Get deterministic ports for this ADW ID
-        backend_port, frontend_port = get_ports_for_adw(adw_id)
-
-        # Check if ports are available, find alternatives if not
-        if not is_port_available(backend_port) or not is_port_available(frontend_port):
-            logger.warning(
-                f"Preferred ports {backend_port}/{frontend_port} not available, finding alternatives"
+        # Lease ports for this ADW ID
+        try:
+            backend_port, frontend_port = acquire_ports(adw_id, logger)
+        except RuntimeError as e:
+            logger.error(f"Error allocating ports: {e}")
+            make_issue_comment(
+                issue_number,
+                format_issue_message(adw_id, "ops", f"❌ Error allocating ports: {e}"),
             )
-            backend_port, frontend_port = find_next_available_ports(adw_id)
+            sys.exit(1)
 
         logger.info(
             f"Allocated ports - Backend: {backend_port}, Frontend: {frontend_port}"
@@ -0,0 +1,143 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = ["python-dotenv", "pydantic", "boto3>=1.26.0"]
+# ///
+
+"""
+ADW Pipeline - Run the workflows of several issues together
+
+Usage:
+  uv run adw_pipeline.py run <issue-number>[:<adw-id>]... [--workflow=sdlc|zte] [--skip-resolution] [--no-resume]
+  uv run adw_pipeline.py report [<run-id>]
+
+Commands:
+  run     Run the workflow for every issue, overlapping phases of different
+          issues: issue B plans while issue A builds. Phases are limited by
+          heavy (opus) and light (sonnet) model slots and by the number of
+          ADWs holding a worktree. Prints a throughput report at the end.
+  report  Show the throughput report of a run (default: the latest).
+
+Issues are admitted in the order given. See adw_modules/pipeline_scheduler.py
+for how slots are assigned and for the configuration variables.
+"""
+
+import sys
+import os
+from typing import Optional
+from dotenv import load_dotenv
+
+# Add the parent directory to Python path to import modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from adw_modules.utils import setup_logger
+from adw_modules.data_types import PipelineReport
+from adw_modules.workflow_ops import ensure_adw_id
+from adw_modules.pipeline_scheduler import (
+    format_report,
+    get_report_dir,
+    run_pipeline,
+)
+import adw_sdlc_iso
+import adw_sdlc_zte_iso
+
+WORKFLOWS = {
+    "sdlc": adw_sdlc_iso.get_phases,
+    "zte": adw_sdlc_zte_iso.get_phases,
+}
+
+# Per-ADW on_failure callbacks of workflows that report failures themselves
+FAILURE_HANDLERS = {
+    "zte": adw_sdlc_zte_iso.get_failure_handler,
+}
+
+USAGE = (
+    "Usage: uv run adw_pipeline.py run <issue-number>[:<adw-id>]... "
+    "[--workflow=sdlc|zte] [--skip-resolution] [--no-resume]\n"
+    "       uv run adw_pipeline.py report [<run-id>]"
+)
+
+
+def print_report(run_id: Optional[str] = None) -> None:
+    """Print a saved throughput report (the latest if run_id is not given)."""
+    report_dir = get_report_dir()
+    if run_id is None:
+        try:
+            paths = [
+                os.path.join(report_dir, name)
+                for name in os.listdir(report_dir)
+                if name.endswith(".json")
+            ]
+        except OSError:
+            paths = []
+        if not paths:
+            print("No pipeline reports found")
+            sys.exit(1)
+        path = max(paths, key=os.path.getmtime)
+    else:
+        path = os.path.join(report_dir, f"{run_id}.json")
+
+    try:
+        with open(path, "r") as f:
+            report = PipelineReport.model_validate_json(f.read())
+    except (OSError, ValueError) as e:
+        print(f"Cannot read report {path}: {e}")
+        sys.exit(1)
+    print(format_report(report))
+
+
+def main():
+    """Main entry point."""
+    load_dotenv()
+
+    if len(sys.argv) < 2 or sys.argv[1] not in ("run", "report"):
+        print(USAGE)
+        sys.exit(1)
+
+    if sys.argv[1] == "report":
+        print_report(sys.argv[2] if len(sys.argv) > 2 else None)
+        return
+
+    workflow = "sdlc"
+    skip_resolution = False
+    resume = True
+    targets = []
+    for arg in sys.argv[2:]:
+        if arg.startswith("--workflow="):
+            workflow = arg.split("=", 1)[1]
+        elif arg == "--skip-resolution":
+            skip_resolution = True
+        elif arg == "--no-resume":
+            resume = False
+        else:
+            targets.append(arg)
+
+    if workflow not in WORKFLOWS or not targets:
+        print(USAGE)
+        sys.exit(1)
+
+    logger = setup_logger("_pipeline", "adw_pipeline")
+    issues = []
+    for target in targets:
+        issue_number, _, adw_id = target.partition(":")
+        adw_id = ensure_adw_id(issue_number, adw_id or None, logger)
+        issues.append((issue_number, adw_id))
+        logger.info(f"Issue #{issue_number} -> ADW {adw_id}")
+
+    phases = WORKFLOWS[workflow](skip_resolution)
+    report = run_pipeline(
+        issues,
+        phases,
+        workflow,
+        logger,
+        resume=resume,
+        get_failure_handler=FAILURE_HANDLERS.get(workflow),
+    )
+
+    print()
+    print(format_report(report))
+    print(f"\nReport saved to {os.path.join(get_report_dir(), report.run_id + '.json')}")
+    if report.failed_adws:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
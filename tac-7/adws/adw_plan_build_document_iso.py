@@ -13,16 +13,18 @@ This script runs:
 2. adw_build_iso.py - Implementation phase (isolated)
 3. adw_document_iso.py - Documentation phase (isolated)
 
-The scripts are chained together via persistent state (adw_state.json).
+Phases run in this process through the workflow engine
+(adw_modules/workflow_engine.py) and share the ADW's worktree and state.
 """
 
-import subprocess
 import sys
 import os
 
 # Add the parent directory to Python path to import modules
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from adw_modules.workflow_ops import ensure_adw_id
+from adw_modules.data_types import PhaseSpec
+from adw_modules.workflow_engine import run_workflow, sequential
 
 
 def main():
@@ -42,52 +44,14 @@ def main():
     adw_id = ensure_adw_id(issue_number, adw_id)
     print(f"Using ADW ID: {adw_id}")
 
-    # Get the directory where this script is located
-    script_dir = os.path.dirname(os.path.abspath(__file__))
+    phases = sequential([
+        PhaseSpec(name="plan", script="adw_plan_iso.py", header="ISOLATED PLAN PHASE"),
+        PhaseSpec(name="build", script="adw_build_iso.py", header="ISOLATED BUILD PHASE"),
+        PhaseSpec(name="document", script="adw_document_iso.py", header="ISOLATED DOCUMENTATION PHASE"),
+    ])
 
-    # Run isolated plan with the ADW ID
-    plan_cmd = [
-        "uv",
-        "run",
-        os.path.join(script_dir, "adw_plan_iso.py"),
-        issue_number,
-        adw_id,
-    ]
-    print(f"\n=== ISOLATED PLAN PHASE ===")
-    print(f"Running: {' '.join(plan_cmd)}")
-    plan = subprocess.run(plan_cmd)
-    if plan.returncode != 0:
-        print("Isolated plan phase failed")
-        sys.exit(1)
-
-    # Run isolated build with the ADW ID
-    build_cmd = [
-        "uv",
-        "run",
-        os.path.join(script_dir, "adw_build_iso.py"),
-        issue_number,
-        adw_id,
-    ]
-    print(f"\n=== ISOLATED BUILD PHASE ===")
-    print(f"Running: {' '.join(build_cmd)}")
-    build = subprocess.run(build_cmd)
-    if build.returncode != 0:
-        print("Isolated build phase failed")
-        sys.exit(1)
-
-    # Run isolated documentation with the ADW ID
-    document_cmd = [
-        "uv",
-        "run",
-        os.path.join(script_dir, "adw_document_iso.py"),
-        issue_number,
-        adw_id,
-    ]
-    print(f"\n=== ISOLATED DOCUMENTATION PHASE ===")
-    print(f"Running: {' '.join(document_cmd)}")
-    document = subprocess.run(document_cmd)
-    if document.returncode != 0:
-        print("Isolated documentation phase failed")
+    success, _ = run_workflow(phases, issue_number, adw_id, resume=False)
+    if not success:
         sys.exit(1)
 
     print(f"\n=== ISOLATED WORKFLOW COMPLETED ===")
@@ -96,4 +60,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,6 +1,6 @@
 #!/usr/bin/env -S uv run
 # /// script
-# dependencies = ["python-dotenv", "pydantic"]
+# dependencies = ["python-dotenv", "pydantic", "boto3>=1.26.0"]
 # ///
 
 """
@@ -13,25 +13,27 @@ This script runs:
 2. adw_build_iso.py - Implementation phase (isolated)
 3. adw_review_iso.py - Review phase (isolated)
 
-The scripts are chained together via persistent state (adw_state.json).
+Phases run in this process through the workflow engine
+(adw_modules/workflow_engine.py) and share the ADW's worktree and state.
 """
 
-import subprocess
 import sys
 import os
 
 # Add the parent directory to Python path to import modules
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from adw_modules.workflow_ops import ensure_adw_id
+from adw_modules.data_types import PhaseSpec
+from adw_modules.workflow_engine import run_workflow, sequential
 
 
 def main():
     """Main entry point."""
-    # Check for --skip-resolution flag
     skip_resolution = "--skip-resolution" in sys.argv
+    # Remove flags from argv
     if skip_resolution:
         sys.argv.remove("--skip-resolution")
-    
+
     if len(sys.argv) < 2:
         print("Usage: uv run adw_plan_build_review_iso.py <issue-number> [adw-id] [--skip-resolution]")
         print("\nThis runs the isolated plan, build, and review workflow:")
@@ -47,55 +49,16 @@ def main():
     adw_id = ensure_adw_id(issue_number, adw_id)
     print(f"Using ADW ID: {adw_id}")
 
-    # Get the directory where this script is located
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-
-    # Run isolated plan with the ADW ID
-    plan_cmd = [
-        "uv",
-        "run",
-        os.path.join(script_dir, "adw_plan_iso.py"),
-        issue_number,
-        adw_id,
-    ]
-    print(f"\n=== ISOLATED PLAN PHASE ===")
-    print(f"Running: {' '.join(plan_cmd)}")
-    plan = subprocess.run(plan_cmd)
-    if plan.returncode != 0:
-        print("Isolated plan phase failed")
-        sys.exit(1)
+    review_args = ["--skip-resolution"] if skip_resolution else []
 
-    # Run isolated build with the ADW ID
-    build_cmd = [
-        "uv",
-        "run",
-        os.path.join(script_dir, "adw_build_iso.py"),
-        issue_number,
-        adw_id,
-    ]
-    print(f"\n=== ISOLATED BUILD PHASE ===")
-    print(f"Running: {' '.join(build_cmd)}")
-    build = subprocess.run(build_cmd)
-    if build.returncode != 0:
-        print("Isolated build phase failed")
-        sys.exit(1)
+    phases = sequential([
+        PhaseSpec(name="plan", script="adw_plan_iso.py", header="ISOLATED PLAN PHASE"),
+        PhaseSpec(name="build", script="adw_build_iso.py", header="ISOLATED BUILD PHASE"),
+        PhaseSpec(name="review", script="adw_review_iso.py", args=review_args, header="ISOLATED REVIEW PHASE"),
+    ])
 
-    # Run isolated review with the ADW ID
-    review_cmd = [
-        "uv",
-        "run",
-        os.path.join(script_dir, "adw_review_iso.py"),
-        issue_number,
-        adw_id,
-    ]
-    if skip_resolution:
-        review_cmd.append("--skip-resolution")
-    
-    print(f"\n=== ISOLATED REVIEW PHASE ===")
-    print(f"Running: {' '.join(review_cmd)}")
-    review = subprocess.run(review_cmd)
-    if review.returncode != 0:
-        print("Isolated review phase failed")
+    success, _ = run_workflow(phases, issue_number, adw_id, resume=False)
+    if not success:
         sys.exit(1)
 
     print(f"\n=== ISOLATED WORKFLOW COMPLETED ===")
@@ -104,4 +67,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
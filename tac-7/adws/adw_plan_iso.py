@@ -11,8 +11,8 @@ Usage:
 
 Workflow:
 1. Fetch GitHub issue details
-2. Check/create worktree for isolated execution
-3. Allocate unique ports for services
+2. Check/create worktree for isolated execution (claimed from the pool if enabled)
+3. Lease unique ports for services
 4. Setup worktree environment
 5. Classify issue type (/chore, /bug, /feature)
 6. Create feature branch in worktree
@@ -28,7 +28,7 @@ import sys
 import os
 import logging
 import json
-from typing import Optional
+from typing import Optional, List
 from dotenv import load_dotenv
 
 from adw_modules.state import ADWState
@@ -49,32 +49,45 @@ from adw_modules.workflow_ops import (
     AGENT_PLANNER,
 )
 from adw_modules.utils import setup_logger, check_env_vars
+from adw_modules.phase_journal import mark_phase_running
 from adw_modules.data_types import GitHubIssue, IssueClassSlashCommand, AgentTemplateRequest
 from adw_modules.agent import execute_template
 from adw_modules.worktree_ops import (
     create_worktree,
     validate_worktree,
-    get_ports_for_adw,
-    is_port_available,
-    find_next_available_ports,
     setup_worktree_environment,
 )
+from adw_modules.worktree_pool import claim_worktree
+from adw_modules.port_leases import acquire_ports
+from adw_modules.sparse_checkout import get_sparse_patterns, is_sparse_checkout_enabled
+from adw_modules.dependency_cache import (
+    materialise_dependencies,
+    prepare_relocatable_venv,
+    populate_dependency_cache,
+)
+
 
 
 
+def main(argv: Optional[List[str]] = None):
+    """Main entry point.
+
+    Args:
+        argv: Command line (defaults to sys.argv), so workflows can run the
+            phase in-process
+    """
+    argv = list(sys.argv if argv is None else argv)
 
-def main():
-    """Main entry point."""
     # Load environment variables
     load_dotenv()
 
     # Parse command line args
-    if len(sys.argv) < 2:
+    if len(argv) < 2:
         print("Usage: uv run adw_plan_iso.py <issue-number> [adw-id]")
         sys.exit(1)
 
-    issue_number = sys.argv[1]
-    adw_id = sys.argv[2] if len(sys.argv) > 2 else None
+    issue_number = argv[1]
+    adw_id = argv[2] if len(argv) > 2 else None
 
     # Ensure ADW ID exists with initialized state
     temp_logger = setup_logger(adw_id, "adw_plan_iso") if adw_id else None
@@ -92,6 +105,7 @@ def main():
 
     # Set up logger with ADW ID
     logger = setup_logger(adw_id, "adw_plan_iso")
+    mark_phase_running(adw_id)
     logger.info(f"ADW Plan Iso starting - ID: {adw_id}, Issue: {issue_number}")
 
     # Validate environment
@@ -113,13 +127,16 @@ def main():
         backend_port = state.get("backend_port")
         frontend_port = state.get("frontend_port")
     else:
-        # Allocate ports for this instance
-        backend_port, frontend_port = get_ports_for_adw(adw_id)
-        
-        # Check port availability
-        if not (is_port_available(backend_port) and is_port_available(frontend_port)):
-            logger.warning(f"Deterministic ports {backend_port}/{frontend_port} are in use, finding alternatives")
-            backend_port, frontend_port = find_next_available_ports(adw_id)
+        # Lease ports for this instance
+        try:
+            backend_port, frontend_port = acquire_ports(adw_id, logger)
+        except RuntimeError as e:
+            logger.error(f"Error allocating ports: {e}")
+            make_issue_comment(
+                issue_number,
+                format_issue_message(adw_id, "ops", f"❌ Error allocating ports: {e}"),
+            )
+            sys.exit(1)
         
         logger.info(f"Allocated ports - Backend: {backend_port}, Frontend: {frontend_port}")
         state.update(backend_port=backend_port, frontend_port=frontend_port)
@@ -176,10 +193,31 @@ def main():
     state.save("adw_plan_iso")
     logger.info(f"Will create branch in worktree: {branch_name}")
 
+    # Claim a pre-warmed worktree from the pool if one is ready
+    if not valid:
+        slot = claim_worktree(adw_id, branch_name, logger)
+        if slot:
+            worktree_path = slot.worktree_path
+            backend_port = slot.backend_port
+            frontend_port = slot.frontend_port
+            state.update(
+                worktree_path=worktree_path,
+                backend_port=backend_port,
+                frontend_port=frontend_port,
+            )
+            state.save("adw_plan_iso")
+            logger.info(f"Using pre-warmed worktree at {worktree_path}")
+            valid = True
+
     # Create worktree if it doesn't exist
     if not valid:
         logger.info(f"Creating worktree for {adw_id}")
-        worktree_path, error = create_worktree(adw_id, branch_name, logger)
+        sparse_patterns = (
+            get_sparse_patterns(issue_command) if is_sparse_checkout_enabled() else None
+        )
+        worktree_path, error = create_worktree(
+            adw_id, branch_name, logger, sparse_patterns=sparse_patterns
+        )
         
         if error:
             logger.error(f"Error creating worktree: {error}")
@@ -196,6 +234,10 @@ def main():
         # Setup worktree environment (create .ports.env)
         setup_worktree_environment(worktree_path, backend_port, frontend_port, logger)
         
+        # Restore cached dependencies so the install only has to verify them
+        materialise_dependencies(worktree_path, logger)
+        prepare_relocatable_venv(worktree_path)
+        
         # Run install_worktree command to set up the isolated environment
         logger.info("Setting up isolated environment with custom ports")
         install_request = AgentTemplateRequest(
@@ -215,6 +257,7 @@ def main():
             )
             sys.exit(1)
         
+        populate_dependency_cache(worktree_path, logger)
         logger.info("Worktree environment setup complete")
 
     make_issue_comment(
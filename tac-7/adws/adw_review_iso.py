@@ -7,7 +7,7 @@
 ADW Review Iso - AI Developer Workflow for agentic review in isolated worktrees
 
 Usage:
-  uv run adw_review_iso.py <issue-number> <adw-id> [--skip-resolution]
+  uv run adw_review_iso.py <issue-number> <adw-id> [--skip-resolution] [--force]
 
 Workflow:
 1. Load state and validate worktree exists
@@ -23,6 +23,10 @@ Workflow:
 
 This workflow REQUIRES that adw_plan_iso.py or adw_patch_iso.py has been run first
 to create the worktree. It cannot create worktrees itself.
+
+If a review already passed on the same committed code, spec and model set,
+its result is reposted instead of reviewing again
+(see adw_modules/phase_cache.py). Pass --force to review anyway.
 """
 
 import sys
@@ -47,15 +51,20 @@ from adw_modules.workflow_ops import (
     find_spec_file,
 )
 from adw_modules.utils import setup_logger, parse_json, check_env_vars
+from adw_modules.phase_journal import mark_phase_running
 from adw_modules.data_types import (
     AgentTemplateRequest,
     ReviewResult,
     ReviewIssue,
     AgentPromptResponse,
+    PhaseCacheEntry,
 )
 from adw_modules.agent import execute_template
+from adw_modules.app_supervisor import ensure_app_running, is_app_supervisor_enabled
+from adw_modules.capture_policy import finish_capture, prepare_capture
 from adw_modules.r2_uploader import R2Uploader
 from adw_modules.worktree_ops import validate_worktree
+from adw_modules.phase_cache import load_phase_results, store_phase_results
 
 # Agent name constants
 AGENT_REVIEWER = "reviewer"
@@ -74,13 +83,20 @@ def run_review(
     logger: logging.Logger,
     working_dir: Optional[str] = None,
 ) -> ReviewResult:
-    """Run the review using the /review command."""
+    """Run the review using the /review command.
+
+    Browser recordings follow the capture policy (adw_modules/capture_policy.py)
+    and count as a failure when the review fails or finds blockers.
+    """
     request = AgentTemplateRequest(
         agent_name=AGENT_REVIEWER,
         slash_command="/review",
         args=[adw_id, spec_file, AGENT_REVIEWER],
         adw_id=adw_id,
         working_dir=working_dir,
+        mcp_config=prepare_capture(working_dir, adw_id, AGENT_REVIEWER, logger)
+        if working_dir
+        else None,
     )
 
     logger.debug(f"review_request: {request.model_dump_json(indent=2, by_alias=True)}")
@@ -89,6 +105,16 @@ def run_review(
 
     logger.debug(f"review_response: {response.model_dump_json(indent=2, by_alias=True)}")
 
+    result = parse_review_response(response, logger)
+    failed = not result.success or any(
+        issue.issue_severity == "blocker" for issue in result.review_issues
+    )
+    result.recordings = finish_capture(adw_id, AGENT_REVIEWER, failed, logger)
+    return result
+
+
+def parse_review_response(response: AgentPromptResponse, logger: logging.Logger) -> ReviewResult:
+    """Turn the /review agent's response into a ReviewResult."""
     if not response.success:
         logger.error(f"Review failed: {response.output}")
         # Return a failed result
@@ -147,7 +173,9 @@ def upload_review_screenshots(
     worktree_path: str,
     logger: logging.Logger
 ) -> None:
-    """Upload screenshots to R2 and update review result with URLs.
+    """Upload screenshots and recordings to R2 and update review result with URLs.
+
+    Files are uploaded in parallel; unchanged files already in R2 are skipped.
     
     Args:
         review_result: Review result containing screenshot paths
@@ -156,35 +184,47 @@ def upload_review_screenshots(
         logger: Logger instance
         
     Note:
-        This modifies review_result in-place by setting screenshot_urls
-        and updating issue.screenshot_url fields.
+        This modifies review_result in-place by setting screenshot_urls and
+        recording_urls and updating issue.screenshot_url fields.
     """
-    if not review_result.screenshots:
+    if not review_result.screenshots and not review_result.recordings:
         return
-        
-    logger.info(f"Uploading {len(review_result.screenshots)} screenshots")
-    uploader = R2Uploader(logger)
-    
-    screenshot_urls = []
+
+    # Convert relative paths to absolute paths within the worktree
+    files = {}
     for local_path in review_result.screenshots:
-        # Convert relative path to absolute path within worktree
         abs_path = os.path.join(worktree_path, local_path)
-        
         if not os.path.exists(abs_path):
             logger.warning(f"Screenshot not found: {abs_path}")
             continue
-        
         # Upload with a nice path
-        remote_path = f"adw/{adw_id}/review/{os.path.basename(local_path)}"
-        url = uploader.upload_file(abs_path, remote_path)
-        
-        if url:
-            screenshot_urls.append(url)
-            logger.info(f"Uploaded screenshot to: {url}")
-        else:
-            logger.error(f"Failed to upload screenshot: {local_path}")
+        files[abs_path] = f"adw/{adw_id}/review/{os.path.basename(local_path)}"
+    for recording in review_result.recordings:
+        files[recording] = f"adw/{adw_id}/review/recordings/{os.path.basename(recording)}"
+
+    logger.info(
+        f"Uploading {len(review_result.screenshots)} screenshots"
+        + (f" and {len(review_result.recordings)} recordings" if review_result.recordings else "")
+    )
+    urls = R2Uploader(logger).upload_files(files)
+
+    screenshot_urls = []
+    failed = 0
+    for local_path in review_result.screenshots:
+        abs_path = os.path.join(worktree_path, local_path)
+        if abs_path not in files:
+            continue
+        url = urls.get(abs_path)
+        if not url:
             # Fallback to local path if upload fails
-            screenshot_urls.append(local_path)
+            failed += 1
+        screenshot_urls.append(url or local_path)
+    if failed:
+        logger.error(f"Failed to upload {failed} screenshot(s), linking local paths instead")
+
+    review_result.recording_urls = [
+        urls[recording] for recording in review_result.recordings if urls.get(recording)
+    ]
     
     # Update review result with URLs
     review_result.screenshot_urls = screenshot_urls
@@ -308,30 +348,79 @@ def build_review_summary(review_result: ReviewResult) -> str:
             else:
                 # Fallback to showing path if not a URL
                 summary_parts.append(f"- Screenshot {i+1}: `{screenshot_url}`")
+
+    # Link browser recordings kept for a failed review
+    if review_result.recording_urls:
+        summary_parts.append("\n## 🎥 Recordings")
+        for recording_url in review_result.recording_urls:
+            summary_parts.append(f"- [{os.path.basename(recording_url)}]({recording_url})")
     
     return "\n".join(summary_parts)
 
 
-def main():
-    """Main entry point."""
+def replay_cached_review(
+    cached: PhaseCacheEntry,
+    issue_number: str,
+    adw_id: str,
+    state: ADWState,
+    logger: logging.Logger,
+) -> None:
+    """Repost the result of an earlier passing review and finish the phase."""
+    review_result = ReviewResult(**cached.results["review_result"])
+
+    make_issue_comment(
+        issue_number,
+        format_issue_message(
+            adw_id,
+            AGENT_REVIEWER,
+            f"♻️ Code unchanged since the review in {cached.adw_id} passed "
+            f"(tree {cached.tree_hash[:9]}) - reusing its result. "
+            "Run with --force to review again.",
+        ),
+    )
+    make_issue_comment(
+        issue_number,
+        format_issue_message(adw_id, AGENT_REVIEWER, build_review_summary(review_result)),
+    )
+
+    finalize_git_operations(state, logger, cwd=state.get("worktree_path"))
+    state.save("adw_review_iso")
+    logger.info("Isolated review phase completed (cached)")
+    make_issue_comment(
+        issue_number, format_issue_message(adw_id, "ops", "✅ Isolated review phase completed (cached)")
+    )
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main entry point.
+
+    Args:
+        argv: Command line (defaults to sys.argv), so workflows can run the
+            phase in-process
+    """
+    argv = list(sys.argv if argv is None else argv)
+
     # Load environment variables
     load_dotenv()
     
     # Check for --skip-resolution flag
-    skip_resolution = "--skip-resolution" in sys.argv
+    skip_resolution = "--skip-resolution" in argv
     if skip_resolution:
-        sys.argv.remove("--skip-resolution")
+        argv.remove("--skip-resolution")
+    force = "--force" in argv
+    if force:
+        argv.remove("--force")
     
     # Parse command line args
     # INTENTIONAL: adw-id is REQUIRED - we need it to find the worktree
-    if len(sys.argv) < 3:
-        print("Usage: uv run adw_review_iso.py <issue-number> <adw-id> [--skip-resolution]")
+    if len(argv) < 3:
+        print("Usage: uv run adw_review_iso.py <issue-number> <adw-id> [--skip-resolution] [--force]")
         print("\nError: adw-id is required to locate the worktree")
         print("Run adw_plan_iso.py or adw_patch_iso.py first to create the worktree")
         sys.exit(1)
     
-    issue_number = sys.argv[1]
-    adw_id = sys.argv[2]
+    issue_number = argv[1]
+    adw_id = argv[2]
     
     # Try to load existing state
     temp_logger = setup_logger(adw_id, "adw_review_iso")
@@ -357,6 +446,7 @@ def main():
     
     # Set up logger with ADW ID from command line
     logger = setup_logger(adw_id, "adw_review_iso")
+    mark_phase_running(adw_id)
     logger.info(f"ADW Review Iso starting - ID: {adw_id}, Issue: {issue_number}, Skip Resolution: {skip_resolution}")
     
     # Validate environment
@@ -409,6 +499,19 @@ def main():
         format_issue_message(adw_id, "ops", f"📋 Found spec file: {spec_file}")
     )
     
+    # Replay the result of an earlier passing review of the same code
+    cache_args = ["--skip-resolution"] if skip_resolution else []
+    cached = None if force else load_phase_results("review", state, cache_args, logger)
+    if cached:
+        replay_cached_review(cached, issue_number, adw_id, state, logger)
+        return
+    
+    # Reuse the app servers kept since the test phase (or start them once)
+    if is_app_supervisor_enabled():
+        app_ready, app_error = ensure_app_running(adw_id, worktree_path, logger)
+        if not app_ready:
+            logger.warning(f"App servers not ready, the reviewer will start them: {app_error}")
+
     # Run review with retry logic
     review_attempt = 0
     review_result = None
@@ -512,6 +615,15 @@ def main():
         issue_number, format_issue_message(adw_id, AGENT_REVIEWER, "✅ Review committed")
     )
     
+    if review_result and review_result.success:
+        store_phase_results(
+            "review",
+            state,
+            cache_args,
+            {"review_result": review_result.model_dump()},
+            logger,
+        )
+    
     # Finalize git operations (push and PR)
     # Note: This will work from the worktree context
     finalize_git_operations(state, logger, cwd=worktree_path)
@@ -1,12 +1,12 @@
 #!/usr/bin/env -S uv run
 # /// script
-# dependencies = ["python-dotenv", "pydantic"]
+# dependencies = ["python-dotenv", "pydantic", "boto3>=1.26.0"]
 # ///
 
 """
 ADW SDLC ZTE Iso - Zero Touch Execution: Complete SDLC with automatic shipping
 
-Usage: uv run adw_sdlc_zte_iso.py <issue-number> [adw-id] [--skip-e2e] [--skip-resolution]
+Usage: uv run adw_sdlc_zte_iso.py <issue-number> [adw-id] [--skip-e2e] [--skip-resolution] [--no-resume]
 
 This script runs the complete ADW SDLC pipeline with automatic shipping:
 1. adw_plan_iso.py - Planning phase (isolated)
@@ -19,18 +19,89 @@ This script runs the complete ADW SDLC pipeline with automatic shipping:
 ZTE = Zero Touch Execution: The entire workflow runs to completion without
 human intervention, automatically shipping code to production if all phases pass.
 
-The scripts are chained together via persistent state (adw_state.json).
-Each phase runs on the same git worktree with dedicated ports.
+Phases run in this process through the workflow engine
+(adw_modules/workflow_engine.py) and share the ADW's worktree and state.
+Review and document both only depend on test, so they run in parallel.
+
+Every phase run is recorded in agents/{adw_id}/phase_journal.jsonl. Re-running
+with the same ADW ID skips phases that already completed with unchanged inputs.
+Pass --no-resume to run every phase from scratch.
+
+The branch is pushed and the PR created/updated once, before shipping,
+instead of after every phase.
 """
 
-import subprocess
 import sys
 import os
+from typing import Callable, List
 
 # Add the parent directory to Python path to import modules
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from adw_modules.workflow_ops import ensure_adw_id
 from adw_modules.github import make_issue_comment
+from adw_modules.data_types import PhaseSpec, PhaseResult
+from adw_modules.workflow_engine import DOCUMENT_COMMIT_PATHS, run_workflow, sequential
+
+
+def get_phases(skip_resolution: bool = False) -> List[PhaseSpec]:
+    """Build the workflow's phase DAG."""
+    review_args = ["--skip-resolution"] if skip_resolution else []
+
+    return sequential([
+        PhaseSpec(name="plan", script="adw_plan_iso.py", header="ISOLATED PLAN PHASE"),
+        PhaseSpec(name="build", script="adw_build_iso.py", header="ISOLATED BUILD PHASE"),
+        # Always skip E2E tests in SDLC workflows
+        PhaseSpec(name="test", script="adw_test_iso.py", args=["--skip-e2e"], header="ISOLATED TEST PHASE"),
+        PhaseSpec(name="review", script="adw_review_iso.py", args=review_args, header="ISOLATED REVIEW PHASE"),
+        # Documentation only needs the spec and the diff, so it runs alongside
+        # review. Documentation failure shouldn't block shipping
+        PhaseSpec(
+            name="document",
+            script="adw_document_iso.py",
+            header="ISOLATED DOCUMENTATION PHASE",
+            depends_on=["test"],
+            allow_failure=True,
+            commit_paths=DOCUMENT_COMMIT_PATHS,
+        ),
+        # The PR must be up to date before it is approved and merged
+        PhaseSpec(
+            name="ship",
+            script="adw_ship_iso.py",
+            header="ISOLATED SHIP PHASE (APPROVE & MERGE)",
+            depends_on=["review", "document"],
+            finalize_before=True,
+        ),
+    ])
+
+
+def get_failure_handler(
+    issue_number: str, adw_id: str
+) -> Callable[[PhaseSpec, PhaseResult], None]:
+    """Get the callback that reports on the issue why ZTE stopped.
+
+    Used by main() and by adw_pipeline.py --workflow=zte.
+    """
+    # Issue comments posted when a phase fails and ZTE stops
+    failure_comments = {
+        "test": f"{adw_id}_ops: ❌ **ZTE Aborted** - Test phase failed\n\n"
+        "Automatic shipping cancelled due to test failures.\n"
+        "Please fix the tests and run the workflow again.",
+        "review": f"{adw_id}_ops: ❌ **ZTE Aborted** - Review phase failed\n\n"
+        "Automatic shipping cancelled due to review failures.\n"
+        "Please address the review issues and run the workflow again.",
+        "ship": f"{adw_id}_ops: ❌ **ZTE Failed** - Ship phase failed\n\n"
+        "Could not automatically approve and merge the PR.\n"
+        "Please check the ship logs and merge manually if needed.",
+    }
+
+    def on_failure(spec: PhaseSpec, result: PhaseResult) -> None:
+        if spec.name in failure_comments:
+            try:
+                make_issue_comment(issue_number, failure_comments[spec.name])
+            except:
+                pass
+
+    return on_failure
 
 
 def main():
@@ -38,16 +109,19 @@ def main():
     # Check for flags
     skip_e2e = "--skip-e2e" in sys.argv
     skip_resolution = "--skip-resolution" in sys.argv
+    no_resume = "--no-resume" in sys.argv
 
     # Remove flags from argv
     if skip_e2e:
         sys.argv.remove("--skip-e2e")
     if skip_resolution:
         sys.argv.remove("--skip-resolution")
+    if no_resume:
+        sys.argv.remove("--no-resume")
 
     if len(sys.argv) < 2:
         print(
-            "Usage: uv run adw_sdlc_zte_iso.py <issue-number> [adw-id] [--skip-e2e] [--skip-resolution]"
+            "Usage: uv run adw_sdlc_zte_iso.py <issue-number> [adw-id] [--skip-e2e] [--skip-resolution] [--no-resume]"
         )
         print("\n🚀 Zero Touch Execution: Complete SDLC with automatic shipping")
         print("\nThis runs the complete isolated Software Development Life Cycle:")
@@ -84,131 +158,16 @@ def main():
     except Exception as e:
         print(f"Warning: Failed to post initial comment: {e}")
 
-    # Get the directory where this script is located
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-
-    # Run isolated plan with the ADW ID
-    plan_cmd = [
-        "uv",
-        "run",
-        os.path.join(script_dir, "adw_plan_iso.py"),
-        issue_number,
-        adw_id,
-    ]
-    print(f"\n=== ISOLATED PLAN PHASE ===")
-    print(f"Running: {' '.join(plan_cmd)}")
-    plan = subprocess.run(plan_cmd)
-    if plan.returncode != 0:
-        print("Isolated plan phase failed")
-        sys.exit(1)
+    phases = get_phases(skip_resolution)
 
-    # Run isolated build with the ADW ID
-    build_cmd = [
-        "uv",
-        "run",
-        os.path.join(script_dir, "adw_build_iso.py"),
-        issue_number,
-        adw_id,
-    ]
-    print(f"\n=== ISOLATED BUILD PHASE ===")
-    print(f"Running: {' '.join(build_cmd)}")
-    build = subprocess.run(build_cmd)
-    if build.returncode != 0:
-        print("Isolated build phase failed")
-        sys.exit(1)
-
-    # Run isolated test with the ADW ID
-    test_cmd = [
-        "uv",
-        "run",
-        os.path.join(script_dir, "adw_test_iso.py"),
-        issue_number,
-        adw_id,
-        "--skip-e2e",  # Always skip E2E tests in SDLC workflows
-    ]
-
-    print(f"\n=== ISOLATED TEST PHASE ===")
-    print(f"Running: {' '.join(test_cmd)}")
-    test = subprocess.run(test_cmd)
-    if test.returncode != 0:
-        print("Isolated test phase failed")
-        # For ZTE, we should stop if tests fail
-        try:
-            make_issue_comment(
-                issue_number,
-                f"{adw_id}_ops: ❌ **ZTE Aborted** - Test phase failed\n\n"
-                "Automatic shipping cancelled due to test failures.\n"
-                "Please fix the tests and run the workflow again.",
-            )
-        except:
-            pass
-        sys.exit(1)
-
-    # Run isolated review with the ADW ID
-    review_cmd = [
-        "uv",
-        "run",
-        os.path.join(script_dir, "adw_review_iso.py"),
-        issue_number,
-        adw_id,
-    ]
-    if skip_resolution:
-        review_cmd.append("--skip-resolution")
-
-    print(f"\n=== ISOLATED REVIEW PHASE ===")
-    print(f"Running: {' '.join(review_cmd)}")
-    review = subprocess.run(review_cmd)
-    if review.returncode != 0:
-        print("Isolated review phase failed")
-        try:
-            make_issue_comment(
-                issue_number,
-                f"{adw_id}_ops: ❌ **ZTE Aborted** - Review phase failed\n\n"
-                "Automatic shipping cancelled due to review failures.\n"
-                "Please address the review issues and run the workflow again.",
-            )
-        except:
-            pass
-        sys.exit(1)
-
-    # Run isolated documentation with the ADW ID
-    document_cmd = [
-        "uv",
-        "run",
-        os.path.join(script_dir, "adw_document_iso.py"),
-        issue_number,
-        adw_id,
-    ]
-    print(f"\n=== ISOLATED DOCUMENTATION PHASE ===")
-    print(f"Running: {' '.join(document_cmd)}")
-    document = subprocess.run(document_cmd)
-    if document.returncode != 0:
-        print("Isolated documentation phase failed")
-        # Documentation failure shouldn't block shipping
-        print("WARNING: Documentation phase failed but continuing with shipping")
-
-    # Run isolated ship with the ADW ID
-    ship_cmd = [
-        "uv",
-        "run",
-        os.path.join(script_dir, "adw_ship_iso.py"),
+    success, _ = run_workflow(
+        phases,
         issue_number,
         adw_id,
-    ]
-    print(f"\n=== ISOLATED SHIP PHASE (APPROVE & MERGE) ===")
-    print(f"Running: {' '.join(ship_cmd)}")
-    ship = subprocess.run(ship_cmd)
-    if ship.returncode != 0:
-        print("Isolated ship phase failed")
-        try:
-            make_issue_comment(
-                issue_number,
-                f"{adw_id}_ops: ❌ **ZTE Failed** - Ship phase failed\n\n"
-                "Could not automatically approve and merge the PR.\n"
-                "Please check the ship logs and merge manually if needed.",
-            )
-        except:
-            pass
+        resume=not no_resume,
+        on_failure=get_failure_handler(issue_number, adw_id),
+    )
+    if not success:
         sys.exit(1)
 
     print(f"\n=== 🎉 ZERO TOUCH EXECUTION COMPLETED ===")
@@ -12,29 +12,27 @@ Usage:
 Workflow:
 1. Load state and validate worktree exists
 2. Validate ALL state fields are populated (not None)
-3. Perform manual git merge in main repository:
-   - Fetch latest from origin
-   - Checkout main
-   - Merge feature branch
-   - Push to origin/main
+3. Merge the feature branch into main without a checkout:
+   - Fetch latest main from origin
+   - Build a --no-ff merge commit with git merge-tree/commit-tree
+   - Push it to origin/main with a compare-and-swap lease (retried if main moved)
 4. Post success message to issue
 
 This workflow REQUIRES that all previous workflows have been run and that
 every field in ADWState has a value. This is our final approval step.
 
-Note: Merge operations happen in the main repository root, not in the worktree,
-to preserve the worktree's state.
+Note: The merge only updates refs. Neither the worktree nor the main repository
+checkout is touched, so ships can run alongside other ADWs and each other.
 """
 
 import sys
-import os
 import logging
 import json
-import subprocess
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any
 from dotenv import load_dotenv
 
 from adw_modules.state import ADWState
+from adw_modules.app_supervisor import stop_app
 from adw_modules.github import (
     make_issue_comment,
     get_repo_url,
@@ -42,111 +40,16 @@ from adw_modules.github import (
 )
 from adw_modules.workflow_ops import format_issue_message
 from adw_modules.utils import setup_logger, check_env_vars
+from adw_modules.phase_journal import mark_phase_running
 from adw_modules.worktree_ops import validate_worktree
+from adw_modules.merge_ops import merge_branch_to_main
+from adw_modules.merge_queue import enqueue, is_merge_queue_enabled, wait_for_ship
 from adw_modules.data_types import ADWStateData
 
 # Agent name constant
 AGENT_SHIPPER = "shipper"
 
 
-def get_main_repo_root() -> str:
-    """Get the main repository root directory (parent of adws)."""
-    # This script is in adws/, so go up one level to get repo root
-    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-
-
-def manual_merge_to_main(branch_name: str, logger: logging.Logger) -> Tuple[bool, Optional[str]]:
-    """Manually merge a branch to main using git commands.
-    
-    This runs in the main repository root, not in a worktree.
-    
-    Args:
-        branch_name: The feature branch to merge
-        logger: Logger instance
-        
-    Returns:
-        Tuple of (success, error_message)
-    """
-    repo_root = get_main_repo_root()
-    logger.info(f"Performing manual merge in main repository: {repo_root}")
-    
-    try:
-        # Save current branch to restore later
-        result = subprocess.run(
-            ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-            capture_output=True, text=True, cwd=repo_root
-        )
-        original_branch = result.stdout.strip()
-        logger.debug(f"Original branch: {original_branch}")
-        
-        # Step 1: Fetch latest from origin
-        logger.info("Fetching latest from origin...")
-        result = subprocess.run(
-            ["git", "fetch", "origin"],
-            capture_output=True, text=True, cwd=repo_root
-        )
-        if result.returncode != 0:
-            return False, f"Failed to fetch from origin: {result.stderr}"
-        
-        # Step 2: Checkout main
-        logger.info("Checking out main branch...")
-        result = subprocess.run(
-            ["git", "checkout", "main"],
-            capture_output=True, text=True, cwd=repo_root
-        )
-        if result.returncode != 0:
-            return False, f"Failed to checkout main: {result.stderr}"
-        
-        # Step 3: Pull latest main
-        logger.info("Pulling latest main...")
-        result = subprocess.run(
-            ["git", "pull", "origin", "main"],
-            capture_output=True, text=True, cwd=repo_root
-        )
-        if result.returncode != 0:
-            # Try to restore original branch
-            subprocess.run(["git", "checkout", original_branch], cwd=repo_root)
-            return False, f"Failed to pull latest main: {result.stderr}"
-        
-        # Step 4: Merge the feature branch (no-ff to preserve all commits)
-        logger.info(f"Merging branch {branch_name} (no-ff to preserve all commits)...")
-        result = subprocess.run(
-            ["git", "merge", branch_name, "--no-ff", "-m", f"Merge branch '{branch_name}' via ADW Ship workflow"],
-            capture_output=True, text=True, cwd=repo_root
-        )
-        if result.returncode != 0:
-            # Try to restore original branch
-            subprocess.run(["git", "checkout", original_branch], cwd=repo_root)
-            return False, f"Failed to merge {branch_name}: {result.stderr}"
-        
-        # Step 5: Push to origin/main
-        logger.info("Pushing to origin/main...")
-        result = subprocess.run(
-            ["git", "push", "origin", "main"],
-            capture_output=True, text=True, cwd=repo_root
-        )
-        if result.returncode != 0:
-            # Try to restore original branch
-            subprocess.run(["git", "checkout", original_branch], cwd=repo_root)
-            return False, f"Failed to push to origin/main: {result.stderr}"
-        
-        # Step 6: Restore original branch
-        logger.info(f"Restoring original branch: {original_branch}")
-        subprocess.run(["git", "checkout", original_branch], cwd=repo_root)
-        
-        logger.info("✅ Successfully merged and pushed to main!")
-        return True, None
-        
-    except Exception as e:
-        logger.error(f"Unexpected error during merge: {e}")
-        # Try to restore original branch
-        try:
-            subprocess.run(["git", "checkout", original_branch], cwd=repo_root)
-        except:
-            pass
-        return False, str(e)
-
-
 def validate_state_completeness(state: ADWState, logger: logging.Logger) -> tuple[bool, list[str]]:
     """Validate that all fields in ADWState have values (not None).
     
@@ -178,21 +81,28 @@ def validate_state_completeness(state: ADWState, logger: logging.Logger) -> tupl
     return len(missing_fields) == 0, missing_fields
 
 
-def main():
-    """Main entry point."""
+def main(argv: Optional[List[str]] = None):
+    """Main entry point.
+
+    Args:
+        argv: Command line (defaults to sys.argv), so workflows can run the
+            phase in-process
+    """
+    argv = list(sys.argv if argv is None else argv)
+
     # Load environment variables
     load_dotenv()
     
     # Parse command line args
     # INTENTIONAL: adw-id is REQUIRED - we need it to find the worktree and state
-    if len(sys.argv) < 3:
+    if len(argv) < 3:
         print("Usage: uv run adw_ship_iso.py <issue-number> <adw-id>")
         print("\nError: Both issue-number and adw-id are required")
         print("Run the complete SDLC workflow before shipping")
         sys.exit(1)
     
-    issue_number = sys.argv[1]
-    adw_id = sys.argv[2]
+    issue_number = argv[1]
+    adw_id = argv[2]
     
     # Try to load existing state
     temp_logger = setup_logger(adw_id, "adw_ship_iso")
@@ -214,6 +124,7 @@ def main():
     
     # Set up logger with ADW ID
     logger = setup_logger(adw_id, "adw_ship_iso")
+    mark_phase_running(adw_id)
     logger.info(f"ADW Ship Iso starting - ID: {adw_id}, Issue: {issue_number}")
     
     # Validate environment
@@ -270,15 +181,33 @@ def main():
                            f"🔍 Preparing to merge branch: {branch_name}")
     )
     
-    # Step 4: Perform manual merge
-    logger.info(f"Starting manual merge of {branch_name} to main...")
-    make_issue_comment(
-        issue_number,
-        format_issue_message(adw_id, AGENT_SHIPPER, f"🔀 Merging {branch_name} to main...\n"
-                           "Using manual git operations in main repository")
-    )
-    
-    success, error = manual_merge_to_main(branch_name, logger)
+    # Step 4: Merge to main
+    if is_merge_queue_enabled():
+        # The queue tests this branch batched with other ships before merging
+        logger.info(f"Queueing {branch_name} for merge to main...")
+        try:
+            enqueue(adw_id, branch_name, logger)
+        except ValueError as e:
+            logger.error(f"Failed to queue merge: {e}")
+            make_issue_comment(
+                issue_number,
+                format_issue_message(adw_id, AGENT_SHIPPER, f"❌ Failed to queue merge: {e}")
+            )
+            sys.exit(1)
+        make_issue_comment(
+            issue_number,
+            format_issue_message(adw_id, AGENT_SHIPPER, f"🔀 Queued {branch_name} for merge to main\n"
+                               "Waiting for the merge queue to validate its batch")
+        )
+        success, error = wait_for_ship(adw_id, logger)
+    else:
+        logger.info(f"Starting merge of {branch_name} to main...")
+        make_issue_comment(
+            issue_number,
+            format_issue_message(adw_id, AGENT_SHIPPER, f"🔀 Merging {branch_name} to main...\n"
+                               "Using a plumbing merge (main repository checkout is not touched)")
+        )
+        success, error = merge_branch_to_main(branch_name, logger)
     
     if not success:
         logger.error(f"Failed to merge: {error}")
@@ -289,6 +218,9 @@ def main():
         sys.exit(1)
     
     logger.info(f"✅ Successfully merged {branch_name} to main")
+
+    # The branch is shipped; its app servers are no longer needed
+    stop_app(adw_id, logger)
     
     # Step 5: Post success message
     make_issue_comment(
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Test the lease-based port allocator for isolated ADW workflows."""
+
+import sys
+import os
+import tempfile
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adw_modules import port_leases
+
+
+def use_temp_project_root() -> str:
+    """Point the registry at a throwaway project root."""
+    temp_root = tempfile.mkdtemp(prefix="adw_port_leases_")
+    port_leases.get_project_root = lambda: temp_root
+    return temp_root
+
+
+def test_acquire_is_stable_per_owner():
+    """Test that an owner gets the same lease back and owners don't collide."""
+    print("Testing lease acquisition...")
+    use_temp_project_root()
+
+    first = port_leases.acquire_ports("adw00001")
+    second = port_leases.acquire_ports("adw00002")
+    again = port_leases.acquire_ports("adw00001")
+
+    if first == again and first != second:
+        print(f"✅ adw00001 → {first}, adw00002 → {second}")
+        return True
+    print(f"❌ Unexpected leases: {first}, {second}, {again}")
+    return False
+
+
+def test_more_than_fifteen_concurrent_leases():
+    """Test that the registry hands out more pairs than the old 15-slot scheme."""
+    print("\nTesting 50 concurrent leases...")
+    use_temp_project_root()
+
+    ports = {port_leases.acquire_ports(f"adw{i:05d}") for i in range(50)}
+    if len(ports) == 50:
+        print("✅ 50 distinct port pairs leased")
+        return True
+    print(f"❌ Only {len(ports)} distinct port pairs leased")
+    return False
+
+
+def test_release_and_reclaim():
+    """Test explicit release and reclaim of leases whose worktree is gone."""
+    print("\nTesting release and reclaim...")
+    temp_root = use_temp_project_root()
+    os.makedirs(os.path.join(temp_root, "trees", "alive001"))
+    os.makedirs(os.path.join(temp_root, "trees", "_merge_queue", "mq-abc12345"))
+
+    port_leases.acquire_ports("alive001")
+    port_leases.acquire_ports("mq-abc12345")
+    port_leases.acquire_ports("leaked01")
+    port_leases.acquire_ports("released")
+
+    all_passed = True
+    if port_leases.release_ports("released"):
+        print("✅ Released lease for 'released'")
+    else:
+        print("❌ release_ports returned False")
+        all_passed = False
+
+    original_grace = port_leases.WORKTREE_GRACE_SECONDS
+    port_leases.WORKTREE_GRACE_SECONDS = -1
+    try:
+        reclaimed = port_leases.reclaim_stale_leases()
+    finally:
+        port_leases.WORKTREE_GRACE_SECONDS = original_grace
+
+    owners = [lease["owner"] for lease in port_leases.list_leases()]
+    if reclaimed == 1 and sorted(owners) == ["alive001", "mq-abc12345"]:
+        print("✅ Leaked lease reclaimed, live ADW and merge queue leases kept")
+    else:
+        print(f"❌ Reclaimed {reclaimed}, remaining owners: {owners}")
+        all_passed = False
+
+    return all_passed
+
+
+def test_transfer_lease():
+    """Test handing a pool slot's lease to an ADW ID."""
+    print("\nTesting lease transfer...")
+    use_temp_project_root()
+
+    slot_ports = port_leases.acquire_ports("pool-abc12345")
+    port_leases.transfer_lease("pool-abc12345", "adw00001")
+
+    lease = port_leases.get_lease("adw00001")
+    if lease and (lease["backend_port"], lease["frontend_port"]) == slot_ports:
+        print(f"✅ adw00001 now holds {slot_ports}")
+        return True
+    print(f"❌ Transfer failed: {lease}")
+    return False
+
+
+def test_overlapping_ranges_rejected():
+    """Test that overlapping backend/frontend ranges are a configuration error."""
+    print("\nTesting overlapping range validation...")
+    os.environ["ADW_PORT_POOL_SIZE"] = "150"
+    try:
+        port_leases.get_port_ranges()
+        print("❌ Overlapping ranges were accepted")
+        return False
+    except ValueError as e:
+        print(f"✅ Rejected: {e}")
+        return True
+    finally:
+        del os.environ["ADW_PORT_POOL_SIZE"]
+
+
+def main():
+    """Run all tests."""
+    print("ADW Port Lease Tests")
+    print("=" * 50)
+
+    tests = [
+        test_acquire_is_stable_per_owner,
+        test_more_than_fifteen_concurrent_leases,
+        test_release_and_reclaim,
+        test_transfer_lease,
+        test_overlapping_ranges_rejected,
+    ]
+    all_tests_passed = all([test() for test in tests])
+
+    print("\n" + "=" * 50)
+    if all_tests_passed:
+        print("✅ All tests passed!")
+        return 0
+    else:
+        print("❌ Some tests failed!")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
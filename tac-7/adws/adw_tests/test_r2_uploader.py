@@ -7,26 +7,43 @@
 Test R2 Uploader - Real upload test to verify Cloudflare R2 setup
 
 Usage:
-    uv run adws/adw_tests/test_r2_uploader.py
+    uv run adws/adw_tests/test_r2_uploader.py            # Offline, single and batch upload
+    uv run adws/adw_tests/test_r2_uploader.py --batch    # Batch upload only
+    uv run adws/adw_tests/test_r2_uploader.py --offline  # Retry and dedup against a stub client
 
 This will:
 1. Upload app/client/public/bg.png to R2
 2. Verify the upload succeeded
 3. Check if the public URL is accessible
 4. Clean up the test file (optional)
+5. Upload a batch of generated files in parallel, including one large
+   enough for a multipart upload, check a second upload skips them all
+   and delete them again
+
+The offline test needs no credentials: it checks retries, backoff delays
+and content-hash dedup against a stub client.
+
+To test against a local S3-compatible server instead of R2, e.g.
+`moto_server -p 5000`, set CLOUDFLARE_R2_ENDPOINT_URL=http://127.0.0.1:5000
+and run with --batch; the bucket is created if missing.
 """
 
 import os
 import sys
+import time
 import logging
+import tempfile
 from pathlib import Path
+from unittest.mock import patch
 import requests
 from datetime import datetime
+from botocore.exceptions import ClientError
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from dotenv import load_dotenv
+from adw_modules import r2_uploader
 from adw_modules.r2_uploader import R2Uploader
 
 # Load environment variables
@@ -47,6 +64,98 @@ def setup_logger() -> logging.Logger:
     return logger
 
 
+class StubR2Client:
+    """In-memory stand-in for the S3 client whose first uploads fail."""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.upload_calls = 0
+        self.metadata = {}
+
+    def head_object(self, Bucket, Key):
+        if Key not in self.metadata:
+            raise ClientError({"Error": {"Code": "404", "Message": "Not Found"}}, "HeadObject")
+        return {"Metadata": self.metadata[Key]}
+
+    def upload_file(self, Filename, Bucket, Key, ExtraArgs=None, Config=None):
+        self.upload_calls += 1
+        if self.failures:
+            self.failures -= 1
+            raise ClientError({"Error": {"Code": "503", "Message": "Slow Down"}}, "PutObject")
+        self.metadata[Key] = ExtraArgs["Metadata"]
+
+
+def stub_uploader(client: StubR2Client) -> R2Uploader:
+    """Create an enabled uploader that talks to a stub client."""
+    uploader = R2Uploader(logging.getLogger("test_r2_uploader_offline"))
+    uploader.client = client
+    uploader.bucket_name = "adw-test"
+    uploader.public_domain = "r2.example.com"
+    uploader.enabled = True
+    return uploader
+
+
+def test_r2_retry_and_dedup():
+    """Test retries, backoff delays and content-hash dedup without R2."""
+    print("\n🧪 R2 Retry and Dedup Test (offline)")
+    print("=" * 50)
+
+    all_passed = True
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "screenshot.png")
+        with open(path, "wb") as f:
+            f.write(b"first")
+
+        print("\n1️⃣ Upload failing twice...")
+        client = StubR2Client(failures=2)
+        uploader = stub_uploader(client)
+        with patch.object(r2_uploader.time, "sleep") as sleep:
+            url = uploader.upload_file(path, "adw/test/screenshot.png")
+        delays = [call.args[0] for call in sleep.call_args_list]
+        backoff = r2_uploader.RETRY_BACKOFF_SECONDS
+        if (
+            url == "https://r2.example.com/adw/test/screenshot.png"
+            and client.upload_calls == 3
+            and delays == [backoff, backoff * 2]
+        ):
+            print(f"✅ Uploaded on attempt 3 after waiting {delays}")
+        else:
+            print(f"❌ Got {url}, {client.upload_calls} attempts, delays {delays}")
+            all_passed = False
+
+        print("\n2️⃣ Uploading the same file again...")
+        url = uploader.upload_file(path, "adw/test/screenshot.png")
+        if url and client.upload_calls == 3 and uploader.stats["skipped"] == 1:
+            print("✅ Unchanged file skipped")
+        else:
+            print(f"❌ {client.upload_calls} attempts, stats {uploader.stats}")
+            all_passed = False
+
+        print("\n3️⃣ Uploading changed content under the same key...")
+        with open(path, "wb") as f:
+            f.write(b"second")
+        url = uploader.upload_file(path, "adw/test/screenshot.png")
+        if url and client.upload_calls == 4 and uploader.stats["uploaded"] == 2:
+            print("✅ Changed file uploaded")
+        else:
+            print(f"❌ {client.upload_calls} attempts, stats {uploader.stats}")
+            all_passed = False
+
+        print("\n4️⃣ Upload failing every attempt...")
+        client = StubR2Client(failures=10)
+        uploader = stub_uploader(client)
+        with patch.dict(os.environ, {"ADW_R2_MAX_ATTEMPTS": "3"}):
+            with patch.object(r2_uploader.time, "sleep") as sleep:
+                url = uploader.upload_file(path, "adw/test/screenshot.png")
+        if url is None and client.upload_calls == 3 and sleep.call_count == 2 and uploader.stats["failed"] == 1:
+            print("✅ Gave up after 3 attempts")
+        else:
+            print(f"❌ Got {url}, {client.upload_calls} attempts, stats {uploader.stats}")
+            all_passed = False
+
+    return all_passed
+
+
 def test_r2_upload():
     """Test uploading an image to R2."""
     logger = setup_logger()
@@ -167,9 +276,82 @@ def test_r2_upload():
     return True
 
 
+def test_r2_batch_upload():
+    """Test parallel batch upload, multipart upload and content-hash dedup."""
+    logger = setup_logger()
+
+    print("\n🧪 R2 Batch Upload Test")
+    print("=" * 50)
+
+    uploader = R2Uploader(logger)
+    if not uploader.enabled:
+        print("❌ R2 Uploader failed to initialize. Check your environment variables.")
+        return False
+
+    if os.getenv("CLOUDFLARE_R2_ENDPOINT_URL"):
+        # Local stand-in: make sure the bucket exists
+        try:
+            uploader.client.head_bucket(Bucket=uploader.bucket_name)
+        except Exception:
+            uploader.client.create_bucket(Bucket=uploader.bucket_name)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    files = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for i in range(24):
+                path = os.path.join(tmp_dir, f"screenshot_{i:02d}.png")
+                with open(path, "wb") as f:
+                    f.write(os.urandom(100_000))
+                files[path] = f"adw/test/batch_{timestamp}/{Path(path).name}"
+            video = os.path.join(tmp_dir, "recording.webm")
+            with open(video, "wb") as f:
+                f.write(os.urandom(20 * 1024 * 1024))
+            files[video] = f"adw/test/batch_{timestamp}/recording.webm"
+
+            print(f"\n1️⃣ Uploading {len(files)} files (one 20 MB video)...")
+            started = time.monotonic()
+            urls = uploader.upload_files(files)
+            elapsed = time.monotonic() - started
+            failed = [path for path, url in urls.items() if not url]
+            if failed:
+                print(f"❌ {len(failed)} upload(s) failed")
+                return False
+            print(f"✅ Uploaded {len(files)} files in {elapsed:.1f}s")
+
+            print("\n2️⃣ Uploading the same files again...")
+            skipped_before = uploader.stats["skipped"]
+            uploader.upload_files(files)
+            skipped = uploader.stats["skipped"] - skipped_before
+            if skipped != len(files):
+                print(f"❌ Only {skipped}/{len(files)} unchanged files were skipped")
+                return False
+            print(f"✅ All {skipped} unchanged files were skipped")
+    finally:
+        if files:
+            print("\n3️⃣ Deleting the uploaded files...")
+            try:
+                uploader.client.delete_objects(
+                    Bucket=uploader.bucket_name,
+                    Delete={"Objects": [{"Key": key} for key in files.values()]},
+                )
+                print(f"✅ Deleted {len(files)} test objects")
+            except Exception as e:
+                print(f"⚠️  Could not delete test objects: {e}")
+
+    print("\n" + "=" * 50)
+    print("✅ R2 Batch Upload Test Complete!")
+    return True
+
+
 def main():
     """Main entry point."""
-    success = test_r2_upload()
+    if "--offline" in sys.argv:
+        success = test_r2_retry_and_dedup()
+    elif "--batch" in sys.argv:
+        success = test_r2_batch_upload()
+    else:
+        success = test_r2_retry_and_dedup() and test_r2_upload() and test_r2_batch_upload()
     sys.exit(0 if success else 1)
 
 
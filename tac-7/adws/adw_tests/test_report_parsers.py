@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""Test the JUnit and JSON report parsers of the native test runner."""
+
+import sys
+import os
+import json
+import tempfile
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adw_modules.data_types import TestCommand
+from adw_modules.test_runner import TestRunnerError, parse_json_report, parse_junit_report
+
+PYTEST_COMMAND = TestCommand(
+    name="all_backend_tests",
+    command="uv run pytest --junitxml={report}",
+    cwd="app/server",
+    purpose="Runs the backend test suite",
+    report="junit",
+    rerun_command="uv run pytest {test}",
+)
+
+VITEST_COMMAND = TestCommand(
+    name="frontend_tests",
+    command="bun vitest run --reporter=json --outputFile={report}",
+    cwd="app/client",
+    report="json",
+    rerun_command="bun vitest run {test}",
+)
+
+JUNIT_REPORT = """<?xml version="1.0" encoding="utf-8"?>
+<testsuites>
+  <testsuite name="pytest" tests="4" failures="1" errors="1">
+    <testcase classname="tests.test_sql.TestQueries" file="tests/test_sql.py"
+              name="test_select" time="0.125"/>
+    <testcase classname="tests.test_sql.TestQueries" file="tests/test_sql.py"
+              name="test_insert" time="0.5">
+      <failure message="AssertionError: 2 != 3">assert 2 == 3</failure>
+    </testcase>
+    <testcase classname="tests.test_upload" file="tests/test_upload.py"
+              name="test_csv" time="">
+      <error message="fixture 'db' not found"/>
+    </testcase>
+    <testcase classname="test_health" name="test_ping" time="0.01"/>
+  </testsuite>
+</testsuites>
+"""
+
+
+def write_report(content: str, suffix: str) -> str:
+    """Write a report to a temp file and return its path."""
+    fd, path = tempfile.mkstemp(prefix="adw_report_", suffix=suffix)
+    with os.fdopen(fd, "w") as f:
+        f.write(content)
+    return path
+
+
+def check(name: str, actual, expected) -> bool:
+    """Print and return whether a value matches."""
+    if actual == expected:
+        print(f"✅ {name}")
+        return True
+    print(f"❌ {name}: expected {expected!r}, got {actual!r}")
+    return False
+
+
+def test_junit_report():
+    """Test node IDs, outcomes, errors and durations from a JUnit report."""
+    print("Testing JUnit report parsing...")
+    results = parse_junit_report(write_report(JUNIT_REPORT, ".xml"), PYTEST_COMMAND)
+    by_name = {result.test_name: result for result in results}
+
+    checks = [
+        check(
+            "node IDs",
+            sorted(by_name),
+            sorted([
+                "tests/test_sql.py::TestQueries::test_select",
+                "tests/test_sql.py::TestQueries::test_insert",
+                "tests/test_upload.py::test_csv",
+                "test_health::test_ping",
+            ]),
+        ),
+        check("passing test", by_name["tests/test_sql.py::TestQueries::test_select"].passed, True),
+        check(
+            "failure message and text",
+            by_name["tests/test_sql.py::TestQueries::test_insert"].error,
+            "AssertionError: 2 != 3\nassert 2 == 3",
+        ),
+        check("error counts as failure", by_name["tests/test_upload.py::test_csv"].passed, False),
+        check("missing time", by_name["tests/test_upload.py::test_csv"].duration_seconds, None),
+        check(
+            "duration",
+            by_name["tests/test_sql.py::TestQueries::test_insert"].duration_seconds,
+            0.5,
+        ),
+        check(
+            "rerun command",
+            by_name["tests/test_upload.py::test_csv"].execution_command,
+            "cd app/server && uv run pytest tests/test_upload.py::test_csv",
+        ),
+    ]
+    return all(checks)
+
+
+def test_json_report():
+    """Test assertions, skipped tests and suites that failed to load."""
+    print("\nTesting JSON report parsing...")
+    cwd = "/work/app/client"
+    report = {
+        "testResults": [
+            {
+                "name": f"{cwd}/src/main.test.ts",
+                "status": "failed",
+                "assertionResults": [
+                    {"fullName": "main renders", "status": "passed", "duration": 250},
+                    {
+                        "fullName": "main uploads",
+                        "status": "failed",
+                        "failureMessages": ["expected 1", "received 2"],
+                    },
+                    {"fullName": "main later", "status": "skipped"},
+                ],
+            },
+            {
+                "name": f"{cwd}/src/broken.test.ts",
+                "status": "failed",
+                "message": "SyntaxError: Unexpected token",
+                "assertionResults": [],
+            },
+        ]
+    }
+    results = parse_json_report(write_report(json.dumps(report), ".json"), VITEST_COMMAND, cwd)
+    by_name = {result.test_name: result for result in results}
+
+    checks = [
+        check(
+            "test names (skipped left out)",
+            sorted(by_name),
+            ["src/broken.test.ts", "src/main.test.ts > main renders", "src/main.test.ts > main uploads"],
+        ),
+        check("duration in seconds", by_name["src/main.test.ts > main renders"].duration_seconds, 0.25),
+        check("failure messages", by_name["src/main.test.ts > main uploads"].error, "expected 1\nreceived 2"),
+        check("suite load failure", by_name["src/broken.test.ts"].error, "SyntaxError: Unexpected token"),
+        check(
+            "rerun command",
+            by_name["src/main.test.ts > main uploads"].execution_command,
+            "cd app/client && bun vitest run src/main.test.ts",
+        ),
+        check("default purpose", by_name["src/broken.test.ts"].test_purpose, "Test from frontend_tests"),
+    ]
+    return all(checks)
+
+
+def test_unreadable_reports():
+    """Test that broken or missing reports raise TestRunnerError."""
+    print("\nTesting unreadable reports...")
+    cases = [
+        ("truncated XML", lambda: parse_junit_report(write_report("<testsuite>", ".xml"), PYTEST_COMMAND)),
+        ("missing XML", lambda: parse_junit_report("/nonexistent/report.xml", PYTEST_COMMAND)),
+        ("invalid JSON", lambda: parse_json_report(write_report("{", ".json"), VITEST_COMMAND, ".")),
+        ("JSON without testResults", lambda: parse_json_report(write_report("{}", ".json"), VITEST_COMMAND, ".")),
+    ]
+
+    all_passed = True
+    for name, parse in cases:
+        try:
+            parse()
+            print(f"❌ {name}: no error raised")
+            all_passed = False
+        except TestRunnerError:
+            print(f"✅ {name}: TestRunnerError")
+    return all_passed
+
+
+def main():
+    """Run all tests."""
+    print("ADW Test Report Parser Tests")
+    print("=" * 50)
+
+    tests = [
+        test_junit_report,
+        test_json_report,
+        test_unreadable_reports,
+    ]
+    all_tests_passed = all([test() for test in tests])
+
+    print("\n" + "=" * 50)
+    if all_tests_passed:
+        print("✅ All tests passed!")
+        return 0
+    else:
+        print("❌ Some tests failed!")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
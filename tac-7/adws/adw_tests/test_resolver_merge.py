@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""Test merging the fixes of parallel resolvers back onto their base tree."""
+
+import sys
+import os
+import logging
+import subprocess
+import tempfile
+from typing import Dict
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adw_modules.resolver_worktrees import merge_resolver_trees
+
+logger = logging.getLogger("test_resolver_merge")
+
+BASE_FILES = {
+    "app/server/main.py": "".join(f"line {i}\n" for i in range(1, 21)),
+    "app/server/util.py": "def util():\n    return 1\n",
+    ".ports.env": "BACKEND_PORT=9100\n",
+}
+
+
+def git(repo: str, *args: str) -> str:
+    """Run git in the test repository and return its output."""
+    result = subprocess.run(
+        ["git"] + list(args), capture_output=True, text=True, cwd=repo, check=True
+    )
+    return result.stdout.strip()
+
+
+def create_repo() -> str:
+    """Create a repository whose HEAD holds BASE_FILES."""
+    repo = tempfile.mkdtemp(prefix="adw_resolver_merge_")
+    git(repo, "init", "-q")
+    write_tree(repo, BASE_FILES)
+    git(repo, "-c", "user.name=adw", "-c", "user.email=adw@example.com",
+        "commit", "-q", "-m", "base")
+    return repo
+
+
+def write_tree(repo: str, changes: Dict[str, str]) -> str:
+    """Write BASE_FILES with changes applied and return the staged tree."""
+    for path, content in {**BASE_FILES, **changes}.items():
+        full_path = os.path.join(repo, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "w") as f:
+            f.write(content)
+    git(repo, "add", "-A")
+    return git(repo, "write-tree")
+
+
+def edit_line(number: int, text: str) -> str:
+    """main.py with one line replaced."""
+    lines = BASE_FILES["app/server/main.py"].splitlines(keepends=True)
+    lines[number - 1] = text + "\n"
+    return "".join(lines)
+
+
+def show(repo: str, tree: str, path: str) -> str:
+    """Read a file from a tree."""
+    return git(repo, "show", f"{tree}:{path}") + "\n"
+
+
+def test_compatible_fixes_merge():
+    """Test that edits to different parts of the same file both land."""
+    print("Testing compatible fixes...")
+    repo = create_repo()
+    base = write_tree(repo, {})
+    first = write_tree(repo, {"app/server/main.py": edit_line(2, "fixed 2")})
+    second = write_tree(repo, {"app/server/main.py": edit_line(18, "fixed 18")})
+    third = write_tree(repo, {"app/server/util.py": "def util():\n    return 2\n"})
+
+    merged, conflicted = merge_resolver_trees(
+        repo, base, [(0, first), (1, second), (2, third)], logger
+    )
+
+    main_py = show(repo, merged, "app/server/main.py")
+    if (
+        not conflicted
+        and "fixed 2\n" in main_py
+        and "fixed 18\n" in main_py
+        and show(repo, merged, "app/server/util.py").endswith("return 2\n")
+    ):
+        print("✅ All three fixes merged")
+        return True
+    print(f"❌ Conflicted: {conflicted}, main.py:\n{main_py}")
+    return False
+
+
+def test_conflicting_fix_is_dropped():
+    """Test that a fix overlapping an earlier one is reported, not applied."""
+    print("\nTesting conflicting fixes...")
+    repo = create_repo()
+    base = write_tree(repo, {})
+    first = write_tree(repo, {"app/server/main.py": edit_line(10, "first fix")})
+    second = write_tree(repo, {"app/server/main.py": edit_line(10, "second fix")})
+    third = write_tree(repo, {"app/server/util.py": "def util():\n    return 3\n"})
+
+    merged, conflicted = merge_resolver_trees(
+        repo, base, [(0, first), (1, second), (2, third)], logger
+    )
+
+    main_py = show(repo, merged, "app/server/main.py")
+    if (
+        conflicted == {1}
+        and "first fix\n" in main_py
+        and "second fix" not in main_py
+        and show(repo, merged, "app/server/util.py").endswith("return 3\n")
+    ):
+        print("✅ Second fix reported as conflicting, others merged")
+        return True
+    print(f"❌ Conflicted: {conflicted}, main.py:\n{main_py}")
+    return False
+
+
+def test_ports_env_not_merged():
+    """Test that a resolver's own .ports.env and no-op results are ignored."""
+    print("\nTesting excluded and empty results...")
+    repo = create_repo()
+    base = write_tree(repo, {})
+    ports_only = write_tree(repo, {".ports.env": "BACKEND_PORT=9142\n"})
+
+    merged, conflicted = merge_resolver_trees(
+        repo, base, [(0, ports_only), (1, base)], logger
+    )
+
+    if merged == base and not conflicted:
+        print("✅ Base tree unchanged")
+        return True
+    print(f"❌ Merged tree {merged} differs from base {base}, conflicted: {conflicted}")
+    return False
+
+
+def main():
+    """Run all tests."""
+    print("ADW Resolver Merge Tests")
+    print("=" * 50)
+
+    tests = [
+        test_compatible_fixes_merge,
+        test_conflicting_fix_is_dropped,
+        test_ports_env_not_merged,
+    ]
+    all_tests_passed = all([test() for test in tests])
+
+    print("\n" + "=" * 50)
+    if all_tests_passed:
+        print("✅ All tests passed!")
+        return 0
+    else:
+        print("❌ Some tests failed!")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Test that ADW state saves from parallel phases merge instead of overwriting."""
+
+import sys
+import os
+import tempfile
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adw_modules.state import ADWState
+from adw_modules.data_types import PhaseSpec
+from adw_modules.workflow_engine import get_commit_pathspecs
+
+
+def use_temp_state_dir() -> str:
+    """Point state files at a throwaway directory."""
+    temp_dir = tempfile.mkdtemp(prefix="adw_state_")
+    ADWState.get_state_path = lambda self: os.path.join(
+        temp_dir, self.adw_id, ADWState.STATE_FILENAME
+    )
+    return temp_dir
+
+
+def create_state(adw_id: str) -> None:
+    """Save an initial state, as adw_plan_iso.py would."""
+    state = ADWState(adw_id)
+    state.update(issue_number="42", branch_name="feat-issue-42-adw-state")
+    state.save()
+
+
+def test_parallel_saves_keep_both_updates():
+    """Test that two loaded instances saving different keys keep both."""
+    print("Testing parallel saves of different keys...")
+    use_temp_state_dir()
+    create_state("adw00001")
+
+    phase_a = ADWState.load("adw00001")
+    phase_b = ADWState.load("adw00001")
+    phase_a.update(pr_url="https://github.com/org/repo/pull/7")
+    phase_b.update(plan_file="specs/issue-42-plan.md")
+    phase_a.save()
+    phase_b.save()
+
+    saved = ADWState.load("adw00001")
+    if (
+        saved.get("pr_url") == "https://github.com/org/repo/pull/7"
+        and saved.get("plan_file") == "specs/issue-42-plan.md"
+        and saved.get("branch_name") == "feat-issue-42-adw-state"
+    ):
+        print("✅ pr_url and plan_file both survived")
+        return True
+    print(f"❌ Saved state lost an update: {saved.data}")
+    return False
+
+
+def test_unchanged_keys_are_not_written():
+    """Test that saving a stale instance doesn't revert keys it never changed."""
+    print("\nTesting that a stale instance keeps newer values...")
+    use_temp_state_dir()
+    create_state("adw00002")
+
+    stale = ADWState.load("adw00002")
+    fresh = ADWState.load("adw00002")
+    fresh.update(branch_name="feat-issue-42-renamed")
+    fresh.save()
+    stale.save()
+
+    saved = ADWState.load("adw00002")
+    if saved.get("branch_name") == "feat-issue-42-renamed":
+        print("✅ Newer branch_name kept")
+        return True
+    print(f"❌ branch_name reverted to {saved.get('branch_name')}")
+    return False
+
+
+def test_all_adws_are_merged():
+    """Test that workflow IDs appended by parallel phases are all kept."""
+    print("\nTesting all_adws merge...")
+    use_temp_state_dir()
+    create_state("adw00003")
+
+    test_phase = ADWState.load("adw00003")
+    review_phase = ADWState.load("adw00003")
+    test_phase.append_adw_id("adw_test_iso")
+    review_phase.append_adw_id("adw_review_iso")
+    test_phase.save()
+    review_phase.save()
+
+    all_adws = ADWState.load("adw00003").get("all_adws")
+    if sorted(all_adws) == ["adw_review_iso", "adw_test_iso"]:
+        print(f"✅ all_adws = {all_adws}")
+        return True
+    print(f"❌ all_adws = {all_adws}")
+    return False
+
+
+def test_commit_pathspecs():
+    """Test which paths each phase of a parallel group may commit."""
+    print("\nTesting commit pathspecs...")
+    test = PhaseSpec(name="test", script="adw_test_iso.py")
+    review = PhaseSpec(name="review", script="adw_review_iso.py", commit_paths=["app_docs/review"])
+    document = PhaseSpec(name="document", script="adw_document_iso.py", commit_paths=["app_docs"])
+
+    cases = [
+        ("single phase", get_commit_pathspecs(test, [test]), None),
+        ("no sibling paths", get_commit_pathspecs(test, [test, PhaseSpec(name="x", script="x.py")]), None),
+        ("own paths", get_commit_pathspecs(review, [test, review]), ["app_docs/review"]),
+        (
+            "siblings excluded",
+            get_commit_pathspecs(test, [test, review, document]),
+            [".", ":(exclude)app_docs/review", ":(exclude)app_docs"],
+        ),
+    ]
+
+    all_passed = True
+    for name, actual, expected in cases:
+        if actual == expected:
+            print(f"✅ {name}: {actual}")
+        else:
+            print(f"❌ {name}: expected {expected}, got {actual}")
+            all_passed = False
+    return all_passed
+
+
+def main():
+    """Run all tests."""
+    print("ADW State Merge Tests")
+    print("=" * 50)
+
+    tests = [
+        test_parallel_saves_keep_both_updates,
+        test_unchanged_keys_are_not_written,
+        test_all_adws_are_merged,
+        test_commit_pathspecs,
+    ]
+    all_tests_passed = all([test() for test in tests])
+
+    print("\n" + "=" * 50)
+    if all_tests_passed:
+        print("✅ All tests passed!")
+        return 0
+    else:
+        print("❌ Some tests failed!")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""Test the test impact analyser that picks the tests a branch's changes affect."""
+
+import sys
+import os
+import logging
+import subprocess
+import tempfile
+from typing import Dict
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adw_modules import test_impact
+from adw_modules.data_types import TestCommand
+from adw_modules.test_impact import affected_files, build_import_graph, select_tests
+
+logger = logging.getLogger("test_test_impact")
+
+SERVER_FILES = {
+    "main.py": "from core import api\n",
+    "core/__init__.py": "",
+    "core/db.py": "def connect():\n    return None\n",
+    "core/api.py": "from .db import connect\n",
+    "core/report.py": "import json\n",
+    "tests/test_api.py": "from core.api import connect\n",
+    "tests/test_db.py": "import core.db\n",
+    "tests/test_report.py": "from core import report\n",
+}
+
+COMMANDS = [
+    TestCommand(
+        name="all_backend_tests",
+        command="uv run pytest",
+        cwd="app/server",
+        test_glob="tests/**/test_*.py",
+        select_command="uv run pytest {tests}",
+    ),
+    TestCommand(name="typescript_check", command="bun tsc --noEmit", cwd="app/client"),
+]
+
+E2E_TESTS = [
+    ".claude/commands/e2e/test_upload.md",
+    ".claude/commands/e2e/test_query.md",
+]
+
+
+def write_files(root: str, files: Dict[str, str]) -> None:
+    """Write files relative to root."""
+    for path, content in files.items():
+        full_path = os.path.join(root, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "w") as f:
+            f.write(content)
+
+
+def git(repo: str, *args: str) -> None:
+    """Run git in the test repository."""
+    subprocess.run(
+        ["git", "-c", "user.name=adw", "-c", "user.email=adw@example.com"] + list(args),
+        capture_output=True,
+        cwd=repo,
+        check=True,
+    )
+
+
+def create_worktree() -> str:
+    """Create a repository with the app and a "base" ref to compare against."""
+    repo = tempfile.mkdtemp(prefix="adw_test_impact_")
+    write_files(os.path.join(repo, "app", "server"), SERVER_FILES)
+    write_files(repo, {"app/client/src/main.ts": "export {}\n"})
+    write_files(repo, {path: "# E2E test\n" for path in E2E_TESTS})
+    git(repo, "init", "-q")
+    git(repo, "add", "-A")
+    git(repo, "commit", "-q", "-m", "base")
+    git(repo, "branch", "base")
+
+    # The coverage map lives in a throwaway project root too
+    test_impact.get_project_root = lambda: repo
+    os.environ["ADW_TEST_IMPACT_BASE"] = "base"
+    return repo
+
+
+def test_import_graph():
+    """Test absolute, package and relative imports in the import graph."""
+    print("Testing import graph...")
+    root = tempfile.mkdtemp(prefix="adw_import_graph_")
+    write_files(root, SERVER_FILES)
+    graph = build_import_graph(root)
+
+    expected = {
+        "main.py": {"core/__init__.py", "core/api.py"},
+        "core/api.py": {"core/__init__.py", "core/db.py"},
+        "core/db.py": set(),
+        "tests/test_api.py": {"core/__init__.py", "core/api.py"},
+        "tests/test_db.py": {"core/__init__.py", "core/db.py"},
+    }
+    all_passed = True
+    for path, imports in expected.items():
+        if graph.get(path) == imports:
+            print(f"✅ {path} -> {sorted(imports)}")
+        else:
+            print(f"❌ {path}: expected {sorted(imports)}, got {sorted(graph.get(path, []))}")
+            all_passed = False
+
+    write_files(root, {"core/uses_legacy.py": "from core import legacy\n"})
+    deleted_graph = build_import_graph(root, deleted={"core/legacy.py"})
+    if "core/legacy.py" in deleted_graph.get("core/uses_legacy.py", set()):
+        print("✅ Imports of a deleted module are kept")
+    else:
+        print(f"❌ Deleted import missing: {deleted_graph.get('core/uses_legacy.py')}")
+        all_passed = False
+    return all_passed
+
+
+def test_affected_files():
+    """Test that importers of a changed file are found transitively."""
+    print("\nTesting affected files...")
+    root = tempfile.mkdtemp(prefix="adw_import_graph_")
+    write_files(root, SERVER_FILES)
+    affected = affected_files(build_import_graph(root), {"core/db.py"})
+
+    expected = {"core/db.py", "core/api.py", "main.py", "tests/test_api.py", "tests/test_db.py"}
+    if affected == expected:
+        print(f"✅ {sorted(affected)}")
+        return True
+    print(f"❌ Expected {sorted(expected)}, got {sorted(affected)}")
+    return False
+
+
+def test_select_backend_change():
+    """Test that a backend module change selects only the tests importing it."""
+    print("\nTesting selection for a backend change...")
+    repo = create_worktree()
+    write_files(repo, {"app/server/core/db.py": "def connect():\n    return 1\n"})
+
+    selection = select_tests(repo, COMMANDS, E2E_TESTS, logger)
+    expected = {"all_backend_tests": ["tests/test_api.py", "tests/test_db.py"]}
+    if not selection.full and selection.commands == expected and selection.e2e_tests == sorted(E2E_TESTS):
+        print(f"✅ {selection.commands}, {len(selection.e2e_tests)} E2E tests")
+        return True
+    print(f"❌ Got full={selection.full}, {selection.commands}, {selection.e2e_tests}")
+    return False
+
+
+def test_select_e2e_and_frontend_change():
+    """Test that a changed E2E test runs alone and frontend changes run their command."""
+    print("\nTesting selection for E2E and frontend changes...")
+    repo = create_worktree()
+    write_files(repo, {".claude/commands/e2e/test_query.md": "# Changed E2E test\n"})
+
+    all_passed = True
+    selection = select_tests(repo, COMMANDS, E2E_TESTS, logger)
+    if selection.commands == {} and selection.e2e_tests == [".claude/commands/e2e/test_query.md"]:
+        print("✅ Changed E2E test selected on its own")
+    else:
+        print(f"❌ Got {selection.commands}, {selection.e2e_tests}")
+        all_passed = False
+
+    write_files(repo, {"app/client/src/main.ts": "export const x = 1\n"})
+    selection = select_tests(repo, COMMANDS, E2E_TESTS, logger)
+    if selection.commands == {"typescript_check": None} and selection.e2e_tests == sorted(E2E_TESTS):
+        print("✅ Frontend change runs typescript_check and every E2E test")
+    else:
+        print(f"❌ Got {selection.commands}, {selection.e2e_tests}")
+        all_passed = False
+    return all_passed
+
+
+def test_full_runs():
+    """Test the changes and settings that make everything run."""
+    print("\nTesting full runs...")
+    all_passed = True
+
+    repo = create_worktree()
+    write_files(repo, {"app/server/pyproject.toml": "[project]\n"})
+    selection = select_tests(repo, COMMANDS, E2E_TESTS, logger)
+    if selection.full and "pyproject.toml" in selection.reason:
+        print(f"✅ {selection.reason}")
+    else:
+        print(f"❌ Dependency manifest change did not run everything: {selection.reason}")
+        all_passed = False
+
+    repo = create_worktree()
+    write_files(repo, {"app/server/core/db.py": "def connect():\n    return 2\n"})
+    os.environ["ADW_TEST_IMPACT_RULES_FILE"] = "missing_rules.json"
+    try:
+        selection = select_tests(repo, COMMANDS, E2E_TESTS, logger)
+    finally:
+        del os.environ["ADW_TEST_IMPACT_RULES_FILE"]
+    if selection.full:
+        print(f"✅ Unreadable rules file: {selection.reason}")
+    else:
+        print("❌ Unreadable rules file did not run everything")
+        all_passed = False
+
+    os.environ["ADW_TEST_IMPACT_BASE"] = "no-such-ref"
+    selection = select_tests(repo, COMMANDS, E2E_TESTS, logger)
+    if selection.full:
+        print(f"✅ Unknown base ref: {selection.reason}")
+    else:
+        print("❌ Unknown base ref did not run everything")
+        all_passed = False
+    return all_passed
+
+
+def main():
+    """Run all tests."""
+    print("ADW Test Impact Tests")
+    print("=" * 50)
+
+    tests = [
+        test_import_graph,
+        test_affected_files,
+        test_select_backend_change,
+        test_select_e2e_and_frontend_change,
+        test_full_runs,
+    ]
+    all_tests_passed = all([test() for test in tests])
+
+    print("\n" + "=" * 50)
+    if all_tests_passed:
+        print("✅ All tests passed!")
+        return 0
+    else:
+        print("❌ Some tests failed!")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
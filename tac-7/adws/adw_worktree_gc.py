@@ -0,0 +1,65 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = ["python-dotenv", "pydantic"]
+# ///
+
+"""
+ADW Worktree GC - Reclaim worktrees, ports and disk space under trees/
+
+Usage:
+  uv run adw_worktree_gc.py [--dry-run] [--interval=<minutes>]
+
+Each pass removes at most ADW_GC_BATCH_SIZE worktrees, choosing:
+1. Worktrees whose branch is merged into origin/main
+2. Worktrees idle longer than ADW_GC_MAX_AGE_DAYS
+3. Least recently used worktrees while more than ADW_GC_MAX_WORKTREES exist
+4. Least recently used worktrees while trees/ exceeds ADW_GC_DISK_QUOTA_GB
+
+Worktrees with a phase in progress are skipped. Processes still listening on
+a collected ADW's leased ports are stopped and its port lease is released.
+
+With --interval the collector keeps running, one pass every <minutes>.
+"""
+
+import sys
+import os
+import time
+from dotenv import load_dotenv
+
+# Add the parent directory to Python path to import modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from adw_modules.utils import setup_logger
+from adw_modules.worktree_gc import GCPolicy, run_gc
+
+
+def main():
+    """Main entry point."""
+    load_dotenv()
+
+    dry_run = "--dry-run" in sys.argv
+    interval_minutes = None
+    for arg in sys.argv[1:]:
+        if arg.startswith("--interval="):
+            try:
+                interval_minutes = float(arg.split("=", 1)[1])
+            except ValueError:
+                print("Usage: uv run adw_worktree_gc.py [--dry-run] [--interval=<minutes>]")
+                sys.exit(1)
+
+    logger = setup_logger("_gc", "adw_worktree_gc")
+    policy = GCPolicy.from_env()
+    logger.info(f"Worktree GC policy: {policy.model_dump()}")
+
+    while True:
+        removed = run_gc(policy, logger, dry_run=dry_run)
+        logger.info(
+            f"GC pass complete - {len(removed)} worktree(s) "
+            f"{'selected' if dry_run else 'removed'}"
+        )
+        if interval_minutes is None:
+            break
+        time.sleep(interval_minutes * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = ["python-dotenv", "pydantic"]
+# ///
+
+"""
+ADW Worktree Pool - Manage pre-warmed worktrees for isolated workflows
+
+Usage:
+  uv run adw_worktree_pool.py fill     # Create slots until ADW_WORKTREE_POOL_SIZE are ready
+  uv run adw_worktree_pool.py status   # Show pool slots
+  uv run adw_worktree_pool.py drain    # Remove ready (and abandoned) slots
+
+Pooled worktrees live under trees/_pool/<slot_id>/ at origin/main with ports
+allocated and dependencies installed. adw_plan_iso.py and adw_patch_iso.py
+claim a slot when one is ready and trigger a background `fill` afterwards.
+"""
+
+import sys
+import os
+from dotenv import load_dotenv
+
+# Add the parent directory to Python path to import modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from adw_modules.utils import setup_logger
+from adw_modules.worktree_pool import (
+    fill_pool,
+    drain_pool,
+    list_slots,
+    get_pool_size,
+)
+
+COMMANDS = ["fill", "status", "drain"]
+
+
+def main():
+    """Main entry point."""
+    load_dotenv()
+
+    if len(sys.argv) < 2 or sys.argv[1] not in COMMANDS:
+        print("Usage: uv run adw_worktree_pool.py <fill|status|drain>")
+        sys.exit(1)
+
+    command = sys.argv[1]
+    logger = setup_logger("_pool", "adw_worktree_pool")
+
+    if command == "fill":
+        if get_pool_size() == 0:
+            logger.info("Worktree pool disabled (ADW_WORKTREE_POOL_SIZE is 0)")
+            return
+        created = fill_pool(logger)
+        logger.info(f"Pool fill complete - {created} slot(s) created")
+
+    elif command == "status":
+        slots = list_slots(logger)
+        print(f"Target pool size: {get_pool_size()}")
+        if not slots:
+            print("No pooled worktrees")
+        for slot in slots:
+            print(
+                f"  {slot.slot_id}  {slot.status:<8}  "
+                f"ports {slot.backend_port}/{slot.frontend_port}  "
+                f"base {(slot.base_commit or '-')[:8]}  "
+                f"created {slot.created_at:%Y-%m-%d %H:%M:%S}"
+            )
+
+    elif command == "drain":
+        removed = drain_pool(logger)
+        logger.info(f"Drained {removed} pooled worktree(s)")
+
+
+if __name__ == "__main__":
+    main()